@@ -0,0 +1,55 @@
+"""
+Benchmark: throughput of AsyncTodoService with thousands of concurrent coroutines.
+
+Each coroutine adds a task, reads it back and completes it. Backends:
+
+* ThreadPoolTaskRepository over IndexedTaskRepository
+* ThreadPoolTaskRepository over SqliteTaskRepository
+* AsyncLogTaskRepository (group-committed operation log)
+
+Run from the project root:
+
+    python -m benchmarks.bench_async [coroutines]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from src.async_repository import AsyncLogTaskRepository, ThreadPoolTaskRepository
+from src.async_service import AsyncTodoService
+from src.repository import IndexedTaskRepository
+from src.sqlite_repository import SqliteTaskRepository
+
+
+async def client(service, number):
+    task = await service.add_task(f"Task {number}")
+    await service.get_task(task.id)
+    await service.complete_task(task.id)
+
+
+async def run(name, repository, coroutines):
+    service = AsyncTodoService(repository)
+    start = time.perf_counter()
+    await asyncio.gather(*(client(service, i) for i in range(coroutines)))
+    elapsed = time.perf_counter() - start
+    await service.close()
+    operations = coroutines * 4  # generate_id, add, get, complete_if
+    print(f"{name:<28} {coroutines:>8} {elapsed:>9.3f}s {operations / elapsed:>12,.0f} ops/s")
+
+
+async def main():
+    coroutines = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'backend':<28} {'clients':>8} {'elapsed':>10} {'throughput':>12}")
+        await run("threadpool(indexed)", ThreadPoolTaskRepository(IndexedTaskRepository()), coroutines)
+        await run("threadpool(sqlite)",
+                  ThreadPoolTaskRepository(SqliteTaskRepository(os.path.join(directory, "todo.db"))),
+                  coroutines)
+        await run("async log (group commit)",
+                  await AsyncLogTaskRepository.open(os.path.join(directory, "log")), coroutines)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
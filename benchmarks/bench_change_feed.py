@@ -0,0 +1,78 @@
+"""
+Benchmark: keeping a downstream copy of the store current by rescanning
+and diffing get_all against applying change feed events.
+
+The store is seeded, then a small number of tasks change between each
+sync. The rescan consumer reads every task and compares it with its copy;
+the feed consumer polls the events published since its last sync. Both
+copies are checked against the store at the end.
+
+Run from the project root:
+
+    python -m benchmarks.bench_change_feed [tasks] [changes per sync] [syncs]
+"""
+import random
+import sys
+import time
+from dataclasses import replace
+
+from src.change_feed import ChangeFeed, ChangeFeedTaskRepository, ChangeKind
+from src.repository import IndexedTaskRepository
+from src.service import TodoService
+
+
+def rescan(service, mirror):
+    current = {task.id: task for task in service.get_all_tasks()}
+    for task_id in mirror.keys() - current.keys():
+        del mirror[task_id]
+    for task_id, task in current.items():
+        if mirror.get(task_id) != task:
+            mirror[task_id] = replace(task)
+
+
+def apply_events(subscription, mirror):
+    while events := subscription.poll(max_events=10_000):
+        for event in events:
+            if event.kind is ChangeKind.DELETED:
+                mirror.pop(event.task_id, None)
+            else:
+                mirror[event.task_id] = event.task
+
+
+def main():
+    count = int(float(sys.argv[1])) if len(sys.argv) > 1 else 100_000
+    changes = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    syncs = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    repository = ChangeFeedTaskRepository(IndexedTaskRepository(), ChangeFeed(capacity=max(changes * 2, 1024)))
+    service = TodoService(repository)
+    service.add_tasks((f"Task {i}", None) for i in range(count))
+    rescanned = {task.id: replace(task) for task in service.get_all_tasks()}
+    fed = dict(rescanned)
+    subscription = repository.feed.subscribe()
+    rng = random.Random(0)
+    rescan_time = feed_time = 0.0
+
+    for _ in range(syncs):
+        for _ in range(changes):
+            task_id = rng.randint(1, count)
+            if service.get_task(task_id) is not None:
+                service.update_task(task_id, title=f"Renamed {rng.random():.6f}")
+            else:
+                service.add_task("New task")
+        start = time.perf_counter()
+        rescan(service, rescanned)
+        rescan_time += time.perf_counter() - start
+        start = time.perf_counter()
+        apply_events(subscription, fed)
+        feed_time += time.perf_counter() - start
+
+    expected = {task.id: task for task in service.get_all_tasks()}
+    assert rescanned == expected and fed == expected
+    print(f"{count:,} tasks, {changes} changes per sync, {syncs} syncs")
+    print(f"{'consumer':<10} {'ms per sync':>12}")
+    print(f"{'rescan':<10} {rescan_time / syncs * 1000:>12.2f}")
+    print(f"{'feed':<10} {feed_time / syncs * 1000:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
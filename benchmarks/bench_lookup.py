@@ -0,0 +1,50 @@
+"""
+Benchmark: get_by_id cost as the store grows.
+
+Compares the list-scanning InMemoryTaskRepository with the dict-backed
+IndexedTaskRepository. Run from the project root:
+
+    python -m benchmarks.bench_lookup
+"""
+import random
+import timeit
+
+from src.models import Task
+from src.repository import InMemoryTaskRepository, IndexedTaskRepository
+
+SIZES = [1_000, 10_000, 100_000]
+LOOKUPS = 1_000
+
+
+def build(repository_cls, size):
+    repository = repository_cls()
+    for _ in range(size):
+        task_id = repository.generate_id()
+        repository.add(Task(id=task_id, title=f"Task {task_id}"))
+    return repository
+
+
+def time_lookups(repository, size):
+    """Return the mean get_by_id latency in microseconds"""
+    rng = random.Random(size)
+    ids = [rng.randint(1, size) for _ in range(LOOKUPS)]
+    get_by_id = repository.get_by_id
+
+    def run():
+        for task_id in ids:
+            get_by_id(task_id)
+
+    best = min(timeit.repeat(run, number=1, repeat=3))
+    return best / LOOKUPS * 1e6
+
+
+def main():
+    print(f"{'size':>10} {'InMemory (us)':>15} {'Indexed (us)':>15}")
+    for size in SIZES:
+        in_memory = time_lookups(build(InMemoryTaskRepository, size), size)
+        indexed = time_lookups(build(IndexedTaskRepository, size), size)
+        print(f"{size:>10} {in_memory:>15.3f} {indexed:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Memory footprint per task for the different in-memory layouts.
+
+Measured with tracemalloc while building each store:
+
+* list of dict-backed dataclasses (the original Task layout)
+* list of slotted Task objects
+* IndexedTaskRepository holding slotted Task objects
+* ColumnarTaskRepository (typed columns plus an interned string table)
+
+Run from the project root:
+
+    python -m benchmarks.bench_memory [count]
+"""
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Optional
+
+from src.columnar_repository import ColumnarTaskRepository
+from src.models import Task
+from src.repository import IndexedTaskRepository
+
+
+@dataclass
+class DictTask:
+    """The original Task layout, with a per-instance __dict__"""
+    id: int
+    title: str
+    description: Optional[str] = None
+    completed: bool = False
+
+
+def _titles(count, distinct):
+    return [f"Task number {i % distinct}" for i in range(count)]
+
+
+def build_dict_list(titles):
+    return [DictTask(id=i, title=title) for i, title in enumerate(titles, start=1)]
+
+
+def build_slotted_list(titles):
+    return [Task(id=i, title=title) for i, title in enumerate(titles, start=1)]
+
+
+def build_indexed(titles):
+    repository = IndexedTaskRepository()
+    for i, title in enumerate(titles, start=1):
+        repository.add(Task(id=i, title=title))
+    return repository
+
+
+def build_columnar(titles):
+    repository = ColumnarTaskRepository()
+    for i, title in enumerate(titles, start=1):
+        repository.add(Task(id=i, title=title))
+    return repository
+
+
+def measure(builder, titles):
+    """Return bytes allocated per task while building and holding the store"""
+    tracemalloc.start()
+    store = builder(titles)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del store
+    return current / len(titles)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    layouts = [
+        ("dict dataclass list", build_dict_list),
+        ("slotted Task list", build_slotted_list),
+        ("indexed (slotted Task)", build_indexed),
+        ("columnar", build_columnar),
+    ]
+    # Title strings are created before tracing starts, so the figures are the
+    # storage overhead per task excluding the title payload itself
+    print(f"bytes per task, {count} tasks, excluding title payloads")
+    print(f"{'layout':<24} {'unique titles':>14} {'100 distinct':>14}")
+    for name, builder in layouts:
+        unique = measure(builder, _titles(count, count))
+        repeated = measure(builder, _titles(count, 100))
+        print(f"{name:<24} {unique:>14.1f} {repeated:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
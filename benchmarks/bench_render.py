@@ -0,0 +1,55 @@
+"""
+Benchmark: time to render a large task list.
+
+Compares the old one-print-per-line loop with TaskRenderer's chunked
+writes. Output goes to the null device through a line-buffered stream, as
+a terminal would be, so every newline flushed by print costs a write
+syscall; a block-buffered stream (as when piping) is shown for comparison.
+
+Run from the project root:
+
+    python -m benchmarks.bench_render [count]
+"""
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+from src.models import Task
+from src.render import TaskRenderer
+
+
+def print_per_line(tasks):
+    for task in tasks:
+        status = "✅" if task.completed else "⏳"
+        print(f"{task.id}. {status} {task.title}")
+        if task.description:
+            print(f"   📝 Description: {task.description}")
+
+
+def renderer_chunks(tasks):
+    TaskRenderer().write(tasks, show_description=True)
+
+
+def timed(render, tasks, buffering):
+    with open(os.devnull, 'w', encoding='utf-8', buffering=buffering) as sink, redirect_stdout(sink):
+        start = time.perf_counter()
+        render(tasks)
+        sys.stdout.flush()
+        return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    tasks = [Task(id=i, title=f"Task number {i}", description="Details" if i % 3 == 0 else None,
+                  completed=i % 2 == 0) for i in range(1, count + 1)]
+    print(f"rendering {count:,} tasks")
+    print(f"{'method':<22} {'line-buffered':>14} {'block-buffered':>15}")
+    for name, render in (("print per line", print_per_line), ("TaskRenderer chunks", renderer_chunks)):
+        terminal = min(timed(render, tasks, 1) for _ in range(3))
+        piped = min(timed(render, tasks, -1) for _ in range(3))
+        print(f"{name:<22} {terminal * 1000:>12.1f}ms {piped * 1000:>13.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
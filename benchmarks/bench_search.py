@@ -0,0 +1,75 @@
+"""
+Benchmark: full-text search latency on a large store.
+
+Builds an IndexedTaskRepository with synthetic titles and descriptions,
+indexes it through TodoService.search while another thread keeps adding
+tasks, and times single-term, multi-term and prefix queries. Reports
+200,000 and 1,000,000 tasks by default. Run from the project root:
+
+    python -m benchmarks.bench_search [count ...]
+"""
+import random
+import sys
+import threading
+import time
+
+from src.repository import IndexedTaskRepository
+from src.service import TodoService
+
+WORDS = [f"{syllable}{suffix}" for syllable in (
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+    "india", "juliet", "kilo", "lima", "mike", "november", "oscar", "papa",
+) for suffix in range(250)]
+
+QUERIES = ["alpha7", "bravo12 charlie3", "delta1*", "echo* golf9", "kilo100 lima200 mike3"]
+
+
+def build(count):
+    rng = random.Random(count)
+    service = TodoService(IndexedTaskRepository())
+    batch = []
+    for _ in range(count):
+        title = " ".join(rng.choices(WORDS, k=4))
+        description = " ".join(rng.choices(WORDS, k=8))
+        batch.append((title, description))
+        if len(batch) == 10_000:
+            service.add_tasks(batch)
+            batch.clear()
+    service.add_tasks(batch)
+    return service
+
+
+def run(count):
+    service = build(count)
+
+    # The first search builds the index; writers should not wait for it
+    searcher = threading.Thread(target=service.search, args=(QUERIES[0],))
+    start = time.perf_counter()
+    searcher.start()
+    stall = 0.0
+    while searcher.is_alive():
+        write_start = time.perf_counter()
+        service.add_task("alpha0 written during build")
+        stall = max(stall, time.perf_counter() - write_start)
+        time.sleep(0.01)
+    searcher.join()
+    print(f"{count} tasks, index built in {time.perf_counter() - start:.2f}s, "
+          f"longest add_task meanwhile {stall * 1000:.2f} ms")
+
+    for query in QUERIES:
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            results = service.search(query, limit=20)
+            timings.append(time.perf_counter() - start)
+        print(f"{query!r:<28} {min(timings) * 1000:8.2f} ms  ({len(results)} results)")
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [200_000, 1_000_000]
+    for count in counts:
+        run(count)
+
+
+if __name__ == "__main__":
+    main()
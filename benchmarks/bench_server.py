@@ -0,0 +1,142 @@
+"""
+Load generator for `todo serve`: requests per second and tail latency on
+loopback.
+
+Starts the server in a subprocess on a free port, seeds it with tasks, then
+opens a number of keep-alive connections that each keep a fixed number of
+requests pipelined for the given duration. The mix is 80% GET /tasks/<id>,
+10% POST /tasks and 10% PATCH /tasks/<id>. Latency is measured per request
+from write to response, so at depth > 1 it includes time queued behind the
+requests ahead of it on the connection.
+
+Run from the project root:
+
+    python -m benchmarks.bench_server [connections] [depth] [seconds] [backend]
+"""
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+SEED_TASKS = 10_000
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _request(method, path, body=None):
+    data = json.dumps(body).encode('utf-8') if body is not None else b""
+    return (f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n\r\n"
+            .encode('latin-1') + data)
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    body = await reader.readexactly(length)
+    return int(head.split(b" ", 2)[1]), body
+
+
+async def _wait_for_server(port, process):
+    while True:
+        if process.poll() is not None:
+            raise RuntimeError("Server exited before accepting connections")
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            await asyncio.sleep(0.05)
+            continue
+        writer.close()
+        return
+
+
+async def _seed(port):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for start in range(0, SEED_TASKS, 1000):
+        tasks = [{"title": f"Seed task {i}"} for i in range(start, min(start + 1000, SEED_TASKS))]
+        writer.write(_request("POST", "/tasks/batch", {"tasks": tasks}))
+        status, _ = await _read_response(reader)
+        if status != 201:
+            raise RuntimeError(f"Seeding failed with status {status}")
+    writer.close()
+
+
+async def _client(port, depth, deadline, latencies, errors, rng):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    sent = asyncio.Queue()
+
+    def send():
+        roll = rng.random()
+        task_id = rng.randint(1, SEED_TASKS)
+        if roll < 0.8:
+            request = _request("GET", f"/tasks/{task_id}")
+        elif roll < 0.9:
+            request = _request("POST", "/tasks", {"title": "Load test task"})
+        else:
+            request = _request("PATCH", f"/tasks/{task_id}", {"title": f"Renamed {task_id}"})
+        sent.put_nowait(time.perf_counter())
+        writer.write(request)
+
+    for _ in range(depth):
+        send()
+    while not sent.empty():
+        status, _ = await _read_response(reader)
+        latencies.append(time.perf_counter() - sent.get_nowait())
+        if status >= 400:
+            errors.append(status)
+        if time.perf_counter() < deadline:
+            send()
+    writer.close()
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def _load(port, connections, depth, seconds):
+    await _seed(port)
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(port, depth, start + seconds, latencies, errors, random.Random(i)) for i in range(connections)
+    ))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"{connections} connections x depth {depth}, {elapsed:.1f} s: {len(latencies):,} requests, "
+          f"{len(errors)} errors")
+    print(f"{len(latencies) / elapsed:,.0f} req/s   p50 {_percentile(latencies, 0.5) * 1000:.2f} ms   "
+          f"p99 {_percentile(latencies, 0.99) * 1000:.2f} ms   "
+          f"p99.9 {_percentile(latencies, 0.999) * 1000:.2f} ms")
+
+
+def main():
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+    backend = sys.argv[4] if len(sys.argv) > 4 else 'memory'
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as directory:
+        command = [sys.executable, "-m", "src.cli", "--backend", backend,
+                   "--db", os.path.join(directory, "todo.data"), "serve", "--port", str(port)]
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+        try:
+            asyncio.run(_wait_for_server(port, process))
+            asyncio.run(_load(port, connections, depth, seconds))
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: mixed-workload throughput of ShardedTaskRepository as the shard
+count grows, against a single-process ConcurrentTaskRepository baseline.
+
+Client threads share one TodoService. Each operation is drawn from a fixed
+mix: 60% reads by ID, 20% updates, 10% adds, 5% completions and 5% batch
+lookups of 50 IDs. Every run starts from the same preloaded store.
+
+Each sharded call pays a pipe round trip and pickling, so shards only win
+once they have cores of their own and enough work per call to amortise
+that; on a single core the in-process baseline stays ahead.
+
+Run from the project root:
+
+    python -m benchmarks.bench_sharded [tasks] [operations] [clients]
+"""
+import random
+import sys
+import threading
+import time
+
+from src.concurrency import ConcurrentTaskRepository
+from src.repository import IndexedTaskRepository
+from src.service import TodoService
+from src.sharded_repository import ShardedTaskRepository
+
+SHARD_COUNTS = (1, 2, 4, 8)
+
+
+def client(service, repository, task_count, operations, seed):
+    rng = random.Random(seed)
+    for _ in range(operations):
+        roll = rng.random()
+        task_id = rng.randint(1, task_count)
+        if roll < 0.60:
+            service.get_task(task_id)
+        elif roll < 0.80:
+            service.update_task(task_id, title=f"Task {task_id} v{rng.randint(1, 9)}")
+        elif roll < 0.90:
+            service.add_task("New task")
+        elif roll < 0.95:
+            service.complete_task(task_id)
+        else:
+            repository.get_many(rng.sample(range(1, task_count + 1), 50))
+
+
+def run(name, repository, task_count, operations, clients):
+    service = TodoService(repository)
+    service.add_tasks((f"Task {number}", None) for number in range(task_count))
+    per_client = operations // clients
+    threads = [threading.Thread(target=client,
+                               args=(service, repository, task_count, per_client, seed))
+               for seed in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    service.close()
+    total = per_client * clients
+    print(f"{name:<22} {elapsed:>9.3f}s {total / elapsed:>12,.0f} ops/s")
+
+
+def main():
+    task_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else 40_000
+    clients = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    print(f"{task_count:,} tasks, {operations:,} operations from {clients} client threads")
+    print(f"{'repository':<22} {'elapsed':>10} {'throughput':>12}")
+    run("in-process (locked)", ConcurrentTaskRepository(IndexedTaskRepository()),
+        task_count, operations, clients)
+    for shards in SHARD_COUNTS:
+        run(f"sharded x{shards}", ShardedTaskRepository(shards=shards), task_count, operations, clients)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: opening a memory-mapped binary snapshot against loading the same
+tasks from a JSONL export.
+
+Both files are written first. The JSONL path parses every line and builds
+every Task up front; the snapshot path maps the file and decodes tasks only
+when they are read. Reported for each: time to open, time for 10,000
+random lookups and the growth in resident memory after opening and after
+the lookups (Linux only, read from /proc/self/statm).
+
+Run from the project root:
+
+    python -m benchmarks.bench_snapshot [tasks]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from src.models import Task
+from src.repository import IndexedTaskRepository
+from src.snapshot_repository import SnapshotTaskRepository, write_snapshot
+
+LOOKUPS = 10_000
+
+
+def _rss_mib():
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except OSError:
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1 << 20)
+
+
+def _tasks(count):
+    return (Task(id=i, title=f"Task number {i}", description="Details" if i % 4 == 0 else None,
+                 completed=i % 3 == 0)
+            for i in range(1, count + 1))
+
+
+def _growth(before, after):
+    return f"{after - before:>12.1f}" if before is not None else f"{'n/a':>12}"
+
+
+def load_jsonl(path):
+    repository = IndexedTaskRepository()
+    with open(path, encoding='utf-8') as stream:
+        for line in stream:
+            record = json.loads(line)
+            repository.add(Task(id=record['id'], title=record['title'], description=record['description'],
+                                completed=record['completed']))
+    return repository
+
+
+def run(name, opener, path, ids):
+    before = _rss_mib()
+    start = time.perf_counter()
+    repository = opener(path)
+    opened = time.perf_counter() - start
+    after_open = _rss_mib()
+    start = time.perf_counter()
+    for task_id in ids:
+        repository.get_by_id(task_id)
+    looked_up = time.perf_counter() - start
+    print(f"{name:<10} {opened * 1000:>10.1f} {looked_up * 1000:>12.1f} "
+          f"{_growth(before, after_open)} {_growth(before, _rss_mib())}")
+    repository.close()
+
+
+def main():
+    count = int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(0)
+    ids = [rng.randint(1, count) for _ in range(LOOKUPS)]
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_path = os.path.join(directory, "todo.snap")
+        jsonl_path = os.path.join(directory, "todo.jsonl")
+        write_snapshot(snapshot_path, _tasks(count))
+        with open(jsonl_path, 'w', encoding='utf-8') as stream:
+            for task in _tasks(count):
+                stream.write(json.dumps({'id': task.id, 'title': task.title, 'description': task.description,
+                                         'completed': task.completed}) + "\n")
+        print(f"{count:,} tasks: snapshot {os.path.getsize(snapshot_path) / (1 << 20):,.1f} MiB, "
+              f"JSONL {os.path.getsize(jsonl_path) / (1 << 20):,.1f} MiB")
+        print(f"{'format':<10} {'open ms':>10} {'gets ms':>12} {'RSS open MiB':>12} {'RSS gets MiB':>12}")
+        run("snapshot", SnapshotTaskRepository, snapshot_path, ids)
+        run("jsonl", load_jsonl, jsonl_path, ids)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+"""
+Benchmark suite: TodoService against every TaskRepository implementation.
+
+For each backend, store size and workload the suite preloads a fresh store,
+then times individual service calls and reports throughput, p50/p99
+latency and the peak resident memory of the process that ran the case,
+with that of any worker processes it started (the sharded backend's)
+reported separately.
+Workloads:
+
+* read   - 90% get_task, 5% get_page, 5% update_task
+* write  - 20% get_task, 40% update_task, 20% add_task, 10% complete_task,
+           10% delete_task
+* scan   - get_all_tasks over the whole store
+
+Every case runs in its own child process so peak memory is not inflated by
+earlier cases. Nothing touches the network; persistent backends write to a
+temporary directory. Results are written as JSON and, when a baseline file
+exists, compared against it; a drop in throughput or a rise in p99 latency
+beyond the threshold is reported as a regression and the exit status is 1.
+Numbers only compare on the same interpreter and host, so the baseline
+records both and a baseline from another environment is not compared
+against; record one for this environment with --save-baseline.
+
+Run from the project root:
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --sizes 1e3,1e4,1e5,1e6,1e7 --backends memory,columnar,sqlite
+    python -m benchmarks.suite --save-baseline      # record the current numbers
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from queue import Empty
+
+from src.caching_repository import CachingTaskRepository
+from src.columnar_repository import ColumnarTaskRepository
+from src.concurrency import ConcurrentTaskRepository
+from src.log_repository import LogTaskRepository
+from src.mvcc_repository import MvccTaskRepository
+from src.repository import InMemoryTaskRepository, IndexedTaskRepository
+from src.service import TodoService
+from src.sharded_repository import ShardedTaskRepository
+from src.snapshot_repository import SnapshotTaskRepository
+from src.sqlite_repository import SqliteTaskRepository
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+WORKLOADS = ('read', 'write', 'scan')
+LOAD_CHUNK = 10_000
+# How often a parent waiting on a case checks that the child is still alive
+POLL_SECONDS = 1.0
+PAGE_SIZE = 20
+SCAN_OPERATIONS = 5
+
+# name -> (factory taking a scratch directory, largest size run by default).
+# Names match the CLI's --backend choices where the CLI offers the backend.
+# The list-backed store scans on every lookup, so it is capped where one
+# run would otherwise take minutes.
+BACKENDS = {
+    'memory': (lambda directory: IndexedTaskRepository(), None),
+    'list': (lambda directory: InMemoryTaskRepository(), 100_000),
+    'columnar': (lambda directory: ColumnarTaskRepository(), None),
+    'mvcc': (lambda directory: MvccTaskRepository(), None),
+    'sqlite': (lambda directory: SqliteTaskRepository(os.path.join(directory, "todo.db")), None),
+    'log': (lambda directory: LogTaskRepository(os.path.join(directory, "log")), None),
+    'snapshot': (lambda directory: SnapshotTaskRepository(os.path.join(directory, "todo.snap")), None),
+    'sharded': (lambda directory: ShardedTaskRepository(shards=4), None),
+    'concurrent': (lambda directory: ConcurrentTaskRepository(IndexedTaskRepository()), None),
+    'caching': (lambda directory: CachingTaskRepository(SqliteTaskRepository(os.path.join(directory, "todo.db"))),
+                None),
+}
+
+
+# -- Workloads ------------------------------------------------------------------
+
+class _LiveIds:
+    """IDs of the tasks currently in the store, with O(1) random pick and removal"""
+
+    def __init__(self, ids):
+        self._ids = list(ids)
+
+    def pick(self, rng):
+        return self._ids[rng.randrange(len(self._ids))]
+
+    def add(self, task_id):
+        self._ids.append(task_id)
+
+    def remove_random(self, rng):
+        index = rng.randrange(len(self._ids))
+        self._ids[index], self._ids[-1] = self._ids[-1], self._ids[index]
+        return self._ids.pop()
+
+    def __len__(self):
+        return len(self._ids)
+
+
+def _read_operation(service, live, rng):
+    roll = rng.random()
+    if roll < 0.90:
+        task_id = live.pick(rng)
+        return lambda: service.get_task(task_id)
+    if roll < 0.95:
+        after_id = live.pick(rng)
+        return lambda: service.get_page(PAGE_SIZE, after_id=after_id)
+    task_id = live.pick(rng)
+    return lambda: service.update_task(task_id, title=f"Task {task_id} renamed")
+
+
+def _write_operation(service, live, rng):
+    roll = rng.random()
+    if roll < 0.20:
+        task_id = live.pick(rng)
+        return lambda: service.get_task(task_id)
+    if roll < 0.60:
+        task_id = live.pick(rng)
+        return lambda: service.update_task(task_id, description="Updated")
+    if roll < 0.80 or len(live) < 2:
+        return lambda: live.add(service.add_task("New task").id)
+    if roll < 0.90:
+        task_id = live.pick(rng)
+        return lambda: service.complete_task(task_id)
+    task_id = live.remove_random(rng)
+    return lambda: service.delete_task(task_id)
+
+
+def _scan_operation(service, live, rng):
+    return service.get_all_tasks
+
+
+_OPERATIONS = {'read': _read_operation, 'write': _write_operation, 'scan': _scan_operation}
+
+
+# -- Running a case -------------------------------------------------------------
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _peak_rss_kb(children=False):
+    """
+    Peak resident set size in KiB of this process, or with children of the
+    largest of its finished child processes. The two peaks may fall at
+    different times, so they are reported apart rather than added.
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1024 if sys.platform == 'darwin' else 1
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    return resource.getrusage(who).ru_maxrss // scale
+
+
+def run_case(backend, size, workload, operations, max_seconds, seed=0):
+    """Preload a fresh store, run one workload against it and return the measurements"""
+    factory, _ = BACKENDS[backend]
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        service = TodoService(factory(directory))
+        loaded = []
+        for start in range(0, size, LOAD_CHUNK):
+            count = min(LOAD_CHUNK, size - start)
+            loaded.extend(task.id for task in service.add_tasks((f"Task {start + i}", None) for i in range(count)))
+        live = _LiveIds(loaded)
+        next_operation = _OPERATIONS[workload]
+        if workload == 'scan':
+            operations = SCAN_OPERATIONS
+
+        latencies = []
+        deadline = time.perf_counter() + max_seconds
+        elapsed = 0
+        for _ in range(operations):
+            operation = next_operation(service, live, rng)
+            begin = time.perf_counter_ns()
+            operation()
+            took = time.perf_counter_ns() - begin
+            latencies.append(took)
+            elapsed += took
+            if time.perf_counter() > deadline:
+                break
+        service.close()
+
+    latencies.sort()
+    return {
+        'backend': backend,
+        'size': size,
+        'workload': workload,
+        'operations': len(latencies),
+        'ops_per_sec': len(latencies) / (elapsed / 1e9) if elapsed else 0.0,
+        'p50_us': _percentile(latencies, 0.50) / 1000,
+        'p99_us': _percentile(latencies, 0.99) / 1000,
+        'peak_rss_kb': _peak_rss_kb(),
+        'children_peak_rss_kb': _peak_rss_kb(children=True),
+    }
+
+
+def _case_worker(queue, *args):
+    try:
+        queue.put((True, run_case(*args)))
+    except Exception as error:
+        queue.put((False, f"{type(error).__name__}: {error}"))
+
+
+def run_isolated(*args):
+    """Run one case in a child process so each peak memory figure starts from a clean process"""
+    context = multiprocessing.get_context()
+    queue = context.Queue()
+    process = context.Process(target=_case_worker, args=(queue, *args))
+    process.start()
+    while True:
+        try:
+            ok, result = queue.get(timeout=POLL_SECONDS)
+            break
+        except Empty:
+            if process.is_alive():
+                continue
+        # The child may have exited just after sending its result
+        try:
+            ok, result = queue.get(timeout=POLL_SECONDS)
+            break
+        except Empty:
+            process.join()
+            raise RuntimeError("{}/{}/{}: benchmark process exited with code {} before reporting"
+                               .format(*args[:3], process.exitcode)) from None
+    process.join()
+    if not ok:
+        raise RuntimeError(result)
+    return result
+
+
+# -- Baseline comparison --------------------------------------------------------
+
+def _key(result):
+    return (result['backend'], result['size'], result['workload'])
+
+
+def environment():
+    """The interpreter and host a run measured; results only compare when these match"""
+    return {
+        'implementation': platform.python_implementation(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'host': platform.node(),
+    }
+
+
+def environment_mismatches(current, baseline):
+    """Return 'key: baseline -> current' for each environment field that makes results incomparable"""
+    def minor(version):
+        return ".".join(version.split(".")[:2]) if version else version
+
+    mismatches = []
+    for key in ('implementation', 'python', 'machine', 'cpu_count', 'host'):
+        before, now = baseline.get(key), current.get(key)
+        if key == 'python':
+            before, now = minor(before), minor(now)
+        if before != now:
+            mismatches.append(f"{key}: {before} -> {now}")
+    return mismatches
+
+
+def compare(results, baseline, threshold):
+    """
+    Return a description of every regression against the baseline results.
+    Throughput may drop, and p99 latency rise, by at most threshold (a fraction).
+    """
+    previous = {_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(_key(result))
+        if before is None:
+            continue
+        name = "{}/{}/{}".format(*_key(result))
+        if result['ops_per_sec'] < before['ops_per_sec'] * (1 - threshold):
+            regressions.append(f"{name}: throughput {before['ops_per_sec']:,.0f} -> "
+                               f"{result['ops_per_sec']:,.0f} ops/s")
+        if result['p99_us'] > before['p99_us'] * (1 + threshold):
+            regressions.append(f"{name}: p99 {before['p99_us']:,.1f} -> {result['p99_us']:,.1f} us")
+    return regressions
+
+
+# -- Command line -----------------------------------------------------------------
+
+def _sizes(text):
+    return [int(float(size)) for size in text.split(',')]
+
+
+def _names(choices):
+    def parse(text):
+        names = text.split(',')
+        unknown = [name for name in names if name not in choices]
+        if unknown:
+            raise argparse.ArgumentTypeError(f"unknown: {', '.join(unknown)}")
+        return names
+    return parse
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--backends", type=_names(BACKENDS), default=list(BACKENDS),
+                        help=f"Comma-separated backends (default: {','.join(BACKENDS)})")
+    parser.add_argument("--sizes", type=_sizes, default=list(DEFAULT_SIZES),
+                        help="Comma-separated store sizes, e.g. 1e3,1e5,1e7 (default: 1e3,1e4,1e5)")
+    parser.add_argument("--workloads", type=_names(WORKLOADS), default=list(WORKLOADS),
+                        help=f"Comma-separated workloads (default: {','.join(WORKLOADS)})")
+    parser.add_argument("--operations", type=int, default=20_000, help="Operations per case (default: 20000)")
+    parser.add_argument("--max-seconds", type=float, default=5.0,
+                        help="Stop a case early after this many seconds of operations (default: 5)")
+    parser.add_argument("--all-sizes", action="store_true",
+                        help="Also run backends above their default size cap")
+    parser.add_argument("--output", default="benchmark-results.json",
+                        help="Where to write the results (default: benchmark-results.json)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="Baseline results to compare against (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results to the baseline file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed fractional slowdown before flagging a regression (default: 0.2)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = []
+    print(f"{'backend':<12} {'size':>10} {'workload':<6} {'ops/s':>12} {'p50 us':>10} {'p99 us':>10} "
+          f"{'peak MiB':>9} {'child MiB':>9}")
+    for backend in args.backends:
+        _, cap = BACKENDS[backend]
+        for size in args.sizes:
+            if cap is not None and size > cap and not args.all_sizes:
+                print(f"{backend:<12} {size:>10} skipped (above {cap:,}; use --all-sizes)")
+                continue
+            for workload in args.workloads:
+                result = run_isolated(backend, size, workload, args.operations, args.max_seconds)
+                results.append(result)
+                peaks = " ".join(f"{peak / 1024:>9.1f}" if peak is not None else f"{'n/a':>9}"
+                                 for peak in (result['peak_rss_kb'], result['children_peak_rss_kb']))
+                print(f"{backend:<12} {size:>10} {workload:<6} {result['ops_per_sec']:>12,.0f} "
+                      f"{result['p50_us']:>10.1f} {result['p99_us']:>10.1f} {peaks}")
+
+    report = {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            **environment(),
+            'operations': args.operations,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump(report, output, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+    with open(args.baseline, encoding='utf-8') as baseline:
+        baseline = json.load(baseline)
+    mismatches = environment_mismatches(report['meta'], baseline['meta'])
+    if mismatches:
+        print(f"Baseline {args.baseline} was recorded on another interpreter or host, so it is not compared:")
+        for mismatch in mismatches:
+            print(f"  {mismatch}")
+        print("Run with --save-baseline to record one for this environment")
+        return 0
+    regressions = compare(results, baseline['results'], args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
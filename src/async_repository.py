@@ -0,0 +1,375 @@
+import asyncio
+import sys
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from .concurrency import ConcurrentTaskRepository
+from .log_repository import LogTaskRepository
+from .models import MutationResult, MutationStatus, Task, TaskStats
+from .repository import TaskRepository
+
+# Tasks fetched per round trip while streaming with iter_tasks
+_PAGE_SIZE = 500
+
+
+class AsyncTaskRepository(ABC):
+    """Asynchronous counterpart of TaskRepository"""
+
+    @abstractmethod
+    async def get_all(self) -> List[Task]:
+        """Return all tasks"""
+        pass
+
+    @abstractmethod
+    async def get_by_id(self, task_id: int) -> Optional[Task]:
+        """Find task by ID"""
+        pass
+
+    @abstractmethod
+    async def add(self, task: Task) -> Task:
+        """Add a new task to the repository"""
+        pass
+
+    @abstractmethod
+    async def update(self, task_id: int, **updates) -> Optional[Task]:
+        """Update a task by ID"""
+        pass
+
+    @abstractmethod
+    async def delete(self, task_id: int) -> bool:
+        """Delete a task by ID"""
+        pass
+
+    @abstractmethod
+    async def generate_id(self) -> int:
+        """Generate next available ID"""
+        pass
+
+    async def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                         limit: Optional[int] = None) -> AsyncIterator[Task]:
+        """Yield tasks in ID order; this default sorts a full copy from get_all"""
+        count = 0
+        for task in sorted(await self.get_all(), key=lambda task: task.id):
+            if limit is not None and count >= limit:
+                return
+            if (after_id is None or task.id > after_id) and (completed is None or task.completed == completed):
+                count += 1
+                yield task
+
+    async def task_stats(self) -> TaskStats:
+        """Return total and completed task counts; this default counts every task"""
+        stats = TaskStats()
+        async for task in self.iter_tasks():
+            stats.total += 1
+            stats.completed += task.completed
+        return stats
+
+    async def update_if(self, task_id: int, expected_version: Optional[int] = None, **updates) -> MutationResult:
+        """
+        Update a task only if it exists and, when expected_version is given,
+        is still at that version. This default looks the task up and then
+        calls update.
+        """
+        task = await self.get_by_id(task_id)
+        if task is None:
+            return MutationResult(MutationStatus.NOT_FOUND)
+        if expected_version is not None and task.version != expected_version:
+            return MutationResult(MutationStatus.CONFLICT, task)
+        return MutationResult(MutationStatus.OK, await self.update(task_id, **updates))
+
+    async def complete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Mark a task as completed, subject to the same checks as update_if"""
+        return await self.update_if(task_id, expected_version, completed=True)
+
+    async def delete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Delete a task, subject to the same checks as update_if"""
+        task = await self.get_by_id(task_id)
+        if task is None:
+            return MutationResult(MutationStatus.NOT_FOUND)
+        if expected_version is not None and task.version != expected_version:
+            return MutationResult(MutationStatus.CONFLICT, task)
+        await self.delete(task_id)
+        return MutationResult(MutationStatus.OK, task)
+
+    async def get_many(self, task_ids: Iterable[int]) -> Dict[int, Task]:
+        """Find several tasks by ID; missing IDs are left out of the result"""
+        found = {}
+        for task_id in task_ids:
+            task = await self.get_by_id(task_id)
+            if task is not None:
+                found[task_id] = task
+        return found
+
+    async def add_many(self, tasks: List[Task]) -> List[Task]:
+        """Add a batch of tasks"""
+        return [await self.add(task) for task in tasks]
+
+    async def update_many(self, updates: Dict[int, Dict]) -> List[Task]:
+        """Apply per-task field updates; returns the tasks that were found"""
+        updated = []
+        for task_id, fields in updates.items():
+            task = await self.update(task_id, **fields)
+            if task is not None:
+                updated.append(task)
+        return updated
+
+    async def delete_many(self, task_ids: Iterable[int]) -> int:
+        """Delete a batch of tasks; returns how many were deleted"""
+        deleted = 0
+        for task_id in task_ids:
+            if await self.delete(task_id):
+                deleted += 1
+        return deleted
+
+    async def generate_ids(self, count: int) -> List[int]:
+        """Reserve a block of IDs"""
+        return [await self.generate_id() for _ in range(count)]
+
+    async def close(self) -> None:
+        """Release any resources held by the repository"""
+        pass
+
+
+class ThreadPoolTaskRepository(AsyncTaskRepository):
+    """
+    Runs a synchronous TaskRepository on a bounded thread pool so slow
+    storage never blocks the event loop. With more than one worker the
+    repository is wrapped in ConcurrentTaskRepository, so backends that are
+    not thread-safe can be used as-is.
+    """
+
+    def __init__(self, repository: TaskRepository, max_workers: int = 4):
+        if max_workers > 1 and not isinstance(repository, ConcurrentTaskRepository):
+            repository = ConcurrentTaskRepository(repository)
+        self._repository = repository
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="todo-repo")
+
+    async def _call(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(function, *args, **kwargs))
+
+    async def get_all(self) -> List[Task]:
+        """Return all tasks"""
+        return await self._call(self._repository.get_all)
+
+    async def get_by_id(self, task_id: int) -> Optional[Task]:
+        """Find task by ID"""
+        return await self._call(self._repository.get_by_id, task_id)
+
+    async def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                         limit: Optional[int] = None) -> AsyncIterator[Task]:
+        """Yield tasks in ID order, fetching one page per thread-pool round trip"""
+        cursor = after_id
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_size = _PAGE_SIZE if remaining is None else min(_PAGE_SIZE, remaining)
+            page = await self._call(
+                lambda: list(self._repository.iter_tasks(completed=completed, after_id=cursor, limit=page_size))
+            )
+            for task in page:
+                yield task
+            if len(page) < page_size:
+                return
+            cursor = page[-1].id
+            if remaining is not None:
+                remaining -= len(page)
+
+    async def get_many(self, task_ids: Iterable[int]) -> Dict[int, Task]:
+        """Find several tasks by ID"""
+        return await self._call(self._repository.get_many, list(task_ids))
+
+    async def task_stats(self) -> TaskStats:
+        """Return task counts"""
+        return await self._call(self._repository.task_stats)
+
+    async def add(self, task: Task) -> Task:
+        """Add a new task to the repository"""
+        return await self._call(self._repository.add, task)
+
+    async def add_many(self, tasks: List[Task]) -> List[Task]:
+        """Add a batch of tasks"""
+        return await self._call(self._repository.add_many, tasks)
+
+    async def update(self, task_id: int, **updates) -> Optional[Task]:
+        """Update a task by ID"""
+        return await self._call(self._repository.update, task_id, **updates)
+
+    async def update_many(self, updates: Dict[int, Dict]) -> List[Task]:
+        """Apply per-task field updates"""
+        return await self._call(self._repository.update_many, updates)
+
+    async def update_if(self, task_id: int, expected_version: Optional[int] = None, **updates) -> MutationResult:
+        """Conditionally update a task in one thread-pool round trip"""
+        return await self._call(self._repository.update_if, task_id, expected_version, **updates)
+
+    async def complete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally mark a task as completed"""
+        return await self._call(self._repository.complete_if, task_id, expected_version)
+
+    async def delete(self, task_id: int) -> bool:
+        """Delete a task by ID"""
+        return await self._call(self._repository.delete, task_id)
+
+    async def delete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally delete a task in one thread-pool round trip"""
+        return await self._call(self._repository.delete_if, task_id, expected_version)
+
+    async def delete_many(self, task_ids: Iterable[int]) -> int:
+        """Delete a batch of tasks"""
+        return await self._call(self._repository.delete_many, list(task_ids))
+
+    async def generate_id(self) -> int:
+        """Generate next available ID"""
+        return await self._call(self._repository.generate_id)
+
+    async def generate_ids(self, count: int) -> List[int]:
+        """Reserve a block of IDs"""
+        return await self._call(self._repository.generate_ids, count)
+
+    async def close(self) -> None:
+        """Close the wrapped repository and shut the pool down"""
+        await self._call(self._repository.close)
+        self._executor.shutdown(wait=True)
+
+
+class AsyncLogTaskRepository(AsyncTaskRepository):
+    """
+    Natively asynchronous durable repository using the operation-log format
+    of LogTaskRepository.
+
+    State lives in memory, so reads and mutations run directly on the event
+    loop. A mutation appends its record to the log buffer and then waits for
+    a group commit: one flush-and-fsync, run on a worker thread, covers every
+    record appended before it started, so thousands of concurrent writers
+    share a handful of fsyncs. Snapshots are also written off the loop.
+
+    Create instances with ``await AsyncLogTaskRepository.open(directory)``.
+    """
+
+    def __init__(self, store: LogTaskRepository, snapshot_every: int = 10_000):
+        self._store = store
+        self._snapshot_every = snapshot_every
+        # Guards the store against mutation while a snapshot is written off-loop
+        self._lock = asyncio.Lock()
+        self._appended: int = 0
+        self._synced: int = 0
+        self._flushing: Optional[asyncio.Future] = None
+
+    @classmethod
+    async def open(cls, directory: str, snapshot_every: int = 10_000) -> "AsyncLogTaskRepository":
+        """Recover the store from disk without blocking the event loop"""
+        # The async layer decides when to fsync and snapshot
+        store = await asyncio.to_thread(
+            LogTaskRepository, directory,
+            sync_every=sys.maxsize, sync_interval=float('inf'), snapshot_every=sys.maxsize,
+        )
+        return cls(store, snapshot_every)
+
+    async def _commit(self) -> None:
+        """Wait until every record appended so far is durable"""
+        target = self._appended
+        while self._synced < target:
+            if self._flushing is None:
+                self._flushing = asyncio.ensure_future(self._flush())
+            await asyncio.shield(self._flushing)
+
+    async def _flush(self) -> None:
+        try:
+            covered = self._appended
+            await asyncio.to_thread(self._store.flush)
+            self._synced = covered
+            if self._store.log_records >= self._snapshot_every:
+                async with self._lock:
+                    await asyncio.to_thread(self._store.compact)
+        finally:
+            self._flushing = None
+
+    async def _mutate(self, function, *args, **kwargs):
+        async with self._lock:
+            result = function(*args, **kwargs)
+            self._appended += 1
+        await self._commit()
+        return result
+
+    async def get_all(self) -> List[Task]:
+        """Return all tasks"""
+        return self._store.get_all()
+
+    async def get_by_id(self, task_id: int) -> Optional[Task]:
+        """Find task by ID"""
+        return self._store.get_by_id(task_id)
+
+    async def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                         limit: Optional[int] = None) -> AsyncIterator[Task]:
+        """Yield tasks in ID order, one page at a time"""
+        cursor = after_id
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_size = _PAGE_SIZE if remaining is None else min(_PAGE_SIZE, remaining)
+            page = list(self._store.iter_tasks(completed=completed, after_id=cursor, limit=page_size))
+            for task in page:
+                yield task
+            if len(page) < page_size:
+                return
+            cursor = page[-1].id
+            if remaining is not None:
+                remaining -= len(page)
+
+    async def get_many(self, task_ids: Iterable[int]) -> Dict[int, Task]:
+        """Find several tasks by ID"""
+        return self._store.get_many(task_ids)
+
+    async def task_stats(self) -> TaskStats:
+        """Return task counts from the in-memory state"""
+        return self._store.task_stats()
+
+    async def add(self, task: Task) -> Task:
+        """Add a new task and wait for it to be durable"""
+        return await self._mutate(self._store.add, task)
+
+    async def add_many(self, tasks: List[Task]) -> List[Task]:
+        """Add a batch of tasks and wait for it to be durable"""
+        return await self._mutate(self._store.add_many, tasks)
+
+    async def update(self, task_id: int, **updates) -> Optional[Task]:
+        """Update a task and wait for the change to be durable"""
+        return await self._mutate(self._store.update, task_id, **updates)
+
+    async def update_many(self, updates: Dict[int, Dict]) -> List[Task]:
+        """Apply per-task field updates and wait for them to be durable"""
+        return await self._mutate(self._store.update_many, updates)
+
+    async def update_if(self, task_id: int, expected_version: Optional[int] = None, **updates) -> MutationResult:
+        """Conditionally update a task and wait for a successful change to be durable"""
+        return await self._mutate(self._store.update_if, task_id, expected_version, **updates)
+
+    async def complete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally mark a task as completed and wait for it to be durable"""
+        return await self._mutate(self._store.complete_if, task_id, expected_version)
+
+    async def delete(self, task_id: int) -> bool:
+        """Delete a task and wait for the delete to be durable"""
+        return await self._mutate(self._store.delete, task_id)
+
+    async def delete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally delete a task and wait for a successful delete to be durable"""
+        return await self._mutate(self._store.delete_if, task_id, expected_version)
+
+    async def delete_many(self, task_ids: Iterable[int]) -> int:
+        """Delete a batch of tasks and wait for the deletes to be durable"""
+        return await self._mutate(self._store.delete_many, list(task_ids))
+
+    async def generate_id(self) -> int:
+        """Generate next available ID"""
+        return self._store.generate_id()
+
+    async def generate_ids(self, count: int) -> List[int]:
+        """Reserve a block of IDs"""
+        return self._store.generate_ids(count)
+
+    async def close(self) -> None:
+        """Flush outstanding records and close the log"""
+        await self._commit()
+        async with self._lock:
+            await asyncio.to_thread(self._store.close)
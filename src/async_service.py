@@ -0,0 +1,219 @@
+import asyncio
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from .async_repository import AsyncTaskRepository
+from .models import Task, TaskStats
+from .search import SearchIndex
+from .service import TaskNotFoundError, require_applied
+
+
+class AsyncTodoService:
+    def __init__(self, repository: AsyncTaskRepository):
+        """
+        Asynchronous counterpart of TodoService with the same validation rules.
+        The repository is injected, so any AsyncTaskRepository can be used.
+        """
+        self._repository = repository
+        # Built on the first search, then kept current by every mutation below
+        self._search_index: Optional[SearchIndex] = None
+        # Changes made while that first build runs, replayed into the index
+        # before it is used; None when no build is running
+        self._index_backlog: Optional[List[Tuple[int, Optional[Task]]]] = None
+        # Makes batch check-then-act sequences and search index maintenance atomic
+        # across awaiting coroutines; single-task writes rely on the repository's
+        # version checks and only take it to bring the index up to date afterwards
+        self._lock = asyncio.Lock()
+        self._index_built = asyncio.Condition(self._lock)
+
+    async def add_task(self, title: str, description: Optional[str] = None) -> Task:
+        """Add a new task with validation"""
+        if not title or not title.strip():
+            raise ValueError("Title cannot be empty")
+
+        new_id = await self._repository.generate_id()
+        task = Task(id=new_id, title=title.strip(), description=description, completed=False)
+        task = await self._repository.add(task)
+        self._index_changes(added=[task])
+        return task
+
+    async def get_all_tasks(self) -> List[Task]:
+        """Get all tasks"""
+        return await self._repository.get_all()
+
+    async def get_task(self, task_id: int) -> Optional[Task]:
+        """Get a single task by ID"""
+        return await self._repository.get_by_id(task_id)
+
+    async def stats(self) -> TaskStats:
+        """Get total, completed and pending task counts"""
+        return await self._repository.task_stats()
+
+    def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                   limit: Optional[int] = None) -> AsyncIterator[Task]:
+        """Lazily iterate tasks in ID order, optionally filtered by status and resuming after a cursor ID"""
+        return self._repository.iter_tasks(completed=completed, after_id=after_id, limit=limit)
+
+    async def get_page(self, limit: int, completed: Optional[bool] = None,
+                       after_id: Optional[int] = None) -> Tuple[List[Task], Optional[int]]:
+        """Get one page of tasks and the cursor for the next page (None on the last page)"""
+        if limit <= 0:
+            raise ValueError("Page size must be positive")
+        tasks = [task async for task in self._repository.iter_tasks(
+            completed=completed, after_id=after_id, limit=limit + 1)]
+        if len(tasks) > limit:
+            return tasks[:limit], tasks[limit - 1].id
+        return tasks, None
+
+    async def update_task(self, task_id: int, title: Optional[str] = None,
+                          description: Optional[str] = None,
+                          expected_version: Optional[int] = None) -> Optional[Task]:
+        """Update task with validation, optionally only if it is still at expected_version"""
+        updates = {}
+        if title is not None:
+            if not title.strip():
+                raise ValueError("Title cannot be empty")
+            updates['title'] = title.strip()
+        if description is not None:
+            updates['description'] = description
+
+        result = await self._repository.update_if(task_id, expected_version, **updates)
+        task = require_applied(task_id, result)
+        await self._reindex([task_id])
+        return task
+
+    async def complete_task(self, task_id: int, expected_version: Optional[int] = None) -> bool:
+        """Mark task as completed"""
+        require_applied(task_id, await self._repository.complete_if(task_id, expected_version))
+        return True
+
+    async def delete_task(self, task_id: int, expected_version: Optional[int] = None) -> bool:
+        """Delete task with validation"""
+        require_applied(task_id, await self._repository.delete_if(task_id, expected_version))
+        await self._reindex([task_id])
+        return True
+
+    def _index_changes(self, added: Iterable[Task] = (), removed: Iterable[int] = ()) -> None:
+        """Apply written tasks and deletions to the search index, or queue them during its build"""
+        if self._search_index is not None:
+            self._search_index.add_many(added)
+            for task_id in removed:
+                self._search_index.remove(task_id)
+        elif self._index_backlog is not None:
+            self._index_backlog.extend((task.id, task) for task in added)
+            self._index_backlog.extend((task_id, None) for task_id in removed)
+
+    async def _reindex(self, task_ids: List[int]) -> None:
+        """
+        Bring the search index in line with the stored state of tasks written
+        without _lock; read under _lock, so the last coroutine to get here
+        indexes the latest version even if the writes finished out of order.
+        """
+        if self._search_index is None and self._index_backlog is None:
+            return
+        async with self._lock:
+            found = await self._repository.get_many(task_ids)
+            self._index_changes(added=[found[task_id] for task_id in task_ids if task_id in found],
+                                removed=[task_id for task_id in task_ids if task_id not in found])
+
+    async def _ensure_search_index(self) -> SearchIndex:
+        """Return the search index, building it on first use without holding _lock"""
+        async with self._lock:
+            while self._search_index is None and self._index_backlog is not None:
+                await self._index_built.wait()
+            if self._search_index is not None:
+                return self._search_index
+            self._index_backlog = []
+        index = SearchIndex()
+        built = False
+        try:
+            async for task in self._repository.iter_tasks():
+                index.add(task)
+            built = True
+        finally:
+            backlog, self._index_backlog = self._index_backlog, None
+            if built:
+                for task_id, task in backlog:
+                    if task is None:
+                        index.remove(task_id)
+                    else:
+                        index.add(task)
+                self._search_index = index
+            async with self._lock:
+                self._index_built.notify_all()
+        return index
+
+    async def _require_existing(self, task_ids: List[int]) -> Dict[int, Task]:
+        """Look up a batch of tasks at once, raising if any of them is missing"""
+        found = await self._repository.get_many(task_ids)
+        missing = [task_id for task_id in task_ids if task_id not in found]
+        if len(missing) == 1:
+            raise TaskNotFoundError(f"Task with ID {missing[0]} does not exist")
+        if missing:
+            raise TaskNotFoundError(f"Tasks with IDs {', '.join(map(str, missing))} do not exist")
+        return found
+
+    async def add_tasks(self, tasks: Iterable[Tuple]) -> List[Task]:
+        """
+        Add a batch of (title, description) pairs, or (title, description, completed)
+        triples; nothing is added if any title is invalid
+        """
+        entries = []
+        for title, description, *completed in tasks:
+            if not title or not title.strip():
+                raise ValueError("Title cannot be empty")
+            entries.append((title.strip(), description, bool(completed and completed[0])))
+        if not entries:
+            return []
+
+        new_ids = await self._repository.generate_ids(len(entries))
+        added = await self._repository.add_many([
+            Task(id=new_id, title=title, description=description, completed=completed)
+            for new_id, (title, description, completed) in zip(new_ids, entries)
+        ])
+        self._index_changes(added=added)
+        return added
+
+    async def update_tasks(self, updates: Iterable[Tuple[int, Optional[str], Optional[str]]]) -> List[Task]:
+        """Update a batch of (task_id, title, description) entries after validating all of them"""
+        changes: Dict[int, Dict] = {}
+        for task_id, title, description in updates:
+            fields = changes.setdefault(task_id, {})
+            if title is not None:
+                if not title.strip():
+                    raise ValueError("Title cannot be empty")
+                fields['title'] = title.strip()
+            if description is not None:
+                fields['description'] = description
+        async with self._lock:
+            await self._require_existing(list(changes))
+            updated = await self._repository.update_many(changes)
+            self._index_changes(added=updated)
+            return updated
+
+    async def complete_tasks(self, task_ids: Iterable[int]) -> int:
+        """Mark a batch of tasks as completed; returns how many were updated"""
+        task_ids = list(dict.fromkeys(task_ids))
+        async with self._lock:
+            await self._require_existing(task_ids)
+            updated = await self._repository.update_many({task_id: {'completed': True} for task_id in task_ids})
+            return len(updated)
+
+    async def delete_tasks(self, task_ids: Iterable[int]) -> int:
+        """Delete a batch of tasks; nothing is deleted if any ID does not exist"""
+        task_ids = list(dict.fromkeys(task_ids))
+        async with self._lock:
+            await self._require_existing(task_ids)
+            deleted = await self._repository.delete_many(task_ids)
+            self._index_changes(removed=task_ids)
+            return deleted
+
+    async def search(self, query: str, limit: Optional[int] = 20) -> List[Task]:
+        """Full-text search over titles and descriptions, best matches first"""
+        if not query or not query.strip():
+            raise ValueError("Search query cannot be empty")
+        hits = (await self._ensure_search_index()).search(query, limit)
+        found = await self._repository.get_many([task_id for task_id, _ in hits])
+        return [found[task_id] for task_id, _ in hits if task_id in found]
+
+    async def close(self) -> None:
+        """Release resources held by the underlying repository"""
+        await self._repository.close()
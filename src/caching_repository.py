@@ -0,0 +1,243 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .models import MutationResult, Task, TaskQuery, TaskStats
+from .repository import TaskRepository
+
+
+@dataclass
+class CacheStats:
+    """Counters for sizing a CachingTaskRepository"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    page_hits: int = 0
+    page_misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class CachingTaskRepository(TaskRepository):
+    """
+    Read-through cache in front of any TaskRepository.
+
+    Tasks are cached by ID up to max_size entries and the least recently
+    used entry is evicted first. Every write invalidates the entries it
+    touches. With cache_pages enabled, get_all and iter_tasks pages are
+    cached too, up to max_pages results; any write drops all cached pages.
+
+    Cached Task objects are handed out as-is, so callers must not modify
+    them directly.
+    """
+
+    def __init__(self, repository: TaskRepository, max_size: int = 10_000,
+                 cache_pages: bool = False, max_pages: int = 64):
+        if max_size <= 0:
+            raise ValueError("Cache size must be positive")
+        self._repository = repository
+        self._max_size = max_size
+        self._cache_pages = cache_pages
+        self._max_pages = max_pages
+        self._tasks: "OrderedDict[int, Task]" = OrderedDict()
+        self._pages: "OrderedDict[Tuple, List[Task]]" = OrderedDict()
+        self._stats = CacheStats()
+        # Bumped by every write so a read that raced with it does not cache stale data
+        self._generation: int = 0
+        # The LRU order changes on every read, so reads need the lock too
+        self._lock = threading.Lock()
+
+    def cache_stats(self) -> CacheStats:
+        """Return a copy of the hit, miss and eviction counters"""
+        with self._lock:
+            return CacheStats(**vars(self._stats))
+
+    def clear(self) -> None:
+        """Drop every cached task and page"""
+        with self._lock:
+            self._tasks.clear()
+            self._pages.clear()
+
+    # -- Cache bookkeeping ----------------------------------------------------
+
+    def _remember(self, task: Task) -> None:
+        tasks = self._tasks
+        tasks[task.id] = task
+        tasks.move_to_end(task.id)
+        if len(tasks) > self._max_size:
+            tasks.popitem(last=False)
+            self._stats.evictions += 1
+
+    def _invalidate(self, task_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._generation += 1
+            for task_id in task_ids:
+                self._tasks.pop(task_id, None)
+            self._pages.clear()
+
+    def _cached_page(self, key: Tuple, load) -> List[Task]:
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                self._pages.move_to_end(key)
+                self._stats.page_hits += 1
+                return page
+            self._stats.page_misses += 1
+            generation = self._generation
+        page = load()
+        with self._lock:
+            if generation != self._generation:
+                return page
+            self._pages[key] = page
+            if len(self._pages) > self._max_pages:
+                self._pages.popitem(last=False)
+        return page
+
+    # -- Reads ----------------------------------------------------------------
+
+    def get_all(self) -> List[Task]:
+        """Return all tasks"""
+        if not self._cache_pages:
+            return self._repository.get_all()
+        return list(self._cached_page(('all',), self._repository.get_all))
+
+    def get_by_id(self, task_id: int) -> Optional[Task]:
+        """Find task by ID, reading through to the backend on a miss"""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is not None:
+                self._tasks.move_to_end(task_id)
+                self._stats.hits += 1
+                return task
+            self._stats.misses += 1
+            generation = self._generation
+        task = self._repository.get_by_id(task_id)
+        if task is not None:
+            with self._lock:
+                if generation == self._generation:
+                    self._remember(task)
+        return task
+
+    def get_many(self, task_ids: Iterable[int]) -> Dict[int, Task]:
+        """Find several tasks by ID, fetching all misses with one backend call"""
+        task_ids = list(dict.fromkeys(task_ids))
+        found: Dict[int, Task] = {}
+        missing = []
+        with self._lock:
+            for task_id in task_ids:
+                task = self._tasks.get(task_id)
+                if task is not None:
+                    self._tasks.move_to_end(task_id)
+                    found[task_id] = task
+                else:
+                    missing.append(task_id)
+            self._stats.hits += len(found)
+            self._stats.misses += len(missing)
+            generation = self._generation
+        if missing:
+            loaded = self._repository.get_many(missing)
+            with self._lock:
+                if generation == self._generation:
+                    for task in loaded.values():
+                        self._remember(task)
+            found.update(loaded)
+        return {task_id: found[task_id] for task_id in task_ids if task_id in found}
+
+    def task_stats(self) -> TaskStats:
+        """Return task counts; backends keep these as counters, so they are not cached"""
+        return self._repository.task_stats()
+
+    def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                   limit: Optional[int] = None) -> Iterator[Task]:
+        """Yield tasks in ID order; bounded pages are served from the page cache when enabled"""
+        if not self._cache_pages or limit is None:
+            return self._repository.iter_tasks(completed=completed, after_id=after_id, limit=limit)
+        page = self._cached_page(
+            ('page', completed, after_id, limit),
+            lambda: list(self._repository.iter_tasks(completed=completed, after_id=after_id, limit=limit)),
+        )
+        return iter(page)
+
+    def query(self, query: TaskQuery) -> Iterator[Task]:
+        """Yield the tasks matching a query; queries go straight to the backend"""
+        return self._repository.query(query)
+
+    # -- Writes ---------------------------------------------------------------
+
+    def add(self, task: Task) -> Task:
+        """Add a new task to the repository"""
+        result = self._repository.add(task)
+        self._invalidate((task.id,))
+        return result
+
+    def add_many(self, tasks: List[Task]) -> List[Task]:
+        """Add a batch of tasks"""
+        result = self._repository.add_many(tasks)
+        self._invalidate(task.id for task in tasks)
+        return result
+
+    def update(self, task_id: int, **updates) -> Optional[Task]:
+        """Update a task by ID"""
+        result = self._repository.update(task_id, **updates)
+        self._invalidate((task_id,))
+        return result
+
+    def update_many(self, updates: Dict[int, Dict]) -> List[Task]:
+        """Apply per-task field updates"""
+        result = self._repository.update_many(updates)
+        self._invalidate(updates)
+        return result
+
+    def update_if(self, task_id: int, expected_version: Optional[int] = None, **updates) -> MutationResult:
+        """Conditionally update a task; a failed check leaves the cache untouched"""
+        result = self._repository.update_if(task_id, expected_version, **updates)
+        if result.ok:
+            self._invalidate((task_id,))
+        return result
+
+    def complete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally mark a task as completed"""
+        result = self._repository.complete_if(task_id, expected_version)
+        if result.ok:
+            self._invalidate((task_id,))
+        return result
+
+    def delete(self, task_id: int) -> bool:
+        """Delete a task by ID"""
+        result = self._repository.delete(task_id)
+        self._invalidate((task_id,))
+        return result
+
+    def delete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally delete a task"""
+        result = self._repository.delete_if(task_id, expected_version)
+        if result.ok:
+            self._invalidate((task_id,))
+        return result
+
+    def delete_many(self, task_ids: Iterable[int]) -> int:
+        """Delete a batch of tasks"""
+        task_ids = list(task_ids)
+        result = self._repository.delete_many(task_ids)
+        self._invalidate(task_ids)
+        return result
+
+    def generate_id(self) -> int:
+        """Generate next available ID"""
+        return self._repository.generate_id()
+
+    def generate_ids(self, count: int) -> List[int]:
+        """Reserve a block of IDs"""
+        return self._repository.generate_ids(count)
+
+    def flush(self) -> None:
+        """Flush the wrapped repository"""
+        self._repository.flush()
+
+    def close(self) -> None:
+        """Close the wrapped repository"""
+        self.clear()
+        self._repository.close()
@@ -0,0 +1,275 @@
+import threading
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .models import MutationResult, Task, TaskQuery, TaskStats
+from .repository import TaskRepository
+
+
+class ChangeKind(Enum):
+    ADDED = "added"
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+
+@dataclass(slots=True, frozen=True)
+class ChangeEvent:
+    """
+    One change to the store. task is a copy of the task after the change,
+    or None for a deletion.
+    """
+    sequence: int
+    kind: ChangeKind
+    task_id: int
+    task: Optional[Task] = None
+
+
+class ChangeFeedGapError(ValueError):
+    """Raised when a reader asks for events that have already left the ring buffer"""
+
+    def __init__(self, after: int, oldest: int):
+        super().__init__(f"Events after {after} are no longer buffered; the oldest is {oldest}")
+        self.after = after
+        self.oldest = oldest
+
+
+class ChangeFeed:
+    """
+    Bounded, sequenced log of changes kept in a ring buffer.
+
+    Events are numbered from 1 in the order they were published. The last
+    capacity events are kept; a reader that falls further behind than that
+    gets ChangeFeedGapError and has to rescan the store, then resume from
+    last_sequence as it was before the rescan. Readers wait for events
+    with read(after, ...), which returns every buffered event after that
+    sequence up to max_events, so a slow reader catches up in a few large
+    batches rather than one wake-up per change. Writers publishing several
+    events at once wake readers once.
+    """
+
+    def __init__(self, capacity: int = 10_000):
+        if capacity <= 0:
+            raise ValueError("Change feed capacity must be positive")
+        self._capacity = capacity
+        self._events: List[Optional[ChangeEvent]] = [None] * capacity
+        self._next_sequence: int = 1
+        self._closed = False
+        self._lock = threading.Lock()
+        self._published = threading.Condition(self._lock)
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def last_sequence(self) -> int:
+        """Sequence of the newest event, 0 before the first one"""
+        with self._lock:
+            return self._next_sequence - 1
+
+    @property
+    def oldest_sequence(self) -> int:
+        """Sequence of the oldest event still buffered"""
+        with self._lock:
+            return self._oldest()
+
+    def _oldest(self) -> int:
+        return max(1, self._next_sequence - self._capacity)
+
+    def publish(self, changes: Iterable[Tuple[ChangeKind, int, Optional[Task]]]) -> int:
+        """
+        Append (kind, task ID, task) changes as consecutive events and wake
+        readers once. Tasks are copied. Returns the last sequence assigned.
+        """
+        with self._lock:
+            events, capacity = self._events, self._capacity
+            published = False
+            for kind, task_id, task in changes:
+                sequence = self._next_sequence
+                events[sequence % capacity] = ChangeEvent(
+                    sequence, kind, task_id, replace(task) if task is not None else None)
+                self._next_sequence = sequence + 1
+                published = True
+            if published:
+                self._published.notify_all()
+            return self._next_sequence - 1
+
+    def read(self, after: int, max_events: int = 1000, timeout: Optional[float] = 0) -> List[ChangeEvent]:
+        """
+        Return up to max_events events with sequence greater than after, in
+        order. When there are none, wait up to timeout seconds (None waits
+        until an event arrives or the feed is closed); an empty list means
+        nothing was published in time.
+        """
+        if max_events <= 0:
+            raise ValueError("max_events must be positive")
+        with self._lock:
+            if after >= self._next_sequence - 1 and timeout != 0:
+                self._published.wait_for(lambda: self._closed or after < self._next_sequence - 1, timeout)
+            oldest = self._oldest()
+            if after + 1 < oldest:
+                raise ChangeFeedGapError(after, oldest)
+            last = min(self._next_sequence - 1, after + max_events)
+            events, capacity = self._events, self._capacity
+            return [events[sequence % capacity] for sequence in range(after + 1, last + 1)]
+
+    def subscribe(self, after: Optional[int] = None) -> "Subscription":
+        """Start reading after a sequence number; by default only new events are read"""
+        return Subscription(self, self.last_sequence if after is None else after)
+
+    def close(self) -> None:
+        """Wake every waiting reader; reads no longer wait afterwards"""
+        with self._lock:
+            self._closed = True
+            self._published.notify_all()
+
+
+class Subscription:
+    """A reader's position in a ChangeFeed"""
+
+    def __init__(self, feed: ChangeFeed, after: int):
+        self._feed = feed
+        self.position = after
+
+    def poll(self, max_events: int = 1000, timeout: Optional[float] = 0) -> List[ChangeEvent]:
+        """Return the next batch of events and advance past it"""
+        events = self._feed.read(self.position, max_events, timeout)
+        if events:
+            self.position = events[-1].sequence
+        return events
+
+
+class ChangeFeedTaskRepository(TaskRepository):
+    """
+    Publishes every change made through it to a ChangeFeed.
+
+    Writes are serialised so that event order is the order the backend
+    applied them in, and each batch operation publishes its events
+    together. Conditional writes that do not apply and deletes of missing
+    tasks publish nothing. Changes made to the backend directly, bypassing
+    this wrapper, are not seen.
+    """
+
+    def __init__(self, repository: TaskRepository, feed: Optional[ChangeFeed] = None):
+        self._repository = repository
+        self._feed = feed if feed is not None else ChangeFeed()
+        self._write_lock = threading.RLock()
+
+    @property
+    def feed(self) -> ChangeFeed:
+        return self._feed
+
+    # -- Reads ----------------------------------------------------------------
+
+    def get_all(self) -> List[Task]:
+        """Return all tasks"""
+        return self._repository.get_all()
+
+    def get_by_id(self, task_id: int) -> Optional[Task]:
+        """Find task by ID"""
+        return self._repository.get_by_id(task_id)
+
+    def get_many(self, task_ids: Iterable[int]) -> Dict[int, Task]:
+        """Find several tasks by ID"""
+        return self._repository.get_many(task_ids)
+
+    def task_stats(self) -> TaskStats:
+        """Return task counts"""
+        return self._repository.task_stats()
+
+    def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                   limit: Optional[int] = None) -> Iterator[Task]:
+        """Yield tasks in ID order"""
+        return self._repository.iter_tasks(completed=completed, after_id=after_id, limit=limit)
+
+    def query(self, query: TaskQuery) -> Iterator[Task]:
+        """Yield the tasks matching a query"""
+        return self._repository.query(query)
+
+    # -- Writes ---------------------------------------------------------------
+
+    def add(self, task: Task) -> Task:
+        """Add a new task to the repository"""
+        with self._write_lock:
+            result = self._repository.add(task)
+            self._feed.publish([(ChangeKind.ADDED, task.id, result)])
+        return result
+
+    def add_many(self, tasks: List[Task]) -> List[Task]:
+        """Add a batch of tasks"""
+        with self._write_lock:
+            result = self._repository.add_many(tasks)
+            self._feed.publish((ChangeKind.ADDED, task.id, task) for task in result)
+        return result
+
+    def update(self, task_id: int, **updates) -> Optional[Task]:
+        """Update a task by ID"""
+        with self._write_lock:
+            result = self._repository.update(task_id, **updates)
+            if result is not None:
+                self._feed.publish([(ChangeKind.UPDATED, task_id, result)])
+        return result
+
+    def update_many(self, updates: Dict[int, Dict]) -> List[Task]:
+        """Apply per-task field updates"""
+        with self._write_lock:
+            result = self._repository.update_many(updates)
+            self._feed.publish((ChangeKind.UPDATED, task.id, task) for task in result)
+        return result
+
+    def update_if(self, task_id: int, expected_version: Optional[int] = None, **updates) -> MutationResult:
+        """Conditionally update a task"""
+        with self._write_lock:
+            result = self._repository.update_if(task_id, expected_version, **updates)
+            if result.ok:
+                self._feed.publish([(ChangeKind.UPDATED, task_id, result.task)])
+        return result
+
+    def complete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally mark a task as completed"""
+        with self._write_lock:
+            result = self._repository.complete_if(task_id, expected_version)
+            if result.ok:
+                self._feed.publish([(ChangeKind.UPDATED, task_id, result.task)])
+        return result
+
+    def delete(self, task_id: int) -> bool:
+        """Delete a task by ID"""
+        with self._write_lock:
+            deleted = self._repository.delete(task_id)
+            if deleted:
+                self._feed.publish([(ChangeKind.DELETED, task_id, None)])
+        return deleted
+
+    def delete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally delete a task"""
+        with self._write_lock:
+            result = self._repository.delete_if(task_id, expected_version)
+            if result.ok:
+                self._feed.publish([(ChangeKind.DELETED, task_id, None)])
+        return result
+
+    def delete_many(self, task_ids: Iterable[int]) -> int:
+        """Delete a batch of tasks, publishing only those that existed"""
+        with self._write_lock:
+            existing = list(self._repository.get_many(task_ids))
+            deleted = self._repository.delete_many(existing)
+            self._feed.publish((ChangeKind.DELETED, task_id, None) for task_id in existing)
+        return deleted
+
+    def generate_id(self) -> int:
+        """Generate next available ID"""
+        return self._repository.generate_id()
+
+    def generate_ids(self, count: int) -> List[int]:
+        """Reserve a block of IDs"""
+        return self._repository.generate_ids(count)
+
+    def flush(self) -> None:
+        """Flush the wrapped repository"""
+        self._repository.flush()
+
+    def close(self) -> None:
+        """Close the wrapped repository and wake waiting readers"""
+        self._feed.close()
+        self._repository.close()
@@ -1,28 +1,104 @@
 import sys
-from typing import Optional
-from .service import TodoService
-from .repository import InMemoryTaskRepository
+import time
+
+# Taken before anything else is imported, for --profile-startup
+_IMPORT_STARTED = time.perf_counter()
+_MODULES_AT_START = len(sys.modules)
+
+import argparse
+import contextlib
+import os
+import threading
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from .models import SORT_FIELDS
+from .repository import IndexedTaskRepository, TaskRepository
+from .serialization import FORMATS
+
+if TYPE_CHECKING:
+    from .render import TaskRenderer
+    from .service import TodoService
+
+BACKENDS = ('memory', 'columnar', 'mvcc', 'sqlite', 'log', 'snapshot')
+DURABILITY_MODES = ('immediate', 'grouped', 'deferred')
+DEFAULT_DB_PATHS = {'sqlite': 'todo.db', 'log': 'todo.log', 'snapshot': 'todo.snap'}
+DEFAULT_PERF_FILE = 'todo.perf.json'
+IMPORT_CHUNK_SIZE = 1000
+# Tasks shown per page in the interactive views
+PAGE_SIZE = 20
+# Above this many tasks the pick-by-ID prompts skip listing the tasks first
+PREVIEW_LIMIT = 1000
+SEARCH_LIMIT = 20
+
+
+def create_repository(backend: str = 'memory', db_path: Optional[str] = None, cache_size: int = 0,
+                      instrument: bool = False, durability: Optional[str] = None) -> TaskRepository:
+    """Build the repository for the selected storage backend"""
+    repository = _create_backend(backend, db_path)
+    if durability is not None:
+        from .write_behind_repository import WriteBehindTaskRepository
+        repository = WriteBehindTaskRepository(repository, durability)
+    if cache_size > 0:
+        from .caching_repository import CachingTaskRepository
+        repository = CachingTaskRepository(repository, max_size=cache_size)
+    if instrument:
+        from .instrumentation import InstrumentedTaskRepository
+        repository = InstrumentedTaskRepository(repository)
+    return repository
+
+
+def _create_backend(backend: str, db_path: Optional[str]) -> TaskRepository:
+    if backend == 'memory':
+        return IndexedTaskRepository()
+    if backend == 'columnar':
+        from .columnar_repository import ColumnarTaskRepository
+        return ColumnarTaskRepository()
+    if backend == 'mvcc':
+        from .mvcc_repository import MvccTaskRepository
+        return MvccTaskRepository()
+    if backend == 'sqlite':
+        from .sqlite_repository import SqliteTaskRepository
+        return SqliteTaskRepository(db_path or DEFAULT_DB_PATHS['sqlite'])
+    if backend == 'log':
+        from .log_repository import LogTaskRepository
+        return LogTaskRepository(db_path or DEFAULT_DB_PATHS['log'])
+    if backend == 'snapshot':
+        from .snapshot_repository import SnapshotTaskRepository
+        return SnapshotTaskRepository(db_path or DEFAULT_DB_PATHS['snapshot'])
+    raise ValueError(f"Unknown backend: {backend}")
 
 
 class TodoCLI:
-    def __init__(self, service: TodoService):
+    def __init__(self, service: 'TodoService'):
         """
         CLI receives service via dependency injection.
         This ensures the CLI only handles presentation logic while business logic
         remains in the service layer.
         """
         self.service = service
+        self._renderer: Optional['TaskRenderer'] = None
+        # Instrumentation file selected with --perf-file, read by stats --perf
+        self.perf_file: Optional[str] = None
 
     @classmethod
-    def create_default(cls):
+    def create_default(cls, backend: str = 'memory', db_path: Optional[str] = None, cache_size: int = 0,
+                       instrument: bool = False, durability: Optional[str] = None):
         """
         Factory method to create a CLI instance with default dependencies.
         This is the main entry point that wires up all components.
         """
-        repository = InMemoryTaskRepository()
+        from .service import TodoService
+        repository = create_repository(backend, db_path, cache_size, instrument, durability)
         service = TodoService(repository)
         return cls(service)
 
+    @property
+    def renderer(self) -> 'TaskRenderer':
+        """Renderer for task lists, built on first use to keep it off the startup path"""
+        if self._renderer is None:
+            from .render import TaskRenderer
+            self._renderer = TaskRenderer()
+        return self._renderer
+
     def display_menu(self):
         """Display the main menu"""
         print("\n" + "="*60)
@@ -36,18 +112,19 @@ class TodoCLI:
         print("3. ✏️  Update Task")
         print("4. ✅ Mark Task as Complete")
         print("5. 🗑️  Delete Task")
-        print("6. 🚪 Exit Application")
+        print("6. 🔍 Search Tasks")
+        print("7. 🚪 Exit Application")
         print()
         print("="*60)
 
     def get_user_choice(self):
         """Get and validate user choice"""
         try:
-            choice = input("Enter your choice (1-6): ").strip()
-            if choice in ['1', '2', '3', '4', '5', '6']:
+            choice = input("Enter your choice (1-7): ").strip()
+            if choice in ['1', '2', '3', '4', '5', '6', '7']:
                 return int(choice)
             else:
-                print("Invalid choice. Please enter a number between 1 and 6.")
+                print("Invalid choice. Please enter a number between 1 and 7.")
                 return None
         except KeyboardInterrupt:
             print("\n\nGoodbye!")
@@ -57,27 +134,32 @@ class TodoCLI:
             sys.exit(0)
 
     def run_interactive(self):
-        """Main interactive loop"""
-        while True:
-            self.display_menu()
-            choice = self.get_user_choice()
-
-            if choice is None:
-                continue
-
-            if choice == 1:
-                self.add_task_interactive()
-            elif choice == 2:
-                self.view_tasks_interactive()
-            elif choice == 3:
-                self.update_task_interactive()
-            elif choice == 4:
-                self.complete_task_interactive()
-            elif choice == 5:
-                self.delete_task_interactive()
-            elif choice == 6:
-                print("\n👋 Thank you for using the Todo CLI Application! Goodbye!")
-                break
+        """Main interactive loop; buffered writes are flushed however it ends"""
+        try:
+            while True:
+                self.display_menu()
+                choice = self.get_user_choice()
+
+                if choice is None:
+                    continue
+
+                if choice == 1:
+                    self.add_task_interactive()
+                elif choice == 2:
+                    self.view_tasks_interactive()
+                elif choice == 3:
+                    self.update_task_interactive()
+                elif choice == 4:
+                    self.complete_task_interactive()
+                elif choice == 5:
+                    self.delete_task_interactive()
+                elif choice == 6:
+                    self.search_tasks_interactive()
+                elif choice == 7:
+                    print("\n👋 Thank you for using the Todo CLI Application! Goodbye!")
+                    break
+        finally:
+            self.service.flush()
 
     def add_task_interactive(self):
         """Interactive method to add a task"""
@@ -104,46 +186,77 @@ class TodoCLI:
         except EOFError:
             print("\nOperation cancelled.")
 
+    def _show_task_pages(self, completed: Optional[bool] = None, heading: Optional[str] = None,
+                         indent: str = "", show_descriptions: bool = False) -> int:
+        """
+        Print tasks one page at a time, asking before each further page.
+        Returns how many tasks were shown.
+        """
+        shown = 0
+        cursor = None
+        while True:
+            tasks, cursor = self.service.get_page(PAGE_SIZE, completed=completed, after_id=cursor)
+            if tasks and shown == 0 and heading:
+                print(heading)
+            shown += self.renderer.write(tasks, indent, show_descriptions)
+            if cursor is None:
+                return shown
+            try:
+                answer = input("-- More (press Enter to continue, q to stop) -- ").strip().lower()
+            except (KeyboardInterrupt, EOFError):
+                print()
+                return shown
+            if answer == 'q':
+                return shown
+
     def view_tasks_interactive(self):
         """Interactive method to view all tasks"""
         print("\n" + "-"*50)
         print("📋 ALL TASKS")
         print("-"*50)
-        tasks = self.service.get_all_tasks()
 
-        if not tasks:
+        stats = self.service.stats()
+        if not stats.total:
             print("📭 No tasks found. Add some tasks to get started!")
             return
 
-        # Count completed and pending tasks
-        completed_count = sum(1 for task in tasks if task.completed)
-        pending_count = len(tasks) - completed_count
-
-        for task in tasks:
-            status = "✅" if task.completed else "⏳"
-            print(f"{task.id}. {status} {task.title}")
-            if task.description:
-                print(f"   📝 Description: {task.description}")
+        from .render import open_pager, pager_command
+        command = pager_command() if stats.total > PAGE_SIZE else None
+        if command:
+            # Long lists on a terminal go through the pager in large writes
+            with open_pager(command) as pager:
+                self.renderer.write(self.service.iter_tasks(), show_description=True, stream=pager)
+        else:
+            self._show_task_pages(show_descriptions=True)
 
-        print(f"\n📊 Summary: {pending_count} pending, {completed_count} completed out of {len(tasks)} total tasks")
+        print(f"\n📊 Summary: {stats.pending} pending, {stats.completed} completed out of {stats.total} total tasks")
         print("-"*50)
 
+    def _preview_tasks(self, completed: Optional[bool] = None) -> bool:
+        """
+        List the tasks the user can pick from before asking for an ID.
+        Large stores skip the listing. Returns False when there is nothing to pick.
+        """
+        stats = self.service.stats()
+        available = stats.total if completed is None else (stats.completed if completed else stats.pending)
+        if not available:
+            return False
+        if available > PREVIEW_LIMIT:
+            print(f"📋 {available} tasks - too many to list here. Use View or Search to find a task ID.")
+            return True
+        self._show_task_pages(completed=completed, heading="📋 Current tasks:", indent="  ")
+        return True
+
     def update_task_interactive(self):
         """Interactive method to update a task"""
         print("\n" + "-"*40)
         print("✏️  UPDATE TASK")
         print("-"*40)
         try:
-            tasks = self.service.get_all_tasks()
-            if not tasks:
+            if not self._preview_tasks():
                 print("📭 No tasks available to update.")
                 return
 
-            print("📋 Current tasks:")
-            for task in tasks:
-                status = "✅" if task.completed else "⏳"
-                print(f"  {task.id}. {status} {task.title}")
-
             task_id = input("\n🔢 Enter task ID to update: ").strip()
             if not task_id.isdigit():
                 print("❌ Invalid task ID. Please enter a number.")
@@ -152,13 +265,7 @@ class TodoCLI:
             task_id = int(task_id)
 
             # Check if task exists first
-            task = self.service.get_all_tasks()
-            target_task = None
-            for t in task:
-                if t.id == task_id:
-                    target_task = t
-                    break
-
+            target_task = self.service.get_task(task_id)
             if not target_task:
                 print(f"❌ No task found with ID {task_id}.")
                 return
@@ -198,20 +305,13 @@ class TodoCLI:
         print("✅ COMPLETE TASK")
         print("-"*40)
         try:
-            tasks = self.service.get_all_tasks()
-            if not tasks:
-                print("📭 No tasks available to complete.")
+            if not self._preview_tasks(completed=False):
+                if not self.service.stats().total:
+                    print("📭 No tasks available to complete.")
+                else:
+                    print("🎉 All tasks are already completed!")
                 return
 
-            print("📋 Current tasks:")
-            incomplete_tasks = [task for task in tasks if not task.completed]
-            if not incomplete_tasks:
-                print("🎉 All tasks are already completed!")
-                return
-
-            for task in incomplete_tasks:
-                print(f"  {task.id}. ⏳ {task.title}")
-
             task_id = input(f"\n🔢 Enter task ID to mark as complete: ").strip()
             if not task_id.isdigit():
                 print("❌ Invalid task ID. Please enter a number.")
@@ -234,16 +334,10 @@ class TodoCLI:
         print("🗑️  DELETE TASK")
         print("-"*40)
         try:
-            tasks = self.service.get_all_tasks()
-            if not tasks:
+            if not self._preview_tasks():
                 print("📭 No tasks available to delete.")
                 return
 
-            print("📋 Current tasks:")
-            for task in tasks:
-                status = "✅" if task.completed else "⏳"
-                print(f"  {task.id}. {status} {task.title}")
-
             task_id = input("\n🔢 Enter task ID to delete: ").strip()
             if not task_id.isdigit():
                 print("❌ Invalid task ID. Please enter a number.")
@@ -261,21 +355,418 @@ class TodoCLI:
         except EOFError:
             print("\nOperation cancelled.")
 
-    def run(self, args=None):
-        """Main entry point - run interactive mode if no arguments provided"""
-        if args is not None:
-            # For backward compatibility, though we're focusing on interactive mode
-            pass
+    def search_tasks_interactive(self):
+        """Interactive method to search tasks"""
+        print("\n" + "-"*40)
+        print("🔍 SEARCH TASKS")
+        print("-"*40)
+        try:
+            query = input("🔎 Enter search terms (end a word with * to match prefixes): ").strip()
+            if not query:
+                print("❌ Search query cannot be empty!")
+                return
 
-        # Run the interactive menu
-        self.run_interactive()
+            tasks = self.service.search(query, limit=SEARCH_LIMIT)
+            if not tasks:
+                print(f"📭 No tasks match '{query}'.")
+                return
+
+            print(f"📋 Top {len(tasks)} matches:")
+            self.renderer.write(tasks, indent="  ", show_description=True)
+            print("-"*40)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+        except KeyboardInterrupt:
+            print("\nOperation cancelled.")
+        except EOFError:
+            print("\nOperation cancelled.")
+
+    # -- Non-interactive subcommands ---------------------------------------
+
+    def add_command(self, title: str, description: Optional[str]):
+        """Handle add command"""
+        task = self.service.add_task(title, description)
+        print(f"Task #{task.id} created: {task.title}")
+
+    def list_command(self, **criteria):
+        """Handle list command; criteria are passed to query_tasks, and without any the store is streamed"""
+        tasks = self.service.query_tasks(**criteria) if criteria else self.service.iter_tasks()
+        if not self.renderer.write(tasks, show_description=True, plain=True):
+            print("No tasks found.")
+
+    def update_command(self, task_id: int, title: Optional[str], description: Optional[str]):
+        """Handle update command"""
+        task = self.service.update_task(task_id, title, description)
+        print(f"Task #{task.id} updated: {task.title}")
+
+    def complete_command(self, task_ids: List[int]):
+        """Handle complete command"""
+        self.service.complete_tasks(task_ids)
+        for task_id in task_ids:
+            print(f"Task #{task_id} marked as complete.")
+
+    def delete_command(self, task_ids: List[int]):
+        """Handle delete command"""
+        self.service.delete_tasks(task_ids)
+        for task_id in task_ids:
+            print(f"Task #{task_id} deleted.")
+
+    def stats_command(self):
+        """Handle stats command"""
+        stats = self.service.stats()
+        print(f"Total: {stats.total}")
+        print(f"Pending: {stats.pending}")
+        print(f"Completed: {stats.completed}")
+
+    def perf_command(self, path: str, as_json: bool = False):
+        """Handle stats --perf: show the instrumentation recorded by earlier runs"""
+        from .instrumentation import PerfRecorder
+        try:
+            recorder = PerfRecorder.load(path)
+        except FileNotFoundError:
+            raise ValueError(f"No performance data in {path}; record some with --perf-file {path}")
+        if as_json:
+            import json
+            json.dump(recorder.dump(), sys.stdout, indent=2)
+            print()
+            return
+
+        print(f"{'layer':<10} {'operation':<16} {'calls':>7} {'errors':>6} {'mean us':>9} "
+              f"{'p50 us':>8} {'p99 us':>8} {'max us':>9}  repository calls/op")
+        for (layer, operation), stats in sorted(recorder.operations().items()):
+            round_trips = ", ".join(f"{name} {count / stats.count:.1f}"
+                                    for name, count in sorted(stats.repository_calls.items()))
+            print(f"{layer:<10} {operation:<16} {stats.count:>7} {stats.errors:>6} "
+                  f"{stats.total_ns / stats.count / 1000:>9.1f} {stats.percentile(0.5):>8} "
+                  f"{stats.percentile(0.99):>8} {stats.max_ns / 1000:>9.1f}  {round_trips}")
+        slowest = recorder.dump()['slowest']
+        if slowest:
+            print("\nSlowest service calls:")
+            for entry in slowest:
+                calls = ", ".join(f"{name} {micros:.0f}us" for name, micros in entry['repository_calls'])
+                print(f"  {entry['operation']} {entry['duration_us']:.0f}us: {calls or 'no repository calls'}")
+
+    def search_command(self, query: str, limit: int = SEARCH_LIMIT):
+        """Handle search command"""
+        tasks = self.service.search(query, limit=limit)
+        if not tasks:
+            print("No matching tasks.")
+            return
+        self.renderer.write(tasks, plain=True)
+
+    def import_command(self, stream, fmt: str, chunk_size: int = IMPORT_CHUNK_SIZE) -> int:
+        """
+        Handle import command.
+        Records are read one at a time and handed to the service in chunks,
+        so memory use is bounded by the chunk size rather than the input.
+        Each chunk is committed on its own: a malformed record stops the
+        import, but the chunks before it stay imported.
+        """
+        imported = 0
+        chunk = []
+
+        def flush():
+            tasks = self.service.add_tasks(
+                (record['title'], record['description'], record['completed']) for record in chunk
+            )
+            chunk.clear()
+            return len(tasks)
+
+        from .serialization import read_records
+        try:
+            for record in read_records(stream, fmt):
+                chunk.append(record)
+                if len(chunk) >= chunk_size:
+                    imported += flush()
+        except ValueError:
+            print(f"Imported {imported} tasks before the error.", file=sys.stderr)
+            raise
+        if chunk:
+            imported += flush()
+        print(f"Imported {imported} tasks.", file=sys.stderr)
+        return imported
+
+    def export_command(self, stream, fmt: str) -> int:
+        """Handle export command"""
+        from .serialization import write_tasks
+        return write_tasks(stream, self.service.iter_tasks(), fmt)
+
+    def serve_command(self, host: str, port: int, max_in_flight: int):
+        """Handle serve command"""
+        from .server import serve
+        serve(self.service, host, port, max_in_flight)
 
+    def run(self, args=None):
+        """Main entry point - run a subcommand, or interactive mode if none is given"""
+        self.run_parsed(build_parser().parse_args(args if args is not None else []))
+
+    def run_parsed(self, parsed_args):
+        """Run the subcommand selected by already parsed arguments"""
+        with _exit_on_sigterm():
+            self._run_command(parsed_args)
 
-def main():
+    def _run_command(self, parsed_args):
+        try:
+            if parsed_args.command is None:
+                # Run the interactive menu
+                self.run_interactive()
+            elif parsed_args.command == "add":
+                self.add_command(parsed_args.title, parsed_args.description)
+            elif parsed_args.command == "list":
+                criteria = {
+                    'completed': parsed_args.completed, 'min_id': parsed_args.min_id,
+                    'max_id': parsed_args.max_id, 'title_prefix': parsed_args.prefix,
+                    'order_by': parsed_args.sort, 'descending': parsed_args.desc, 'limit': parsed_args.limit,
+                }
+                self.list_command(**{name: value for name, value in criteria.items() if value is not None})
+            elif parsed_args.command == "update":
+                self.update_command(parsed_args.id, parsed_args.title, parsed_args.description)
+            elif parsed_args.command == "complete":
+                self.complete_command(parsed_args.ids)
+            elif parsed_args.command == "delete":
+                self.delete_command(parsed_args.ids)
+            elif parsed_args.command == "stats":
+                if parsed_args.perf:
+                    self.perf_command(parsed_args.perf_file or self.perf_file or DEFAULT_PERF_FILE,
+                                      parsed_args.json)
+                else:
+                    self.stats_command()
+            elif parsed_args.command == "search":
+                self.search_command(" ".join(parsed_args.query), parsed_args.limit)
+            elif parsed_args.command == "import":
+                with _open_stream(parsed_args.file, 'r', sys.stdin) as stream:
+                    self.import_command(stream, parsed_args.format, parsed_args.chunk_size)
+            elif parsed_args.command == "export":
+                with _open_stream(parsed_args.file, 'w', sys.stdout) as stream:
+                    self.export_command(stream, parsed_args.format)
+            elif parsed_args.command == "serve":
+                self.serve_command(parsed_args.host, parsed_args.port, parsed_args.max_in_flight)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            self.service.close()
+
+
+@contextlib.contextmanager
+def _exit_on_sigterm():
+    """
+    Turn SIGTERM into SystemExit while running a command, so the finally
+    blocks that flush buffered writes and close the store still run.
+    Signal handlers can only be installed from the main thread.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    import signal
+
+    def handle(signum, frame):
+        sys.exit(128 + signum)
+
+    previous = signal.signal(signal.SIGTERM, handle)
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+
+def _open_stream(path: Optional[str], mode: str, default):
+    """Open a file for import/export, or wrap stdin/stdout without closing it"""
+    if path is None or path == '-':
+        return contextlib.nullcontext(default)
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+class _HelpFormatter(argparse.HelpFormatter):
+    """
+    HelpFormatter that sizes itself without shutil. argparse builds a
+    formatter for every add_argument call, and shutil pulls in the
+    compression modules, which would otherwise be most of the time spent
+    parsing arguments.
+    """
+
+    def __init__(self, prog, indent_increment=2, max_help_position=24, width=None):
+        if width is None:
+            try:
+                width = int(os.environ['COLUMNS'])
+            except (KeyError, ValueError):
+                try:
+                    width = os.get_terminal_size(sys.__stdout__.fileno()).columns
+                except (AttributeError, ValueError, OSError):
+                    width = 80
+            width -= 2
+        super().__init__(prog, indent_increment, max_help_position, width)
+
+
+class _ArgumentParser(argparse.ArgumentParser):
+    """ArgumentParser using _HelpFormatter; subcommand parsers are created as this class too"""
+
+    def __init__(self, *args, formatter_class=_HelpFormatter, **kwargs):
+        super().__init__(*args, formatter_class=formatter_class, **kwargs)
+
+
+def _add_global_options(parser):
+    parser.add_argument("--backend", choices=BACKENDS, default='memory',
+                        help="Storage backend (default: memory)")
+    parser.add_argument("--db", dest="db_path", default=None,
+                        help="Database file (sqlite, snapshot) or directory (log) for persistent backends "
+                             "(default: todo.db / todo.log / todo.snap)")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="Cache up to this many tasks in front of the backend (default: 0, disabled)")
+    parser.add_argument("--durability", choices=DURABILITY_MODES, default=None,
+                        help="Buffer writes in front of the backend and commit them immediately, in groups, "
+                             "or deferred in the background (default: unbuffered)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report time spent importing, parsing arguments, opening the store and running "
+                             "the command on stderr")
+    parser.add_argument("--perf-file", default=None,
+                        help="Record service and repository timings for this run and add them to this file "
+                             f"(read by 'stats --perf', default: {DEFAULT_PERF_FILE})")
+
+
+def build_parser():
+    """Build the argument parser for the todo subcommands"""
+    parser = _ArgumentParser(
+        prog="todo",
+        description="Todo CLI Application. Runs the interactive menu when no command is given.",
+    )
+    _add_global_options(parser)
+    subparsers = parser.add_subparsers(dest="command", help="Available commands")
+
+    add_parser = subparsers.add_parser("add", help="Add a new task")
+    add_parser.add_argument("title", help="Task title")
+    add_parser.add_argument("description", nargs="?", default=None, help="Task description")
+
+    list_parser = subparsers.add_parser("list", help="List tasks, optionally filtered and sorted")
+    status_group = list_parser.add_mutually_exclusive_group()
+    status_group.add_argument("--pending", dest="completed", action="store_false", default=None,
+                              help="Only pending tasks")
+    status_group.add_argument("--completed", dest="completed", action="store_true", help="Only completed tasks")
+    list_parser.add_argument("--min-id", type=int, default=None, help="Lowest task ID to include")
+    list_parser.add_argument("--max-id", type=int, default=None, help="Highest task ID to include")
+    list_parser.add_argument("--prefix", default=None, help="Only tasks whose title starts with this text")
+    list_parser.add_argument("--sort", choices=SORT_FIELDS, default=None, help="Sort order (default: id)")
+    list_parser.add_argument("--desc", action="store_const", const=True, default=None,
+                             help="Sort in descending order")
+    list_parser.add_argument("--limit", type=int, default=None, help="Show at most this many tasks")
+
+    update_parser = subparsers.add_parser("update", help="Update a task")
+    update_parser.add_argument("id", type=int, help="Task ID")
+    update_parser.add_argument("--title", help="New task title")
+    update_parser.add_argument("--description", help="New task description")
+
+    complete_parser = subparsers.add_parser("complete", help="Mark tasks as complete")
+    complete_parser.add_argument("ids", type=int, nargs="+", metavar="id", help="Task ID")
+
+    delete_parser = subparsers.add_parser("delete", help="Delete tasks")
+    delete_parser.add_argument("ids", type=int, nargs="+", metavar="id", help="Task ID")
+
+    stats_parser = subparsers.add_parser("stats", help="Show task counts")
+    stats_parser.add_argument("--perf", action="store_true",
+                              help="Show per-operation latency and repository calls recorded with --perf-file")
+    stats_parser.add_argument("--json", action="store_true", help="With --perf, print the raw data as JSON")
+
+    search_parser = subparsers.add_parser("search", help="Search task titles and descriptions")
+    search_parser.add_argument("query", nargs="+", help="Search terms; end a term with * to match prefixes")
+    search_parser.add_argument("--limit", type=int, default=SEARCH_LIMIT,
+                               help=f"Maximum number of results (default: {SEARCH_LIMIT})")
+
+    import_parser = subparsers.add_parser("import", help="Import tasks from JSONL or CSV")
+    import_parser.add_argument("--format", choices=FORMATS, default='jsonl', help="Input format (default: jsonl)")
+    import_parser.add_argument("--file", default=None, help="Input file (default: stdin)")
+    import_parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE,
+                               help=f"Tasks per batch handed to the store (default: {IMPORT_CHUNK_SIZE}); "
+                                    "batches before a malformed record stay imported")
+
+    export_parser = subparsers.add_parser("export", help="Export tasks as JSONL or CSV")
+    export_parser.add_argument("--format", choices=FORMATS, default='jsonl', help="Output format (default: jsonl)")
+    export_parser.add_argument("--file", default=None, help="Output file (default: stdout)")
+
+    serve_parser = subparsers.add_parser("serve", help="Serve the tasks over HTTP/JSON")
+    serve_parser.add_argument("--host", default='127.0.0.1', help="Address to listen on (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    serve_parser.add_argument("--max-in-flight", type=int, default=64,
+                              help="Requests handled at once across all connections before reads pause "
+                                   "(default: 64)")
+
+    return parser
+
+
+def parse_global_options(argv=None):
+    """Parse options that select the storage backend; remaining args are returned as-is"""
+    # No abbreviations, so subcommand flags such as stats --perf are not taken for --perf-file
+    parser = _ArgumentParser(prog="todo", add_help=False, allow_abbrev=False)
+    _add_global_options(parser)
+    return parser.parse_known_args(argv)
+
+
+class StartupProfile:
+    """Wall-clock time and modules imported per startup phase, reported by --profile-startup"""
+
+    def __init__(self, started: float, modules: int):
+        self._phases: List[Tuple[str, float, int]] = []
+        self._last = started
+        self._modules = modules
+
+    def record(self, phase: str, seconds: float, modules: int) -> None:
+        """Add a phase measured elsewhere, such as the import of this module"""
+        self._phases.append((phase, seconds, modules))
+
+    def mark(self, phase: str) -> None:
+        """End the current phase under this name; the next one starts now"""
+        now = time.perf_counter()
+        modules = len(sys.modules)
+        self.record(phase, now - self._last, modules - self._modules)
+        self._last = now
+        self._modules = modules
+
+    def report(self, stream) -> None:
+        stream.write(f"{'phase':<18} {'ms':>8} {'modules':>8}\n")
+        for phase, seconds, modules in self._phases:
+            stream.write(f"{phase:<18} {seconds * 1000:>8.1f} {modules:>8}\n")
+        total = sum(seconds for _, seconds, _ in self._phases)
+        stream.write(f"{'total':<18} {total * 1000:>8.1f} {len(sys.modules):>8}\n")
+
+
+def main(argv=None):
     """Main entry point for the application"""
-    cli = TodoCLI.create_default()
-    cli.run()
+    profile = StartupProfile(time.perf_counter(), len(sys.modules))
+    profile.record("import", _IMPORT_SECONDS, _IMPORT_MODULES)
+    if argv is None:
+        argv = sys.argv[1:]
+    options, remaining = parse_global_options(argv)
+    # Parse the whole command line first, so --help and usage errors never open the store
+    parsed_args = build_parser().parse_args(remaining)
+    profile.mark("parse arguments")
+
+    recorder = None
+    if options.perf_file is not None:
+        from .instrumentation import PerfRecorder, add_hook
+        recorder = PerfRecorder()
+        add_hook(recorder)
+    try:
+        cli = TodoCLI.create_default(backend=options.backend, db_path=options.db_path,
+                                     cache_size=options.cache_size, instrument=recorder is not None,
+                                     durability=options.durability)
+        cli.perf_file = options.perf_file
+        profile.mark("open store")
+        try:
+            cli.run_parsed(parsed_args)
+        finally:
+            profile.mark("run command")
+    finally:
+        if recorder is not None:
+            from .instrumentation import remove_hook
+            remove_hook(recorder)
+            recorder.save(options.perf_file)
+        if options.profile_startup:
+            profile.report(sys.stderr)
+
+
+# The import phase ends here; main() may be called much later in the same process
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+_IMPORT_MODULES = len(sys.modules) - _MODULES_AT_START
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,315 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from .models import MutationResult, MutationStatus, Task, TaskQuery, TaskStats
+from .repository import TaskRepository, paginate, run_query
+
+_COMPLETED = 0x01
+_DELETED = 0x02
+
+_NO_STRING = -1
+
+
+class StringTable:
+    """
+    Interned strings: each distinct value is stored once and referenced by index.
+    Every reference handed out by intern is counted until it is released;
+    a string with no references left is dropped and its slot reused.
+    """
+
+    def __init__(self):
+        self._strings: List[Optional[str]] = []
+        self._counts = array('I')
+        self._refs: Dict[str, int] = {}
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def intern(self, value: Optional[str]) -> int:
+        """Return a counted reference for a string, adding it if it is new"""
+        if value is None:
+            return _NO_STRING
+        ref = self._refs.get(value)
+        if ref is None:
+            if self._free:
+                ref = self._free.pop()
+                self._strings[ref] = value
+            else:
+                ref = len(self._strings)
+                self._strings.append(value)
+                self._counts.append(0)
+            self._refs[value] = ref
+        self._counts[ref] += 1
+        return ref
+
+    def release(self, ref: int) -> None:
+        """Give back a reference from intern, dropping the string after its last one"""
+        if ref == _NO_STRING:
+            return
+        self._counts[ref] -= 1
+        if not self._counts[ref]:
+            del self._refs[self._strings[ref]]
+            self._strings[ref] = None
+            self._free.append(ref)
+
+    def get(self, ref: int) -> Optional[str]:
+        """Return the string for a reference"""
+        return None if ref == _NO_STRING else self._strings[ref]
+
+    def refs_with_prefix(self, prefix: str) -> Set[int]:
+        """Return the references of every string in use that starts with prefix"""
+        return {ref for value, ref in self._refs.items() if value.startswith(prefix)}
+
+
+class ColumnarTaskRepository(TaskRepository):
+    """
+    Struct-of-arrays repository for very large in-memory stores.
+
+    Each task is a row spread over typed columns: IDs in an int64 array kept
+    in ascending order, status bits in a bytearray, and references into an
+    interned StringTable for titles and descriptions, plus a uint32 version
+    column. Task objects are only built when a caller reads a task, so the
+    store holds no per-task Python objects besides distinct strings.
+
+    Deletes leave a tombstone bit; rows are compacted once tombstones
+    outnumber live rows, but not while an iter_tasks or query scan is in
+    progress, since compaction renumbers the rows it walks. Strings are released as soon as an update or
+    delete leaves no row using them, so replaced titles and descriptions
+    do not accumulate.
+    """
+
+    def __init__(self):
+        self._ids = array('q')
+        self._flags = bytearray()
+        self._titles = array('i')
+        self._descriptions = array('i')
+        self._versions = array('I')
+        self._strings = StringTable()
+        self._live: int = 0
+        # Live rows with the completed flag, kept current by every write
+        self._completed: int = 0
+        self._next_id: int = 1  # For ID generation
+        # Scans being consumed; compaction waits until none are
+        self._scans: int = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    # -- Row helpers ----------------------------------------------------------
+
+    def _row(self, task_id: int) -> int:
+        """Return the row index of a live task, or -1"""
+        ids = self._ids
+        row = bisect_left(ids, task_id)
+        if row < len(ids) and ids[row] == task_id and not self._flags[row] & _DELETED:
+            return row
+        return -1
+
+    def _task(self, row: int) -> Task:
+        strings = self._strings
+        return Task(
+            id=self._ids[row],
+            title=strings.get(self._titles[row]),
+            description=strings.get(self._descriptions[row]),
+            completed=bool(self._flags[row] & _COMPLETED),
+            version=self._versions[row],
+        )
+
+    def _write_row(self, row: int, task: Task) -> None:
+        flags = self._flags[row]
+        if flags & _COMPLETED and not flags & _DELETED:
+            self._completed -= 1
+        self._completed += task.completed
+        self._flags[row] = _COMPLETED if task.completed else 0
+        self._titles[row] = self._replace_string(self._titles[row], task.title)
+        self._descriptions[row] = self._replace_string(self._descriptions[row], task.description)
+        self._versions[row] = task.version
+
+    def _replace_string(self, ref: int, value: Optional[str]) -> int:
+        """Intern value in place of ref, interning first so an unchanged string is never dropped"""
+        new_ref = self._strings.intern(value)
+        self._strings.release(ref)
+        return new_ref
+
+    def _live_rows(self, start: int = 0) -> Iterator[int]:
+        flags = self._flags
+        for row in range(start, len(flags)):
+            if not flags[row] & _DELETED:
+                yield row
+
+    def _scan(self, rows: Iterable[int]) -> Iterator[Task]:
+        """Build the task for each row, holding off compaction until the scan ends"""
+        self._scans += 1
+        try:
+            for row in rows:
+                yield self._task(row)
+        finally:
+            self._scans -= 1
+
+    def compact(self) -> None:
+        """
+        Drop tombstoned rows; their strings were released when they were deleted.
+        Must not be called while a scan is being consumed.
+        """
+        ids, flags, titles, descriptions = array('q'), bytearray(), array('i'), array('i')
+        versions = array('I')
+        for row in self._live_rows():
+            ids.append(self._ids[row])
+            flags.append(self._flags[row])
+            versions.append(self._versions[row])
+            titles.append(self._titles[row])
+            descriptions.append(self._descriptions[row])
+        self._ids, self._flags, self._titles, self._descriptions = ids, flags, titles, descriptions
+        self._versions = versions
+
+    # -- TaskRepository -------------------------------------------------------
+
+    def get_all(self) -> List[Task]:
+        """Return all tasks"""
+        return [self._task(row) for row in self._live_rows()]
+
+    def get_by_id(self, task_id: int) -> Optional[Task]:
+        """Find task by ID"""
+        row = self._row(task_id)
+        return self._task(row) if row >= 0 else None
+
+    def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                   limit: Optional[int] = None) -> Iterator[Task]:
+        """Yield tasks in ID order, materialising each one only as it is consumed"""
+        start = 0 if after_id is None else bisect_right(self._ids, after_id)
+        rows = self._live_rows(start)
+        if completed is not None:
+            wanted = _COMPLETED if completed else 0
+            flags = self._flags
+            rows = (row for row in rows if flags[row] & _COMPLETED == wanted)
+        return paginate(self._scan(rows), None, None, limit)
+
+    def query(self, query: TaskQuery) -> Iterator[Task]:
+        """
+        Yield the tasks matching a query, filtering on the columns before any
+        Task is built: the ID range is two binary searches on the ID column,
+        status is tested on the flag column together with the tombstone bit,
+        and a title prefix is resolved once against the distinct strings.
+        """
+        ids = self._ids
+        start = 0 if query.min_id is None else bisect_left(ids, query.min_id)
+        stop = len(ids) if query.max_id is None else bisect_right(ids, query.max_id)
+        flags = self._flags
+        if query.completed is None:
+            rows = (row for row in range(start, stop) if not flags[row] & _DELETED)
+        else:
+            mask = _DELETED | _COMPLETED
+            wanted = _COMPLETED if query.completed else 0
+            rows = (row for row in range(start, stop) if flags[row] & mask == wanted)
+        if query.title_prefix:
+            refs = self._strings.refs_with_prefix(query.title_prefix)
+            titles = self._titles
+            rows = (row for row in rows if titles[row] in refs)
+        return run_query(self._scan(rows), query, filtered=True)
+
+    def add(self, task: Task) -> Task:
+        """Add a new task to the repository"""
+        ids = self._ids
+        if not ids or task.id > ids[-1]:
+            row = len(ids)
+            ids.append(task.id)
+            self._flags.append(0)
+            self._titles.append(_NO_STRING)
+            self._descriptions.append(_NO_STRING)
+            self._versions.append(0)
+            self._live += 1
+        else:
+            row = bisect_left(ids, task.id)
+            if row < len(ids) and ids[row] == task.id:
+                if self._flags[row] & _DELETED:
+                    self._live += 1
+            else:
+                ids.insert(row, task.id)
+                self._flags.insert(row, 0)
+                self._titles.insert(row, _NO_STRING)
+                self._descriptions.insert(row, _NO_STRING)
+                self._versions.insert(row, 0)
+                self._live += 1
+        self._write_row(row, task)
+        self._next_id = max(self._next_id, task.id + 1)
+        return task
+
+    def update(self, task_id: int, **updates) -> Optional[Task]:
+        """Update a task by ID"""
+        row = self._row(task_id)
+        if row < 0:
+            return None
+        return self._apply(row, updates)
+
+    def _apply(self, row: int, updates) -> Task:
+        if 'title' in updates:
+            self._titles[row] = self._replace_string(self._titles[row], updates['title'])
+        if 'description' in updates:
+            self._descriptions[row] = self._replace_string(self._descriptions[row], updates['description'])
+        if 'completed' in updates:
+            was_completed = self._flags[row] & _COMPLETED
+            if updates['completed']:
+                self._flags[row] |= _COMPLETED
+            else:
+                self._flags[row] &= ~_COMPLETED
+            if was_completed != self._flags[row] & _COMPLETED:
+                self._completed += 1 if updates['completed'] else -1
+        self._versions[row] += 1
+        return self._task(row)
+
+    def update_if(self, task_id: int, expected_version: Optional[int] = None, **updates) -> MutationResult:
+        """Conditionally update a task with a single lookup"""
+        row = self._row(task_id)
+        if row < 0:
+            return MutationResult(MutationStatus.NOT_FOUND)
+        if expected_version is not None and self._versions[row] != expected_version:
+            return MutationResult(MutationStatus.CONFLICT, self._task(row))
+        return MutationResult(MutationStatus.OK, self._apply(row, updates))
+
+    def delete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally delete a task with a single lookup"""
+        row = self._row(task_id)
+        if row < 0:
+            return MutationResult(MutationStatus.NOT_FOUND)
+        task = self._task(row)
+        if expected_version is not None and task.version != expected_version:
+            return MutationResult(MutationStatus.CONFLICT, task)
+        self._remove_row(row)
+        return MutationResult(MutationStatus.OK, task)
+
+    def delete(self, task_id: int) -> bool:
+        """Delete a task by ID"""
+        row = self._row(task_id)
+        if row < 0:
+            return False
+        self._remove_row(row)
+        return True
+
+    def _remove_row(self, row: int) -> None:
+        if self._flags[row] & _COMPLETED:
+            self._completed -= 1
+        self._flags[row] |= _DELETED
+        self._strings.release(self._titles[row])
+        self._strings.release(self._descriptions[row])
+        # A revived row must not release these again
+        self._titles[row] = self._descriptions[row] = _NO_STRING
+        self._live -= 1
+        if not self._scans and len(self._ids) - self._live > max(self._live, 1024):
+            self.compact()
+
+    def task_stats(self) -> TaskStats:
+        """Return task counts from the running counters"""
+        return TaskStats(total=self._live, completed=self._completed)
+
+    def generate_id(self) -> int:
+        """Generate next available ID"""
+        new_id = self._next_id
+        self._next_id += 1
+        return new_id
+
+    def generate_ids(self, count: int) -> List[int]:
+        """Reserve a block of IDs"""
+        start = self._next_id
+        self._next_id += count
+        return list(range(start, self._next_id))
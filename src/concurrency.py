@@ -0,0 +1,202 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+from .models import MutationResult, Task, TaskQuery, TaskStats
+from .repository import TaskRepository
+
+# Tasks read per lock acquisition while streaming with iter_tasks
+_PAGE_SIZE = 500
+
+
+class ReadWriteLock:
+    """
+    Lock allowing many concurrent readers or a single writer.
+    Waiting writers block new readers so they are not starved. The thread
+    holding the write lock may re-acquire it and may also take read locks.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers: int = 0
+        self._writer: Optional[int] = None
+        self._write_depth: int = 0
+        self._waiting_writers: int = 0
+
+    @contextmanager
+    def read_locked(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                # The writer already excludes everyone else
+                self._write_depth += 1
+                reentrant = True
+            else:
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+                self._readers += 1
+                reentrant = False
+        try:
+            yield
+        finally:
+            with self._cond:
+                if reentrant:
+                    self._write_depth -= 1
+                else:
+                    self._readers -= 1
+                    if not self._readers:
+                        self._cond.notify_all()
+
+    @contextmanager
+    def write_locked(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+            else:
+                self._waiting_writers += 1
+                try:
+                    while self._writer is not None or self._readers:
+                        self._cond.wait()
+                finally:
+                    self._waiting_writers -= 1
+                self._writer = me
+                self._write_depth = 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._write_depth -= 1
+                if not self._write_depth:
+                    self._writer = None
+                    self._cond.notify_all()
+
+
+class ConcurrentTaskRepository(TaskRepository):
+    """
+    Thread-safe wrapper around any TaskRepository.
+
+    Reads run in parallel under a shared lock and writes, including ID
+    generation, are serialised under an exclusive lock. write_locked()
+    exposes the exclusive lock so callers can make read-modify-write
+    sequences atomic.
+    """
+
+    def __init__(self, repository: TaskRepository):
+        self._repository = repository
+        self._lock = ReadWriteLock()
+
+    def write_locked(self):
+        """Hold the exclusive lock for a sequence of operations"""
+        return self._lock.write_locked()
+
+    def get_all(self) -> List[Task]:
+        """Return all tasks"""
+        with self._lock.read_locked():
+            return self._repository.get_all()
+
+    def get_by_id(self, task_id: int) -> Optional[Task]:
+        """Find task by ID"""
+        with self._lock.read_locked():
+            return self._repository.get_by_id(task_id)
+
+    def get_many(self, task_ids: Iterable[int]) -> Dict[int, Task]:
+        """Find several tasks by ID"""
+        task_ids = list(task_ids)
+        with self._lock.read_locked():
+            return self._repository.get_many(task_ids)
+
+    def task_stats(self) -> TaskStats:
+        """Return task counts"""
+        with self._lock.read_locked():
+            return self._repository.task_stats()
+
+    def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                   limit: Optional[int] = None) -> Iterator[Task]:
+        """
+        Yield tasks in ID order.
+        Tasks are read a page at a time, so the shared lock is never held
+        while the caller is consuming results.
+        """
+        cursor = after_id
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_size = _PAGE_SIZE if remaining is None else min(_PAGE_SIZE, remaining)
+            with self._lock.read_locked():
+                page = list(self._repository.iter_tasks(completed=completed, after_id=cursor, limit=page_size))
+            yield from page
+            if len(page) < page_size:
+                return
+            cursor = page[-1].id
+            if remaining is not None:
+                remaining -= len(page)
+
+    def query(self, query: TaskQuery) -> Iterator[Task]:
+        """Yield the tasks matching a query; the results are collected under the shared lock"""
+        with self._lock.read_locked():
+            return iter(list(self._repository.query(query)))
+
+    def add(self, task: Task) -> Task:
+        """Add a new task to the repository"""
+        with self._lock.write_locked():
+            return self._repository.add(task)
+
+    def add_many(self, tasks: List[Task]) -> List[Task]:
+        """Add a batch of tasks"""
+        with self._lock.write_locked():
+            return self._repository.add_many(tasks)
+
+    def update(self, task_id: int, **updates) -> Optional[Task]:
+        """Update a task by ID"""
+        with self._lock.write_locked():
+            return self._repository.update(task_id, **updates)
+
+    def update_many(self, updates: Dict[int, Dict]) -> List[Task]:
+        """Apply per-task field updates"""
+        with self._lock.write_locked():
+            return self._repository.update_many(updates)
+
+    def update_if(self, task_id: int, expected_version: Optional[int] = None, **updates) -> MutationResult:
+        """Conditionally update a task; the check and the write share one exclusive lock"""
+        with self._lock.write_locked():
+            return self._repository.update_if(task_id, expected_version, **updates)
+
+    def complete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally mark a task as completed"""
+        with self._lock.write_locked():
+            return self._repository.complete_if(task_id, expected_version)
+
+    def delete(self, task_id: int) -> bool:
+        """Delete a task by ID"""
+        with self._lock.write_locked():
+            return self._repository.delete(task_id)
+
+    def delete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally delete a task"""
+        with self._lock.write_locked():
+            return self._repository.delete_if(task_id, expected_version)
+
+    def delete_many(self, task_ids: Iterable[int]) -> int:
+        """Delete a batch of tasks"""
+        task_ids = list(task_ids)
+        with self._lock.write_locked():
+            return self._repository.delete_many(task_ids)
+
+    def generate_id(self) -> int:
+        """Generate next available ID"""
+        with self._lock.write_locked():
+            return self._repository.generate_id()
+
+    def generate_ids(self, count: int) -> List[int]:
+        """Reserve a block of IDs"""
+        with self._lock.write_locked():
+            return self._repository.generate_ids(count)
+
+    def flush(self) -> None:
+        """Flush the wrapped repository"""
+        with self._lock.write_locked():
+            self._repository.flush()
+
+    def close(self) -> None:
+        """Close the wrapped repository"""
+        with self._lock.write_locked():
+            self._repository.close()
@@ -0,0 +1,397 @@
+import functools
+import heapq
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from . import markers
+from .markers import instrumented, instrumented_class, instrumented_classes as _instrumented_classes
+from .models import MutationResult, Task, TaskQuery, TaskStats
+from .repository import TaskRepository
+
+SERVICE = "service"
+REPOSITORY = "repository"
+
+# Histogram bucket upper bounds in microseconds: 1us, 2us, 4us, ... ~17min
+_BUCKET_BOUNDS = tuple(1 << power for power in range(31))
+# Slowest service calls kept, with the repository calls behind them
+_SLOWEST = 20
+
+
+@dataclass(slots=True)
+class CallEvent:
+    """
+    One timed call.
+    For service calls, repository_calls lists the (operation, duration_ns)
+    pairs of the repository calls made while serving it.
+    """
+    layer: str
+    operation: str
+    duration_ns: int
+    error: Optional[str] = None
+    repository_calls: List[Tuple[str, int]] = field(default_factory=list)
+
+
+class InstrumentationHook:
+    """Base class for hooks; record is called once per finished call"""
+
+    def record(self, event: CallEvent) -> None:
+        pass
+
+
+# Replaced, never mutated, so the hot path can read it without a lock
+_hooks: Tuple[InstrumentationHook, ...] = ()
+_hooks_lock = threading.Lock()
+# Repository calls made by the service call running in this thread or task
+_current_calls: ContextVar[Optional[List[Tuple[str, int]]]] = ContextVar('todo_current_calls', default=None)
+
+
+def add_hook(hook: InstrumentationHook) -> None:
+    """Start sending call events to a hook"""
+    global _hooks
+    with _hooks_lock:
+        if not _hooks:
+            _install(True)
+        _hooks = _hooks + (hook,)
+
+
+def remove_hook(hook: InstrumentationHook) -> None:
+    """Stop sending call events to a hook"""
+    global _hooks
+    with _hooks_lock:
+        _hooks = tuple(registered for registered in _hooks if registered is not hook)
+        if not _hooks:
+            _install(False)
+
+
+def _emit(event: CallEvent) -> None:
+    for hook in _hooks:
+        hook.record(event)
+
+
+def _class_registered(cls) -> None:
+    with _hooks_lock:
+        if _hooks:
+            _install_class(cls, True)
+
+
+markers.on_register = _class_registered
+
+
+def _install(enabled: bool) -> None:
+    for cls in _instrumented_classes:
+        _install_class(cls, enabled)
+
+
+def _install_class(cls, enabled: bool) -> None:
+    for name, method in cls.__plain_methods__.items():
+        setattr(cls, name, _timed(method) if enabled else method)
+
+
+def _timed(method):
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if _current_calls.get() is not None:
+            # Nested inside another service call, which is already being timed
+            return method(*args, **kwargs)
+        calls: List[Tuple[str, int]] = []
+        token = _current_calls.set(calls)
+        error = None
+        start = time.perf_counter_ns()
+        try:
+            return method(*args, **kwargs)
+        except Exception as exc:
+            error = type(exc).__name__
+            raise
+        finally:
+            duration = time.perf_counter_ns() - start
+            _current_calls.reset(token)
+            _emit(CallEvent(SERVICE, name, duration, error, calls))
+
+    return wrapper
+
+
+class InstrumentedTaskRepository(TaskRepository):
+    """
+    Wrapper that reports every repository call to the registered hooks and
+    attributes it to the service call in progress. Only wrap a repository
+    when instrumentation is wanted; unwrapped repositories pay nothing.
+    """
+
+    def __init__(self, repository: TaskRepository):
+        self._repository = repository
+
+    def _call(self, operation: str, function, *args, **kwargs):
+        if not _hooks:
+            return function(*args, **kwargs)
+        error = None
+        start = time.perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        except Exception as exc:
+            error = type(exc).__name__
+            raise
+        finally:
+            self._finish(operation, time.perf_counter_ns() - start, error)
+
+    @staticmethod
+    def _finish(operation: str, duration: int, error: Optional[str]) -> None:
+        calls = _current_calls.get()
+        if calls is not None:
+            calls.append((operation, duration))
+        _emit(CallEvent(REPOSITORY, operation, duration, error))
+
+    def get_all(self) -> List[Task]:
+        """Return all tasks"""
+        return self._call('get_all', self._repository.get_all)
+
+    def get_by_id(self, task_id: int) -> Optional[Task]:
+        """Find task by ID"""
+        return self._call('get_by_id', self._repository.get_by_id, task_id)
+
+    def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                   limit: Optional[int] = None) -> Iterator[Task]:
+        """Yield tasks in ID order; the time spent producing them is recorded once the caller is done"""
+        tasks = self._repository.iter_tasks(completed=completed, after_id=after_id, limit=limit)
+        if not _hooks:
+            return tasks
+        return self._timed_iteration('iter_tasks', tasks)
+
+    def query(self, query: TaskQuery) -> Iterator[Task]:
+        """Yield the tasks matching a query, timed like iter_tasks"""
+        tasks = self._repository.query(query)
+        if not _hooks:
+            return tasks
+        return self._timed_iteration('query', tasks)
+
+    def _timed_iteration(self, operation: str, tasks: Iterator[Task]) -> Iterator[Task]:
+        elapsed = 0
+        iterator = iter(tasks)
+        try:
+            while True:
+                start = time.perf_counter_ns()
+                try:
+                    task = next(iterator)
+                except StopIteration:
+                    elapsed += time.perf_counter_ns() - start
+                    return
+                elapsed += time.perf_counter_ns() - start
+                yield task
+        finally:
+            self._finish(operation, elapsed, None)
+
+    def task_stats(self) -> TaskStats:
+        """Return task counts"""
+        return self._call('task_stats', self._repository.task_stats)
+
+    def add(self, task: Task) -> Task:
+        """Add a new task to the repository"""
+        return self._call('add', self._repository.add, task)
+
+    def update(self, task_id: int, **updates) -> Optional[Task]:
+        """Update a task by ID"""
+        return self._call('update', self._repository.update, task_id, **updates)
+
+    def update_if(self, task_id: int, expected_version: Optional[int] = None, **updates) -> MutationResult:
+        """Conditionally update a task"""
+        return self._call('update_if', self._repository.update_if, task_id, expected_version, **updates)
+
+    def complete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally mark a task as completed"""
+        return self._call('complete_if', self._repository.complete_if, task_id, expected_version)
+
+    def delete(self, task_id: int) -> bool:
+        """Delete a task by ID"""
+        return self._call('delete', self._repository.delete, task_id)
+
+    def delete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally delete a task"""
+        return self._call('delete_if', self._repository.delete_if, task_id, expected_version)
+
+    def generate_id(self) -> int:
+        """Generate next available ID"""
+        return self._call('generate_id', self._repository.generate_id)
+
+    def get_many(self, task_ids: Iterable[int]) -> Dict[int, Task]:
+        """Find several tasks by ID"""
+        return self._call('get_many', self._repository.get_many, task_ids)
+
+    def add_many(self, tasks: List[Task]) -> List[Task]:
+        """Add a batch of tasks"""
+        return self._call('add_many', self._repository.add_many, tasks)
+
+    def update_many(self, updates: Dict[int, Dict]) -> List[Task]:
+        """Apply per-task field updates"""
+        return self._call('update_many', self._repository.update_many, updates)
+
+    def delete_many(self, task_ids: Iterable[int]) -> int:
+        """Delete a batch of tasks"""
+        return self._call('delete_many', self._repository.delete_many, task_ids)
+
+    def generate_ids(self, count: int) -> List[int]:
+        """Reserve a block of IDs"""
+        return self._call('generate_ids', self._repository.generate_ids, count)
+
+    def flush(self) -> None:
+        """Flush the wrapped repository"""
+        self._call('flush', self._repository.flush)
+
+    def close(self) -> None:
+        """Close the wrapped repository"""
+        self._repository.close()
+
+
+# -- Aggregation ------------------------------------------------------------------
+
+def _bucket(duration_ns: int) -> int:
+    micros = duration_ns // 1000
+    for bound in _BUCKET_BOUNDS:
+        if micros < bound:
+            return bound
+    return _BUCKET_BOUNDS[-1]
+
+
+@dataclass(slots=True)
+class OperationStats:
+    """Aggregated figures for one operation of one layer"""
+    count: int = 0
+    errors: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+    # Upper bound in microseconds -> number of calls that finished under it
+    histogram: Dict[int, int] = field(default_factory=dict)
+    # Repository operation -> calls made on behalf of this service operation
+    repository_calls: Dict[str, int] = field(default_factory=dict)
+
+    def percentile(self, fraction: float) -> int:
+        """Upper bound in microseconds of the bucket holding the given fraction of calls"""
+        wanted = fraction * self.count
+        seen = 0
+        for bound in sorted(self.histogram):
+            seen += self.histogram[bound]
+            if seen >= wanted:
+                return bound
+        return 0
+
+
+class PerfRecorder(InstrumentationHook):
+    """
+    Hook that aggregates call counts, error counts, latency histograms and
+    repository round trips per operation, and keeps the slowest service
+    calls together with the repository calls behind them. Dumps are plain
+    JSON and can be merged, so figures can accumulate across runs.
+    """
+
+    def __init__(self):
+        self._operations: Dict[Tuple[str, str], OperationStats] = {}
+        # Min-heap of (duration_ns, sequence, entry) holding the slowest service calls
+        self._slowest: List[Tuple[int, int, dict]] = []
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def record(self, event: CallEvent) -> None:
+        with self._lock:
+            stats = self._operations.get((event.layer, event.operation))
+            if stats is None:
+                stats = self._operations[(event.layer, event.operation)] = OperationStats()
+            stats.count += 1
+            stats.total_ns += event.duration_ns
+            stats.max_ns = max(stats.max_ns, event.duration_ns)
+            bucket = _bucket(event.duration_ns)
+            stats.histogram[bucket] = stats.histogram.get(bucket, 0) + 1
+            if event.error is not None:
+                stats.errors += 1
+            if event.layer == SERVICE:
+                for operation, _ in event.repository_calls:
+                    stats.repository_calls[operation] = stats.repository_calls.get(operation, 0) + 1
+                self._remember_slow(event)
+
+    def _remember_slow(self, event: CallEvent) -> None:
+        if len(self._slowest) >= _SLOWEST and event.duration_ns <= self._slowest[0][0]:
+            return
+        self._sequence += 1
+        entry = {
+            'operation': event.operation,
+            'duration_us': event.duration_ns / 1000,
+            'error': event.error,
+            'repository_calls': [[operation, duration / 1000] for operation, duration in event.repository_calls],
+        }
+        item = (event.duration_ns, self._sequence, entry)
+        if len(self._slowest) < _SLOWEST:
+            heapq.heappush(self._slowest, item)
+        else:
+            heapq.heapreplace(self._slowest, item)
+
+    def operations(self) -> Dict[Tuple[str, str], OperationStats]:
+        """Return the aggregated figures keyed by (layer, operation)"""
+        with self._lock:
+            return dict(self._operations)
+
+    def dump(self) -> dict:
+        """Return the recorded figures as JSON-serialisable data"""
+        with self._lock:
+            return {
+                'operations': [
+                    {
+                        'layer': layer,
+                        'operation': operation,
+                        'count': stats.count,
+                        'errors': stats.errors,
+                        'total_us': stats.total_ns / 1000,
+                        'max_us': stats.max_ns / 1000,
+                        'histogram_us': {str(bound): count for bound, count in sorted(stats.histogram.items())},
+                        'repository_calls': dict(stats.repository_calls),
+                    }
+                    for (layer, operation), stats in sorted(self._operations.items())
+                ],
+                'slowest': [entry for _, _, entry in sorted(self._slowest, reverse=True)],
+            }
+
+    def merge(self, dump: dict) -> None:
+        """Add the figures from an earlier dump into this recorder"""
+        with self._lock:
+            for item in dump.get('operations', ()):
+                key = (item['layer'], item['operation'])
+                stats = self._operations.get(key)
+                if stats is None:
+                    stats = self._operations[key] = OperationStats()
+                stats.count += item['count']
+                stats.errors += item['errors']
+                stats.total_ns += int(item['total_us'] * 1000)
+                stats.max_ns = max(stats.max_ns, int(item['max_us'] * 1000))
+                for bound, count in item['histogram_us'].items():
+                    stats.histogram[int(bound)] = stats.histogram.get(int(bound), 0) + count
+                for operation, count in item['repository_calls'].items():
+                    stats.repository_calls[operation] = stats.repository_calls.get(operation, 0) + count
+            for entry in dump.get('slowest', ()):
+                self._sequence += 1
+                item = (int(entry['duration_us'] * 1000), self._sequence, entry)
+                if len(self._slowest) < _SLOWEST:
+                    heapq.heappush(self._slowest, item)
+                elif item[0] > self._slowest[0][0]:
+                    heapq.heapreplace(self._slowest, item)
+
+    def save(self, path: str) -> None:
+        """Merge this recorder into the dump stored at path, creating it if needed"""
+        import json
+        combined = PerfRecorder()
+        try:
+            with open(path, encoding='utf-8') as stored:
+                combined.merge(json.load(stored))
+        except FileNotFoundError:
+            pass
+        combined.merge(self.dump())
+        with open(path, 'w', encoding='utf-8') as output:
+            json.dump(combined.dump(), output, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "PerfRecorder":
+        """Read a recorder back from a dump file"""
+        import json
+        recorder = cls()
+        with open(path, encoding='utf-8') as stored:
+            recorder.merge(json.load(stored))
+        return recorder
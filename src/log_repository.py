@@ -0,0 +1,380 @@
+import json
+import math
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .models import MutationResult, Task, TaskQuery, TaskStats
+from .repository import IndexedTaskRepository, TaskRepository
+
+
+# Every record is framed as <payload length, crc32 of payload> + payload
+_HEADER = struct.Struct("<II")
+
+_LOG_PREFIX = "log."
+_SNAPSHOT_PREFIX = "snapshot."
+
+_OP_ADD = "a"
+_OP_UPDATE = "u"
+_OP_DELETE = "d"
+_OP_META = "m"
+_OP_BATCH = "b"
+
+_UPDATABLE_FIELDS = ('title', 'description', 'completed')
+
+
+def encode_record(payload: list) -> bytes:
+    """Encode one record with its length and checksum header"""
+    data = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return _HEADER.pack(len(data), zlib.crc32(data)) + data
+
+
+def read_records(data: bytes) -> Tuple[List[list], int]:
+    """
+    Decode records from a buffer.
+    Returns the decoded records and the offset just past the last intact one;
+    a torn or corrupt tail stops decoding instead of raising.
+    """
+    records = []
+    offset = 0
+    end = len(data)
+    while offset + _HEADER.size <= end:
+        length, checksum = _HEADER.unpack_from(data, offset)
+        start = offset + _HEADER.size
+        if start + length > end:
+            break
+        payload = data[start:start + length]
+        if zlib.crc32(payload) != checksum:
+            break
+        try:
+            records.append(json.loads(payload))
+        except ValueError:
+            break
+        offset = start + length
+    return records, offset
+
+
+def _known_fields(updates: Dict) -> Dict:
+    return {field: updates[field] for field in _UPDATABLE_FIELDS if field in updates}
+
+
+def task_record(task: Task) -> list:
+    return [_OP_ADD, task.id, task.title, task.description, task.completed, task.version]
+
+
+def apply_record(state: IndexedTaskRepository, record: list) -> None:
+    """Replay one log record against an in-memory state"""
+    op = record[0]
+    if op == _OP_ADD:
+        # Logs written before versioning carry no version field
+        _, task_id, title, description, completed, *version = record
+        state.add(Task(id=task_id, title=title, description=description, completed=completed,
+                       version=version[0] if version else 1))
+    elif op == _OP_UPDATE:
+        state.update(record[1], **record[2])
+    elif op == _OP_DELETE:
+        state.delete(record[1])
+    elif op == _OP_BATCH:
+        # A batch is one framed record, so it is replayed all or nothing
+        for inner in record[1]:
+            apply_record(state, inner)
+
+
+class LogTaskRepository(TaskRepository):
+    """
+    Durable repository that appends every mutation to an operation log.
+
+    The live state is an IndexedTaskRepository held in memory. Writes are
+    appended to ``log.<generation>`` and handed to the OS at once, so they
+    survive the process dying. They are fsynced in groups: by the writer
+    once ``sync_every`` records are unsynced, and by a background thread
+    ``sync_interval`` seconds after the first unsynced record, so an
+    acknowledged write is exposed to a machine crash for at most that long
+    even if no further writes arrive. After ``snapshot_every`` records the state is
+    written to ``snapshot.<generation + 1>`` and a fresh log is started, so
+    recovery only replays the log written since the newest snapshot.
+    """
+
+    def __init__(self, directory: str, sync_every: int = 64, sync_interval: float = 0.05,
+                 snapshot_every: int = 10_000):
+        self._directory = directory
+        self._sync_every = sync_every
+        self._sync_interval = sync_interval
+        self._snapshot_every = snapshot_every
+        self._state = IndexedTaskRepository()
+        self._appended = 0
+        self._synced = 0
+        # When the oldest record not yet fsynced was written; None when all are
+        self._unsynced_since: Optional[float] = None
+        self._log_records = 0
+        self._closed = False
+        # Guards the log buffer and the counters above; never held across an fsync
+        self._lock = threading.Lock()
+        self._sync_due = threading.Condition(self._lock)
+        # Held across an fsync, so compaction never closes the log under one
+        self._sync_lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self._generation = self._recover()
+        self._log = open(self._log_path(self._generation), 'ab')
+        self._thread: Optional[threading.Thread] = None
+        if math.isfinite(sync_interval):
+            self._thread = threading.Thread(target=self._run_syncs, name="log-sync", daemon=True)
+            self._thread.start()
+
+    # -- Recovery -----------------------------------------------------------
+
+    def _log_path(self, generation: int) -> str:
+        return os.path.join(self._directory, f"{_LOG_PREFIX}{generation:08d}")
+
+    def _snapshot_path(self, generation: int) -> str:
+        return os.path.join(self._directory, f"{_SNAPSHOT_PREFIX}{generation:08d}")
+
+    def _generations(self, prefix: str) -> List[int]:
+        generations = []
+        for name in os.listdir(self._directory):
+            suffix = name[len(prefix):]
+            if name.startswith(prefix) and suffix.isdigit():
+                generations.append(int(suffix))
+        return sorted(generations, reverse=True)
+
+    def _load_snapshot(self, generation: int) -> Optional[IndexedTaskRepository]:
+        with open(self._snapshot_path(generation), 'rb') as snapshot:
+            records, _ = read_records(snapshot.read())
+        if not records or records[0][0] != _OP_META or len(records) != records[0][2] + 1:
+            return None
+        state = IndexedTaskRepository()
+        for record in records[1:]:
+            apply_record(state, record)
+        state._next_id = max(state._next_id, records[0][1])
+        return state
+
+    def _recover(self) -> int:
+        """Load the newest intact snapshot and replay the log written after it"""
+        generation = 0
+        for candidate in self._generations(_SNAPSHOT_PREFIX):
+            state = self._load_snapshot(candidate)
+            if state is not None:
+                self._state = state
+                generation = candidate
+                break
+
+        log_path = self._log_path(generation)
+        if os.path.exists(log_path):
+            with open(log_path, 'rb') as log:
+                data = log.read()
+            records, valid_length = read_records(data)
+            for record in records:
+                apply_record(self._state, record)
+            self._log_records = len(records)
+            if valid_length < len(data):
+                # Drop a torn tail left behind by a crash mid-write
+                with open(log_path, 'r+b') as log:
+                    log.truncate(valid_length)
+                    os.fsync(log.fileno())
+        return generation
+
+    # -- Log writing ----------------------------------------------------------
+
+    @property
+    def log_records(self) -> int:
+        """Number of operations written to the current log since the last snapshot"""
+        return self._log_records
+
+    def _append(self, records: List[list], operations: Optional[int] = None) -> None:
+        with self._lock:
+            self._log.write(b"".join(encode_record(record) for record in records))
+            self._log.flush()
+            self._appended += len(records)
+            if self._unsynced_since is None:
+                self._unsynced_since = time.monotonic()
+                self._sync_due.notify()
+            sync = self._appended - self._synced >= self._sync_every
+        # Batches count every operation they carry towards the next snapshot
+        self._log_records += len(records) if operations is None else operations
+        if sync:
+            self.flush()
+        if self._log_records >= self._snapshot_every:
+            self.compact()
+
+    def flush(self) -> None:
+        """Write buffered records and fsync the log"""
+        with self._sync_lock:
+            started = time.monotonic()
+            with self._lock:
+                self._log.flush()
+                covered = self._appended
+            os.fsync(self._log.fileno())
+            with self._lock:
+                self._synced = covered
+                # Records appended during the fsync came after it started
+                self._unsynced_since = started if self._appended > covered else None
+
+    def _run_syncs(self) -> None:
+        """Sync thread: fsync the log sync_interval seconds after its first unsynced record"""
+        while True:
+            with self._lock:
+                while not self._closed:
+                    if self._unsynced_since is None:
+                        self._sync_due.wait()
+                        continue
+                    remaining = self._unsynced_since + self._sync_interval - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._sync_due.wait(remaining)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                # Left unsynced, so the next flush retries and raises
+                with self._lock:
+                    self._sync_due.wait_for(lambda: self._closed, self._sync_interval)
+
+    def compact(self) -> None:
+        """Snapshot the current state and start a new, empty log"""
+        with self._sync_lock:
+            self._compact()
+
+    def _compact(self) -> None:
+        self.flush()
+        generation = self._generation + 1
+        path = self._snapshot_path(generation)
+        tasks = self._state.get_all()
+        with open(path + ".tmp", 'wb') as snapshot:
+            snapshot.write(encode_record([_OP_META, self._state._next_id, len(tasks)]))
+            snapshot.write(b"".join(encode_record(task_record(task)) for task in tasks))
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(path + ".tmp", path)
+        self._sync_directory()
+
+        with self._lock:
+            self._log.close()
+            self._log = open(self._log_path(generation), 'ab')
+        self._generation = generation
+        self._log_records = 0
+        for old in self._generations(_SNAPSHOT_PREFIX):
+            if old < generation:
+                os.remove(self._snapshot_path(old))
+        for old in self._generations(_LOG_PREFIX):
+            if old < generation:
+                os.remove(self._log_path(old))
+
+    def _sync_directory(self) -> None:
+        if hasattr(os, 'O_DIRECTORY'):
+            fd = os.open(self._directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    # -- TaskRepository -------------------------------------------------------
+
+    def get_all(self) -> List[Task]:
+        """Return all tasks"""
+        return self._state.get_all()
+
+    def get_by_id(self, task_id: int) -> Optional[Task]:
+        """Find task by ID"""
+        return self._state.get_by_id(task_id)
+
+    def task_stats(self) -> TaskStats:
+        """Return task counts from the in-memory state"""
+        return self._state.task_stats()
+
+    def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                   limit: Optional[int] = None) -> Iterator[Task]:
+        """Yield tasks in ID order without copying the store"""
+        return self._state.iter_tasks(completed, after_id, limit)
+
+    def query(self, query: TaskQuery) -> Iterator[Task]:
+        """Yield the tasks matching a query using the in-memory state's indexes"""
+        return self._state.query(query)
+
+    def add(self, task: Task) -> Task:
+        """Add a new task to the repository"""
+        self._state.add(task)
+        self._append([task_record(task)])
+        return task
+
+    def update(self, task_id: int, **updates) -> Optional[Task]:
+        """Update a task by ID"""
+        task = self._state.update(task_id, **updates)
+        if task is not None:
+            # Logged even without changes so replay bumps the version too
+            self._append([[_OP_UPDATE, task_id, _known_fields(updates)]])
+        return task
+
+    def update_if(self, task_id: int, expected_version: Optional[int] = None, **updates) -> MutationResult:
+        """Conditionally update a task; only successful updates are logged"""
+        result = self._state.update_if(task_id, expected_version, **updates)
+        if result.ok:
+            self._append([[_OP_UPDATE, task_id, _known_fields(updates)]])
+        return result
+
+    def delete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally delete a task; only successful deletes are logged"""
+        result = self._state.delete_if(task_id, expected_version)
+        if result.ok:
+            self._append([[_OP_DELETE, task_id]])
+        return result
+
+    def delete(self, task_id: int) -> bool:
+        """Delete a task by ID"""
+        deleted = self._state.delete(task_id)
+        if deleted:
+            self._append([[_OP_DELETE, task_id]])
+        return deleted
+
+    def generate_id(self) -> int:
+        """Generate next available ID"""
+        return self._state.generate_id()
+
+    def add_many(self, tasks: List[Task]) -> List[Task]:
+        """Add a batch of tasks as a single atomic log record"""
+        if not tasks:
+            return []
+        self._state.add_many(tasks)
+        self._append_batch([task_record(task) for task in tasks])
+        return list(tasks)
+
+    def update_many(self, updates: Dict[int, Dict]) -> List[Task]:
+        """Apply a batch of updates as a single atomic log record"""
+        updated = []
+        records = []
+        for task_id, fields in updates.items():
+            task = self._state.update(task_id, **fields)
+            if task is not None:
+                updated.append(task)
+                records.append([_OP_UPDATE, task_id, _known_fields(fields)])
+        self._append_batch(records)
+        return updated
+
+    def delete_many(self, task_ids: Iterable[int]) -> int:
+        """Delete a batch of tasks as a single atomic log record"""
+        records = [[_OP_DELETE, task_id] for task_id in task_ids if self._state.delete(task_id)]
+        self._append_batch(records)
+        return len(records)
+
+    def generate_ids(self, count: int) -> List[int]:
+        """Reserve a block of IDs"""
+        return self._state.generate_ids(count)
+
+    def _append_batch(self, records: List[list]) -> None:
+        if len(records) == 1:
+            self._append(records)
+        elif records:
+            self._append([[_OP_BATCH, records]], operations=len(records))
+
+    def close(self) -> None:
+        """Stop the sync thread, flush outstanding records and close the log"""
+        with self._lock:
+            self._closed = True
+            self._sync_due.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        if not self._log.closed:
+            self.flush()
+            self._log.close()
@@ -0,0 +1,29 @@
+from typing import Callable, List, Optional
+
+# Classes whose marked methods are swapped for timed versions while hooks exist
+instrumented_classes: List[type] = []
+# Set by src.instrumentation once imported; until then no hooks can exist
+on_register: Optional[Callable[[type], None]] = None
+
+
+def instrumented(method):
+    """Mark a method of an instrumented_class to be timed while hooks are registered"""
+    method.__instrumented__ = True
+    return method
+
+
+def instrumented_class(cls):
+    """
+    Register a class whose instrumented methods are timed.
+    The timed wrappers are only put in place while at least one hook is
+    registered, so with no hooks the methods run exactly as written.
+    Marking lives here rather than in src.instrumentation so the classes
+    can be defined without importing the instrumentation itself.
+    """
+    cls.__plain_methods__ = {
+        name: member for name, member in vars(cls).items() if getattr(member, '__instrumented__', False)
+    }
+    instrumented_classes.append(cls)
+    if on_register is not None:
+        on_register(cls)
+    return cls
@@ -1,9 +1,85 @@
 from dataclasses import dataclass
+from enum import Enum
 from typing import Optional
 
-@dataclass
+# slots=True drops the per-instance __dict__, which dominates memory in large stores
+@dataclass(slots=True)
 class Task:
     id: int
     title: str
     description: Optional[str] = None
-    completed: bool = False
\ No newline at end of file
+    completed: bool = False
+    # Incremented by every update; used for optimistic concurrency checks
+    version: int = 1
+
+
+class MutationStatus(Enum):
+    OK = "ok"
+    NOT_FOUND = "not_found"
+    CONFLICT = "conflict"
+
+
+@dataclass(slots=True)
+class MutationResult:
+    """
+    Outcome of a conditional mutation.
+    task is the task after the change for OK, the current task for
+    CONFLICT, and None for NOT_FOUND.
+    """
+    status: MutationStatus
+    task: Optional[Task] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status is MutationStatus.OK
+
+
+@dataclass(slots=True)
+class TaskStats:
+    """Task counts maintained by the repository as tasks change"""
+    total: int = 0
+    completed: int = 0
+
+    @property
+    def pending(self) -> int:
+        return self.total - self.completed
+
+
+# Orders a TaskQuery can sort by; ties are broken by ID in the same direction
+SORT_FIELDS = ('id', 'title')
+
+
+@dataclass(slots=True, frozen=True)
+class TaskQuery:
+    """
+    Filters, sort order and limit for TaskRepository.query.
+    All filters are optional: completed matches the status, min_id and
+    max_id bound the ID range (inclusive) and title_prefix is matched
+    case-sensitively against the start of the title.
+    """
+    completed: Optional[bool] = None
+    min_id: Optional[int] = None
+    max_id: Optional[int] = None
+    title_prefix: Optional[str] = None
+    order_by: str = 'id'
+    descending: bool = False
+    limit: Optional[int] = None
+
+    def __post_init__(self):
+        if self.order_by not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by {self.order_by}; choose from {', '.join(SORT_FIELDS)}")
+        if self.limit is not None and self.limit < 0:
+            raise ValueError("Limit cannot be negative")
+
+    def matches(self, task: Task) -> bool:
+        """Return True when the task passes every filter"""
+        return ((self.completed is None or task.completed == self.completed)
+                and (self.min_id is None or task.id >= self.min_id)
+                and (self.max_id is None or task.id <= self.max_id)
+                and (not self.title_prefix or task.title.startswith(self.title_prefix)))
+
+    def sort_key(self):
+        """Key function giving the query's order, before any reversal for descending"""
+        if self.order_by == 'title':
+            return lambda task: (task.title, task.id)
+        return lambda task: task.id
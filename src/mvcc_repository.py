@@ -0,0 +1,326 @@
+import threading
+from itertools import chain
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .models import MutationResult, MutationStatus, Task, TaskQuery, TaskStats
+from .repository import TaskRepository, apply_updates, paginate, run_query
+
+# The trie consumes task IDs five bits per level, so every node has up to 32
+# children. A node is a (bitmap, children) pair: bit i of the bitmap is set
+# when digit i has a child, and children holds only the present ones, in
+# digit order. Leaf-level children are the tasks themselves. Nodes are
+# tuples and never modified; a write copies the path from the root to the
+# changed task and shares every other node with the previous version.
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+
+_Node = Tuple[int, tuple]
+
+
+def _lookup(node: Optional[_Node], shift: int, key: int) -> Optional[Task]:
+    while node is not None:
+        bitmap, children = node
+        bit = 1 << ((key >> shift) & _MASK)
+        if not bitmap & bit:
+            return None
+        node = children[(bitmap & (bit - 1)).bit_count()]
+        if shift == 0:
+            return node
+        shift -= _BITS
+    return None
+
+
+def _assoc(node: Optional[_Node], shift: int, key: int, task: Task) -> _Node:
+    """Return a copy of node with key set to task"""
+    bit = 1 << ((key >> shift) & _MASK)
+    if node is None:
+        return bit, (task if shift == 0 else _assoc(None, shift - _BITS, key, task),)
+    bitmap, children = node
+    position = (bitmap & (bit - 1)).bit_count()
+    if bitmap & bit:
+        child = task if shift == 0 else _assoc(children[position], shift - _BITS, key, task)
+        return bitmap, children[:position] + (child,) + children[position + 1:]
+    child = task if shift == 0 else _assoc(None, shift - _BITS, key, task)
+    return bitmap | bit, children[:position] + (child,) + children[position:]
+
+
+def _dissoc(node: _Node, shift: int, key: int) -> Optional[_Node]:
+    """Return a copy of node without key, which must be present; None when nothing is left"""
+    bitmap, children = node
+    bit = 1 << ((key >> shift) & _MASK)
+    position = (bitmap & (bit - 1)).bit_count()
+    if shift:
+        child = _dissoc(children[position], shift - _BITS, key)
+        if child is not None:
+            return bitmap, children[:position] + (child,) + children[position + 1:]
+    bitmap &= ~bit
+    if not bitmap:
+        return None
+    return bitmap, children[:position] + children[position + 1:]
+
+
+def _walk(children: tuple, shift: int) -> Iterator[Task]:
+    """Iterate every task under children, which belong to a node at shift"""
+    if shift == 0:
+        return iter(children)
+    # Nested chains keep the per-task work in C rather than in a generator per level
+    return chain.from_iterable(_walk(child[1], shift - _BITS) for child in children)
+
+
+def _iterate(node: _Node, shift: int, lower: int) -> Iterator[Task]:
+    """Iterate the tasks under node with ID at least lower, in ID order"""
+    # Descend along the lower bound; at each level the siblings to the right
+    # of the bound's digit are taken whole
+    parts = []
+    while True:
+        bitmap, children = node
+        start = (lower >> shift) & _MASK
+        position = (bitmap & ((1 << start) - 1)).bit_count()
+        if shift == 0 or not bitmap >> start & 1:
+            parts.append(_walk(children[position:], shift))
+            break
+        parts.append(_walk(children[position + 1:], shift))
+        node = children[position]
+        shift -= _BITS
+    return chain.from_iterable(reversed(parts))
+
+
+@dataclass(slots=True, frozen=True)
+class _Version:
+    """The trie root with the counts that go with it; replaced as a whole by every write"""
+    root: Optional[_Node] = None
+    # Shift of the root level; the trie holds IDs below 1 << (shift + _BITS)
+    shift: int = 0
+    total: int = 0
+    completed: int = 0
+
+    def get(self, task_id: int) -> Optional[Task]:
+        if task_id < 0 or task_id >> (self.shift + _BITS):
+            return None
+        return _lookup(self.root, self.shift, task_id)
+
+    def scan(self, after_id: Optional[int] = None) -> Iterator[Task]:
+        lower = 0 if after_id is None else max(after_id + 1, 0)
+        if self.root is None or lower >> (self.shift + _BITS):
+            return iter(())
+        return _iterate(self.root, self.shift, lower)
+
+    def put(self, task_id: int, previous: Optional[Task], task: Optional[Task]) -> "_Version":
+        """Return the version with task_id changed from previous to task; None on either side means absent"""
+        root, shift, total, completed = self.root, self.shift, self.total, self.completed
+        if previous is not None:
+            total -= 1
+            completed -= previous.completed
+        if task is None:
+            if previous is not None:
+                root = _dissoc(root, shift, task_id)
+        else:
+            while task_id >> (shift + _BITS):
+                # Grow upwards: every existing ID has digit 0 at the new level
+                root = (1, (root,)) if root is not None else None
+                shift += _BITS
+            root = _assoc(root, shift, task_id, task)
+            total += 1
+            completed += task.completed
+        return _Version(root, shift, total, completed)
+
+
+class TaskSnapshot:
+    """
+    Read-only, point-in-time view of an MvccTaskRepository.
+    Later writes to the repository are never visible through it, and
+    holding it does not block them.
+    """
+
+    __slots__ = ('_version',)
+
+    def __init__(self, version: _Version):
+        self._version = version
+
+    def __len__(self) -> int:
+        return self._version.total
+
+    def __iter__(self) -> Iterator[Task]:
+        return self._version.scan()
+
+    def get_by_id(self, task_id: int) -> Optional[Task]:
+        """Find task by ID"""
+        return self._version.get(task_id)
+
+    def get_all(self) -> List[Task]:
+        """Return all tasks in ID order"""
+        return list(self._version.scan())
+
+    def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                   limit: Optional[int] = None) -> Iterator[Task]:
+        """Yield tasks in ID order, optionally filtered by status, after a cursor and up to a limit"""
+        return paginate(self._version.scan(after_id), completed, None, limit)
+
+    def query(self, query: TaskQuery) -> Iterator[Task]:
+        """Yield the tasks matching a query, in its sort order"""
+        after_id = None if query.min_id is None else query.min_id - 1
+        return run_query(self.iter_tasks(completed=query.completed, after_id=after_id), query)
+
+    def task_stats(self) -> TaskStats:
+        """Return the task counts as of the snapshot"""
+        return TaskStats(total=self._version.total, completed=self._version.completed)
+
+
+class MvccTaskRepository(TaskRepository):
+    """
+    Multi-version in-memory repository built on a persistent radix trie
+    keyed by task ID.
+
+    Stored tasks are never modified: add stores a copy and update stores a
+    changed copy, and each write publishes a new version of the trie that
+    shares all untouched nodes with the one before. snapshot() is therefore
+    O(1) and gives a consistent view for as long as it is held, and
+    iter_tasks and query iterate the version current when they were called.
+    Readers take no lock; writers are serialised, and a batch operation
+    publishes all of its changes as one version.
+
+    Lookups and writes cost O(log32 n) node visits and copies. Tasks handed
+    out are shared with every snapshot that contains them, so callers must
+    not modify them directly. Task IDs must be non-negative.
+    """
+
+    def __init__(self):
+        self._version = _Version()
+        self._next_id: int = 1
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> TaskSnapshot:
+        """Return a point-in-time view of every task"""
+        return TaskSnapshot(self._version)
+
+    # -- Reads ----------------------------------------------------------------
+
+    def get_all(self) -> List[Task]:
+        """Return all tasks in ID order"""
+        return list(self._version.scan())
+
+    def get_by_id(self, task_id: int) -> Optional[Task]:
+        """Find task by ID"""
+        return self._version.get(task_id)
+
+    def get_many(self, task_ids: Iterable[int]) -> Dict[int, Task]:
+        """Find several tasks by ID, all from the same version"""
+        version = self._version
+        found = {}
+        for task_id in task_ids:
+            task = version.get(task_id)
+            if task is not None:
+                found[task_id] = task
+        return found
+
+    def task_stats(self) -> TaskStats:
+        """Return task counts kept with the current version"""
+        version = self._version
+        return TaskStats(total=version.total, completed=version.completed)
+
+    def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                   limit: Optional[int] = None) -> Iterator[Task]:
+        """Yield tasks in ID order from the version current at the call"""
+        return self.snapshot().iter_tasks(completed, after_id, limit)
+
+    def query(self, query: TaskQuery) -> Iterator[Task]:
+        """Yield the tasks matching a query from the version current at the call"""
+        return self.snapshot().query(query)
+
+    # -- Writes ---------------------------------------------------------------
+
+    def _updated(self, version: _Version, task_id: int, updates: Dict) -> Tuple[_Version, Optional[Task]]:
+        previous = version.get(task_id)
+        if previous is None:
+            return version, None
+        task = apply_updates(replace(previous), updates)
+        return version.put(task_id, previous, task), task
+
+    def add(self, task: Task) -> Task:
+        """Add a copy of a task, replacing any task with the same ID"""
+        return self.add_many([task])[0]
+
+    def add_many(self, tasks: List[Task]) -> List[Task]:
+        """Add copies of a batch of tasks as one version"""
+        if any(task.id < 0 for task in tasks):
+            raise ValueError("Task IDs must be non-negative")
+        stored = [replace(task) for task in tasks]
+        with self._lock:
+            version = self._version
+            for task in stored:
+                version = version.put(task.id, version.get(task.id), task)
+                # Keep generated IDs ahead of explicitly chosen ones
+                self._next_id = max(self._next_id, task.id + 1)
+            self._version = version
+        return stored
+
+    def update(self, task_id: int, **updates) -> Optional[Task]:
+        """Replace a task with an updated copy"""
+        with self._lock:
+            self._version, task = self._updated(self._version, task_id, updates)
+        return task
+
+    def update_many(self, updates: Dict[int, Dict]) -> List[Task]:
+        """Apply per-task field updates as one version"""
+        updated = []
+        with self._lock:
+            version = self._version
+            for task_id, fields in updates.items():
+                version, task = self._updated(version, task_id, fields)
+                if task is not None:
+                    updated.append(task)
+            self._version = version
+        return updated
+
+    def update_if(self, task_id: int, expected_version: Optional[int] = None, **updates) -> MutationResult:
+        """Update a task if it is still at expected_version, checked and applied under the write lock"""
+        with self._lock:
+            current = self._version.get(task_id)
+            if current is None:
+                return MutationResult(MutationStatus.NOT_FOUND)
+            if expected_version is not None and current.version != expected_version:
+                return MutationResult(MutationStatus.CONFLICT, current)
+            self._version, task = self._updated(self._version, task_id, updates)
+        return MutationResult(MutationStatus.OK, task)
+
+    def delete(self, task_id: int) -> bool:
+        """Delete a task by ID"""
+        return self.delete_many([task_id]) == 1
+
+    def delete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Delete a task if it is still at expected_version"""
+        with self._lock:
+            current = self._version.get(task_id)
+            if current is None:
+                return MutationResult(MutationStatus.NOT_FOUND)
+            if expected_version is not None and current.version != expected_version:
+                return MutationResult(MutationStatus.CONFLICT, current)
+            self._version = self._version.put(task_id, current, None)
+        return MutationResult(MutationStatus.OK, current)
+
+    def delete_many(self, task_ids: Iterable[int]) -> int:
+        """Delete a batch of tasks as one version"""
+        deleted = 0
+        with self._lock:
+            version = self._version
+            for task_id in task_ids:
+                previous = version.get(task_id)
+                if previous is not None:
+                    version = version.put(task_id, previous, None)
+                    deleted += 1
+            self._version = version
+        return deleted
+
+    def generate_id(self) -> int:
+        """Generate next available ID"""
+        with self._lock:
+            new_id = self._next_id
+            self._next_id += 1
+        return new_id
+
+    def generate_ids(self, count: int) -> List[int]:
+        """Reserve a block of IDs"""
+        with self._lock:
+            start = self._next_id
+            self._next_id += count
+        return list(range(start, start + count))
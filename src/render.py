@@ -0,0 +1,88 @@
+import os
+import sys
+from contextlib import contextmanager
+from itertools import islice
+from typing import Iterable, Optional, TextIO
+from .models import Task
+
+# Tasks formatted per write; one write per chunk instead of one per line
+CHUNK_SIZE = 1000
+
+
+def format_task(task: Task, indent: str = "", show_description: bool = False, plain: bool = False) -> str:
+    """Format one task as the lines the CLI prints for it, newline-terminated"""
+    if plain:
+        line = f"{indent}{task.id}. {'[x]' if task.completed else '[ ]'} {task.title}\n"
+        if show_description and task.description:
+            line += f"{indent}   {task.description}\n"
+        return line
+    line = f"{indent}{task.id}. {'✅' if task.completed else '⏳'} {task.title}\n"
+    if show_description and task.description:
+        line += f"{indent}   📝 Description: {task.description}\n"
+    return line
+
+
+class TaskRenderer:
+    """
+    Writes task lists in large buffered writes.
+
+    Tasks are formatted a chunk at a time and each chunk goes out as a
+    single write, so rendering a long list costs a handful of write calls
+    instead of one per line. The stream defaults to whatever sys.stdout is
+    when rendering, so redirected output is honoured.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, chunk_size: int = CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+
+    @property
+    def stream(self) -> TextIO:
+        return self._stream if self._stream is not None else sys.stdout
+
+    def write(self, tasks: Iterable[Task], indent: str = "", show_description: bool = False,
+              plain: bool = False, stream: Optional[TextIO] = None) -> int:
+        """Render tasks to the stream; returns how many were written"""
+        out = stream if stream is not None else self.stream
+        iterator = iter(tasks)
+        written = 0
+        while True:
+            chunk = list(islice(iterator, self._chunk_size))
+            if not chunk:
+                break
+            out.write("".join([format_task(task, indent, show_description, plain) for task in chunk]))
+            written += len(chunk)
+        out.flush()
+        return written
+
+
+def pager_command() -> Optional[str]:
+    """Return the pager to use for the terminal, or None when output is not an interactive terminal"""
+    if not sys.stdout.isatty() or not sys.stdin.isatty():
+        return None
+    command = os.environ.get('PAGER')
+    if command is not None:
+        return command or None
+    import shutil
+    return 'less -R' if shutil.which('less') else None
+
+
+@contextmanager
+def open_pager(command: str):
+    """
+    Yield a text stream piped into the pager.
+    Quitting the pager early closes the pipe; the resulting BrokenPipeError
+    is swallowed so the caller just stops producing output.
+    """
+    import subprocess
+    process = subprocess.Popen(command, shell=True, stdin=subprocess.PIPE, text=True, encoding='utf-8')
+    try:
+        yield process.stdin
+    except BrokenPipeError:
+        pass
+    finally:
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        process.wait()
@@ -1,6 +1,56 @@
+import heapq
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from .models import Task
+from bisect import bisect_right
+from itertools import islice, takewhile
+from operator import attrgetter
+from typing import Dict, Iterable, Iterator, List, Optional
+from .models import MutationResult, MutationStatus, Task, TaskQuery, TaskStats
+
+
+# Fields managed by the repository itself, never set through update()
+_PROTECTED_FIELDS = ('id', 'version')
+
+
+def apply_updates(task: Task, updates: Dict) -> Task:
+    """Set the known fields of a task in place and bump its version"""
+    for field, value in updates.items():
+        if field not in _PROTECTED_FIELDS and hasattr(task, field):
+            setattr(task, field, value)
+    task.version += 1
+    return task
+
+
+def paginate(tasks: Iterable[Task], completed: Optional[bool] = None,
+             after_id: Optional[int] = None, limit: Optional[int] = None) -> Iterator[Task]:
+    """Lazily apply a status filter, an ID cursor and a limit to tasks already in ID order"""
+    if after_id is not None:
+        tasks = (task for task in tasks if task.id > after_id)
+    if completed is not None:
+        tasks = (task for task in tasks if task.completed == completed)
+    if limit is not None:
+        tasks = islice(tasks, limit)
+    return iter(tasks)
+
+
+def run_query(tasks: Iterable[Task], query: TaskQuery, filtered: bool = False) -> Iterator[Task]:
+    """
+    Apply a query to tasks supplied in ascending ID order.
+    Ascending ID order streams and stops at max_id; other orders keep at
+    most limit tasks in a heap, or sort every match when there is no limit.
+    Pass filtered=True when the tasks are already known to match.
+    """
+    if not filtered:
+        if query.max_id is not None:
+            max_id = query.max_id
+            tasks = takewhile(lambda task: task.id <= max_id, tasks)
+        tasks = filter(query.matches, tasks)
+    if query.order_by == 'id' and not query.descending:
+        return iter(tasks) if query.limit is None else islice(tasks, query.limit)
+    key = query.sort_key()
+    if query.limit is not None:
+        select = heapq.nlargest if query.descending else heapq.nsmallest
+        return iter(select(query.limit, tasks, key=key))
+    return iter(sorted(tasks, key=key, reverse=query.descending))
 
 
 class TaskRepository(ABC):
@@ -34,11 +84,108 @@ class TaskRepository(ABC):
         """Generate next available ID"""
         pass
 
+    def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                   limit: Optional[int] = None) -> Iterator[Task]:
+        """
+        Yield tasks in ID order, optionally only those with the given status,
+        starting after the cursor ID and stopping after limit tasks.
+        This default sorts a full copy from get_all; backends override it to stream.
+        """
+        return paginate(sorted(self.get_all(), key=attrgetter('id')), completed, after_id, limit)
+
+    def query(self, query: TaskQuery) -> Iterator[Task]:
+        """
+        Yield the tasks matching a query, in its sort order.
+        This default streams iter_tasks from the start of the ID range with
+        the status filter applied; backends override it to use their indexes.
+        """
+        after_id = None if query.min_id is None else query.min_id - 1
+        return run_query(self.iter_tasks(completed=query.completed, after_id=after_id), query)
+
+    def update_if(self, task_id: int, expected_version: Optional[int] = None, **updates) -> MutationResult:
+        """
+        Update a task only if it exists and, when expected_version is given,
+        is still at that version. This default looks the task up and then
+        calls update; backends override it to do a single lookup.
+        """
+        task = self.get_by_id(task_id)
+        if task is None:
+            return MutationResult(MutationStatus.NOT_FOUND)
+        if expected_version is not None and task.version != expected_version:
+            return MutationResult(MutationStatus.CONFLICT, task)
+        return MutationResult(MutationStatus.OK, self.update(task_id, **updates))
+
+    def complete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Mark a task as completed, subject to the same checks as update_if"""
+        return self.update_if(task_id, expected_version, completed=True)
+
+    def delete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Delete a task, subject to the same checks as update_if; the result carries the deleted task"""
+        task = self.get_by_id(task_id)
+        if task is None:
+            return MutationResult(MutationStatus.NOT_FOUND)
+        if expected_version is not None and task.version != expected_version:
+            return MutationResult(MutationStatus.CONFLICT, task)
+        self.delete(task_id)
+        return MutationResult(MutationStatus.OK, task)
+
+    def task_stats(self) -> TaskStats:
+        """
+        Return total and completed task counts.
+        This default counts every task; backends override it to read
+        counters they keep up to date as tasks change.
+        """
+        stats = TaskStats()
+        for task in self.iter_tasks():
+            stats.total += 1
+            stats.completed += task.completed
+        return stats
+
+    def get_many(self, task_ids: Iterable[int]) -> Dict[int, Task]:
+        """Find several tasks by ID; missing IDs are left out of the result"""
+        found = {}
+        for task_id in task_ids:
+            task = self.get_by_id(task_id)
+            if task is not None:
+                found[task_id] = task
+        return found
+
+    def add_many(self, tasks: List[Task]) -> List[Task]:
+        """Add a batch of tasks"""
+        return [self.add(task) for task in tasks]
+
+    def update_many(self, updates: Dict[int, Dict]) -> List[Task]:
+        """Apply per-task field updates; returns the tasks that were found"""
+        updated = []
+        for task_id, fields in updates.items():
+            task = self.update(task_id, **fields)
+            if task is not None:
+                updated.append(task)
+        return updated
+
+    def delete_many(self, task_ids: Iterable[int]) -> int:
+        """Delete a batch of tasks; returns how many were deleted"""
+        return sum(1 for task_id in task_ids if self.delete(task_id))
+
+    def generate_ids(self, count: int) -> List[int]:
+        """Reserve a block of IDs"""
+        return [self.generate_id() for _ in range(count)]
+
+    def flush(self) -> None:
+        """Make every completed write durable; a no-op for stores that write through"""
+        pass
+
+    def close(self) -> None:
+        """Release any resources held by the repository"""
+        pass
+
 
 class InMemoryTaskRepository(TaskRepository):
     def __init__(self):
         self._tasks: List[Task] = []
         self._next_id: int = 1  # For ID generation
+        # Kept current by add, update and delete so task_stats never scans
+        self._completed: int = 0
 
     def get_all(self) -> List[Task]:
         """Return all tasks"""
@@ -54,15 +201,16 @@ class InMemoryTaskRepository(TaskRepository):
     def add(self, task: Task) -> Task:
         """Add a new task to the repository"""
         self._tasks.append(task)
+        self._completed += task.completed
         return task
 
     def update(self, task_id: int, **updates) -> Optional[Task]:
         """Update a task by ID"""
         task = self.get_by_id(task_id)
         if task:
-            for field, value in updates.items():
-                if hasattr(task, field):
-                    setattr(task, field, value)
+            was_completed = task.completed
+            apply_updates(task, updates)
+            self._completed += task.completed - was_completed
             return task
         return None
 
@@ -71,11 +219,171 @@ class InMemoryTaskRepository(TaskRepository):
         task = self.get_by_id(task_id)
         if task:
             self._tasks.remove(task)
+            self._completed -= task.completed
             return True
         return False
 
+    def task_stats(self) -> TaskStats:
+        """Return task counts from the running counter"""
+        return TaskStats(total=len(self._tasks), completed=self._completed)
+
+    def generate_id(self) -> int:
+        """Generate next available ID"""
+        new_id = self._next_id
+        self._next_id += 1
+        return new_id
+
+class IndexedTaskRepository(TaskRepository):
+    """
+    In-memory repository backed by a dict keyed by task ID.
+    Dicts keep insertion order, so get_all returns tasks in the order they
+    were added, while lookups, updates and deletes are O(1).
+    """
+
+    def __init__(self):
+        self._tasks: Dict[int, Task] = {}
+        # Secondary index on the completed flag; dicts are used as ordered sets
+        self._by_status: Dict[bool, Dict[int, None]] = {False: {}, True: {}}
+        self._next_id: int = 1  # For ID generation
+        # True while insertion order matches ID order, which holds for generated IDs
+        self._ordered: bool = True
+
+    def get_all(self) -> List[Task]:
+        """Return all tasks"""
+        return list(self._tasks.values())
+
+    def get_by_status(self, completed: bool) -> List[Task]:
+        """Return all tasks with the given completion status"""
+        tasks = self._tasks
+        return [tasks[task_id] for task_id in self._by_status[bool(completed)]]
+
+    def get_by_id(self, task_id: int) -> Optional[Task]:
+        """Find task by ID"""
+        return self._tasks.get(task_id)
+
+    def task_stats(self) -> TaskStats:
+        """Return task counts from the sizes of the status index"""
+        return TaskStats(total=len(self._tasks), completed=len(self._by_status[True]))
+
+    def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                   limit: Optional[int] = None) -> Iterator[Task]:
+        """
+        Yield tasks in ID order without copying the store.
+        Resuming from a cursor probes the IDs after it instead of rescanning
+        from the start, unless that range is much sparser than the store, in
+        which case the keys are bisected. The store must not change while an
+        iterator that started without a cursor is being consumed; resume
+        with after_id instead.
+        """
+        tasks = self._tasks
+        if not self._ordered:
+            ids = sorted(tasks)
+            if after_id is not None:
+                ids = ids[bisect_right(ids, after_id):]
+            source = (tasks[task_id] for task_id in ids)
+        elif after_id is None:
+            source = tasks.values()
+        elif self._next_id - after_id <= 2 * len(tasks):
+            get = tasks.get
+            source = (task for task in map(get, range(after_id + 1, self._next_id)) if task is not None)
+        else:
+            # Insertion order is ID order here, so the keys are already sorted
+            ids = list(tasks)
+            source = (tasks[task_id] for task_id in ids[bisect_right(ids, after_id):])
+        return paginate(source, completed, None, limit)
+
+    def query(self, query: TaskQuery) -> Iterator[Task]:
+        """
+        Yield the tasks matching a query, reading candidates from the
+        narrowest index: an ID range shorter than the store is probed in the
+        dict, and a status that at most half the tasks have is read from the
+        status index. Anything else is a streaming scan.
+        """
+        tasks = self._tasks
+        if query.min_id is not None and query.max_id is not None and query.max_id - query.min_id < len(tasks):
+            ids = range(query.min_id, query.max_id + 1)
+            return run_query((task for task in map(tasks.get, ids) if task is not None), query)
+        if query.completed is not None and len(self._by_status[query.completed]) * 2 <= len(tasks):
+            # The status index is in the order tasks entered it, not ID order
+            ids = sorted(self._by_status[query.completed])
+            return run_query((tasks[task_id] for task_id in ids), query)
+        return super().query(query)
+
+    def add(self, task: Task) -> Task:
+        """Add a new task to the repository"""
+        previous = self._tasks.get(task.id)
+        if previous is not None:
+            del self._by_status[previous.completed][task.id]
+        elif self._ordered and self._tasks and task.id < next(reversed(self._tasks)):
+            self._ordered = False
+        # Keep generated IDs ahead of explicitly chosen ones
+        self._next_id = max(self._next_id, task.id + 1)
+        self._tasks[task.id] = task
+        self._by_status[task.completed][task.id] = None
+        return task
+
+    def update(self, task_id: int, **updates) -> Optional[Task]:
+        """Update a task by ID"""
+        task = self._tasks.get(task_id)
+        if task is None:
+            return None
+        return self._apply(task, updates)
+
+    def _apply(self, task: Task, updates: Dict) -> Task:
+        was_completed = task.completed
+        apply_updates(task, updates)
+        if task.completed != was_completed:
+            del self._by_status[was_completed][task.id]
+            self._by_status[task.completed][task.id] = None
+        return task
+
+    def update_if(self, task_id: int, expected_version: Optional[int] = None, **updates) -> MutationResult:
+        """Conditionally update a task with a single lookup"""
+        task = self._tasks.get(task_id)
+        if task is None:
+            return MutationResult(MutationStatus.NOT_FOUND)
+        if expected_version is not None and task.version != expected_version:
+            return MutationResult(MutationStatus.CONFLICT, task)
+        return MutationResult(MutationStatus.OK, self._apply(task, updates))
+
+    def delete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally delete a task with a single lookup"""
+        task = self._tasks.get(task_id)
+        if task is None:
+            return MutationResult(MutationStatus.NOT_FOUND)
+        if expected_version is not None and task.version != expected_version:
+            return MutationResult(MutationStatus.CONFLICT, task)
+        del self._tasks[task_id]
+        del self._by_status[task.completed][task_id]
+        return MutationResult(MutationStatus.OK, task)
+
+    def delete(self, task_id: int) -> bool:
+        """Delete a task by ID"""
+        task = self._tasks.pop(task_id, None)
+        if task is None:
+            return False
+        del self._by_status[task.completed][task_id]
+        return True
+
     def generate_id(self) -> int:
         """Generate next available ID"""
         new_id = self._next_id
         self._next_id += 1
-        return new_id
\ No newline at end of file
+        return new_id
+
+    def get_many(self, task_ids: Iterable[int]) -> Dict[int, Task]:
+        """Find several tasks by ID"""
+        tasks = self._tasks
+        return {task_id: tasks[task_id] for task_id in task_ids if task_id in tasks}
+
+    def add_many(self, tasks: List[Task]) -> List[Task]:
+        """Add a batch of tasks"""
+        for task in tasks:
+            self.add(task)
+        return list(tasks)
+
+    def generate_ids(self, count: int) -> List[int]:
+        """Reserve a block of IDs"""
+        start = self._next_id
+        self._next_id += count
+        return list(range(start, self._next_id))
@@ -0,0 +1,278 @@
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from .models import Task
+
+_TOKEN = re.compile(r"\w+")
+
+# Title matches count more than description matches when ranking
+TITLE_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+# New terms wait in a small sorted list and are merged into the vocabulary
+# once they number more than this or 1/32 of the vocabulary
+_MERGE_TERMS = 1024
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into lowercase word tokens"""
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+class SearchIndex:
+    """
+    Inverted index over task titles and descriptions.
+
+    Each term maps to the IDs of the tasks containing it together with a
+    weighted term frequency. A sorted vocabulary is kept alongside so that
+    prefix terms resolve with a binary search; new terms are merged into it
+    in batches and removed ones dropped lazily, so a new term does not cost
+    O(V). Tasks are indexed, re-indexed and removed one at a time, so the
+    index never has to be rebuilt.
+
+    Queries are whitespace separated terms that must all match (AND); a
+    term ending in ``*`` matches every indexed term with that prefix.
+    Results are ranked by the sum of weighted term frequency times inverse
+    document frequency. With a limit, a query made only of prefix terms
+    walks the expansions of its rarest term, best possible score first, and
+    stops once no task left unseen could outrank the results it has.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._terms_by_task: Dict[int, Tuple[str, ...]] = {}
+        # Highest weight each term has had; an upper bound, not lowered on removal
+        self._max_weights: Dict[str, float] = {}
+        # Sorted; may still hold terms that are no longer indexed
+        self._vocabulary: List[str] = []
+        # Sorted terms added since the last merge into _vocabulary
+        self._recent_terms: List[str] = []
+        self._dead_terms: int = 0
+
+    def __len__(self) -> int:
+        return len(self._terms_by_task)
+
+    def add(self, task: Task) -> None:
+        """Index a task, replacing any previous entry for the same ID"""
+        if task.id in self._terms_by_task:
+            self.remove(task.id)
+        weights: Dict[str, float] = {}
+        for term in tokenize(task.title):
+            weights[term] = weights.get(term, 0.0) + TITLE_WEIGHT
+        for term in tokenize(task.description):
+            weights[term] = weights.get(term, 0.0) + DESCRIPTION_WEIGHT
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                insort(self._recent_terms, term)
+            postings[task.id] = weight
+            if weight > self._max_weights.get(term, 0.0):
+                self._max_weights[term] = weight
+        self._terms_by_task[task.id] = tuple(weights)
+        if len(self._recent_terms) > max(_MERGE_TERMS, len(self._vocabulary) >> 5):
+            self._merge_terms()
+
+    def add_many(self, tasks: Iterable[Task]) -> None:
+        """Index several tasks"""
+        for task in tasks:
+            self.add(task)
+
+    def remove(self, task_id: int) -> None:
+        """Remove a task from the index"""
+        for term in self._terms_by_task.pop(task_id, ()):
+            postings = self._postings[term]
+            del postings[task_id]
+            if not postings:
+                del self._postings[term]
+                del self._max_weights[term]
+                recent = self._recent_terms
+                position = bisect_left(recent, term)
+                if position < len(recent) and recent[position] == term:
+                    del recent[position]
+                else:
+                    self._dead_terms += 1
+        if self._dead_terms > len(self._postings):
+            self._merge_terms()
+
+    def _merge_terms(self) -> None:
+        """Fold recent terms into the vocabulary, dropping terms no longer indexed"""
+        terms = self._vocabulary + self._recent_terms
+        # Two sorted runs, so this is a linear merge
+        terms.sort()
+        if self._dead_terms:
+            # A dead term may have come back as a recent one, hence the dedup
+            postings = self._postings
+            terms = [term for term in dict.fromkeys(terms) if term in postings]
+            self._dead_terms = 0
+        self._vocabulary = terms
+        self._recent_terms = []
+
+    def _expand(self, prefix: str) -> List[str]:
+        """Return the indexed terms starting with prefix"""
+        # Every term with the prefix sorts before the prefix followed by the highest code point
+        end = prefix + chr(0x10FFFF)
+        terms = []
+        for vocabulary in (self._vocabulary, self._recent_terms):
+            terms += vocabulary[bisect_left(vocabulary, prefix):bisect_left(vocabulary, end)]
+        if self._dead_terms:
+            postings = self._postings
+            terms = [term for term in dict.fromkeys(terms) if term in postings]
+        return terms
+
+    def _prefix_score(self, task_id: int, prefix: str, total: int) -> float:
+        """Score one task for a prefix term from its own terms; 0.0 if none matches"""
+        best = 0.0
+        for indexed_term in self._terms_by_task[task_id]:
+            if indexed_term.startswith(prefix):
+                postings = self._postings[indexed_term]
+                score = postings[task_id] * math.log(1.0 + total / len(postings))
+                if score > best:
+                    best = score
+        return best
+
+    def _best_prefix_matches(self, prefixes: List[str], limit: int) -> List[Tuple[int, float]]:
+        """
+        Return the top limit (task_id, score) pairs for a query of prefix terms.
+        Every expansion gets an upper bound score from its highest weight.
+        The expansions of the term with the fewest postings are walked in
+        descending bound order, keeping each task's best score for that term;
+        the other terms are scored once per task. The walk stops once the
+        worst result kept beats the next bound plus the other terms' bounds,
+        as no later posting can then change the results.
+        """
+        if limit <= 0:
+            return []
+        total = len(self._terms_by_task)
+        postings_for = self._postings
+        max_weights = self._max_weights
+        expansions = []
+        for prefix in prefixes:
+            bounds = [(max_weights[term] * math.log(1.0 + total / len(postings_for[term])), term)
+                      for term in self._expand(prefix)]
+            if not bounds:
+                return []
+            expansions.append(bounds)
+        walked = min(range(len(prefixes)),
+                     key=lambda i: sum(len(postings_for[term]) for _, term in expansions[i]))
+        others = [prefix for i, prefix in enumerate(prefixes) if i != walked]
+        others_bound = sum(max(bounds)[0] for i, bounds in enumerate(expansions) if i != walked)
+
+        # Best score for the walked term so far, and the other terms' total (0.0 if one misses)
+        partial: Dict[int, float] = {}
+        rest: Dict[int, float] = {}
+        # Up to limit task IDs -> (score, -task_id), the final ranking key; floor is the lowest
+        top: Dict[int, Tuple[float, int]] = {}
+        floor: Optional[Tuple[float, int]] = None
+        for bound, term in sorted(expansions[walked], reverse=True):
+            if floor is not None and floor[0] > bound + others_bound:
+                break
+            postings = postings_for[term]
+            idf = math.log(1.0 + total / len(postings))
+            for task_id, weight in postings.items():
+                score = weight * idf
+                if score <= partial.get(task_id, 0.0):
+                    continue
+                partial[task_id] = score
+                if others:
+                    extra = rest.get(task_id)
+                    if extra is None:
+                        extra = rest[task_id] = self._all_prefix_scores(task_id, others, total)
+                    if not extra:
+                        continue
+                    score += extra
+                key = (score, -task_id)
+                if task_id in top:
+                    top[task_id] = key
+                    if floor[1] == -task_id:
+                        floor = min(top.values())
+                elif len(top) < limit:
+                    top[task_id] = key
+                    if len(top) == limit:
+                        floor = min(top.values())
+                elif key > floor:
+                    del top[-floor[1]]
+                    top[task_id] = key
+                    floor = min(top.values())
+        return [(-negated_id, score) for score, negated_id in sorted(top.values(), reverse=True)]
+
+    def _all_prefix_scores(self, task_id: int, prefixes: List[str], total: int) -> float:
+        """Sum one task's scores for several prefix terms; 0.0 if any of them does not match"""
+        score = 0.0
+        for prefix in prefixes:
+            term_score = self._prefix_score(task_id, prefix, total)
+            if not term_score:
+                return 0.0
+            score += term_score
+        return score
+
+    def _term_scores(self, term: str, prefix: bool, candidates: Optional[Set[int]] = None) -> Dict[int, float]:
+        """
+        Return task ID -> score for one query term.
+        When candidates are given only those tasks are scored, probing the
+        postings instead of walking them when the candidate set is smaller.
+        """
+        total = len(self._terms_by_task)
+        scores: Dict[int, float] = {}
+        if prefix and candidates is not None:
+            # A short prefix can expand to many terms; checking the few
+            # candidates' own terms is cheaper than probing every expansion
+            for task_id in candidates:
+                score = self._prefix_score(task_id, term, total)
+                if score:
+                    scores[task_id] = score
+            return scores
+        for indexed_term in (self._expand(term) if prefix else [term]):
+            postings = self._postings.get(indexed_term)
+            if not postings:
+                continue
+            idf = math.log(1.0 + total / len(postings))
+            if candidates is not None and len(candidates) < len(postings):
+                matches = ((task_id, postings[task_id]) for task_id in candidates if task_id in postings)
+            else:
+                matches = postings.items()
+            for task_id, weight in matches:
+                score = weight * idf
+                if score > scores.get(task_id, 0.0):
+                    scores[task_id] = score
+        return scores
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Return (task_id, score) pairs for tasks matching every term, best first"""
+        terms: List[Tuple[str, bool]] = []
+        for raw in query.split():
+            tokens = tokenize(raw)
+            # A lone '*' has no word of its own to extend
+            if not tokens:
+                continue
+            terms.extend((token, False) for token in tokens)
+            if raw.endswith('*'):
+                terms[-1] = (terms[-1][0], True)
+        if not terms:
+            return []
+        if limit is not None and all(prefix for _, prefix in terms):
+            return self._best_prefix_matches([term for term, _ in terms], limit)
+
+        # Score the rarest exact terms first so the candidate set shrinks quickly
+        terms.sort(key=lambda item: (item[1], len(self._postings.get(item[0], ()))))
+        candidates: Optional[Set[int]] = None
+        totals: Dict[int, float] = {}
+        for term, prefix in terms:
+            scores = self._term_scores(term, prefix, candidates)
+            if candidates is None:
+                candidates = set(scores)
+                totals = scores
+            else:
+                candidates.intersection_update(scores)
+                for task_id in candidates:
+                    totals[task_id] += scores[task_id]
+            if not candidates:
+                return []
+
+        ranked = ((task_id, totals[task_id]) for task_id in candidates)
+        key = lambda item: (item[1], -item[0])
+        if limit is None:
+            return sorted(ranked, key=key, reverse=True)
+        return heapq.nlargest(limit, ranked, key=key)
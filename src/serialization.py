@@ -0,0 +1,84 @@
+# csv and json are imported where used, keeping them off the CLI's startup path
+from typing import Dict, Iterable, Iterator, TextIO, Tuple
+from .models import Task
+
+FORMATS = ('jsonl', 'csv')
+CSV_FIELDS = ('id', 'title', 'description', 'completed')
+
+_TRUE_VALUES = ('1', 'true', 'yes', 'y', 'x')
+
+
+def _parse_completed(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in _TRUE_VALUES
+    return bool(value)
+
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[Dict]:
+    """
+    Yield task records from a JSONL or CSV stream one at a time.
+    Each record has 'title', 'description' and 'completed' keys; any 'id'
+    in the input is ignored because the store assigns new IDs on import.
+    A malformed record raises ValueError naming its line, once the records
+    before it have been yielded.
+    """
+    if fmt == 'jsonl':
+        rows = _json_lines(stream)
+    elif fmt == 'csv':
+        import csv
+        reader = csv.DictReader(stream)
+        rows = ((reader.line_num, row) for row in reader)
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+
+    for line, row in rows:
+        if not isinstance(row, dict):
+            raise ValueError(f"Line {line}: record is not an object")
+        title = row.get('title')
+        if not isinstance(title, str) or not title.strip():
+            raise ValueError(f"Line {line}: title must be a non-empty string")
+        description = row.get('description')
+        if description is not None and not isinstance(description, str):
+            raise ValueError(f"Line {line}: description must be a string or null")
+        yield {
+            'title': title,
+            'description': description or None,
+            'completed': _parse_completed(row.get('completed', False)),
+        }
+
+
+def _json_lines(stream: TextIO) -> Iterator[Tuple[int, object]]:
+    """Yield (line number, decoded value) for each non-blank line of a JSONL stream"""
+    import json
+    for line, text in enumerate(stream, start=1):
+        if text.strip():
+            try:
+                yield line, json.loads(text)
+            except ValueError as error:
+                raise ValueError(f"Line {line}: invalid JSON ({error})") from None
+
+
+def write_tasks(stream: TextIO, tasks: Iterable[Task], fmt: str) -> int:
+    """Write tasks to a JSONL or CSV stream one record at a time; returns the count"""
+    count = 0
+    if fmt == 'jsonl':
+        import json
+        for task in tasks:
+            stream.write(json.dumps({
+                'id': task.id,
+                'title': task.title,
+                'description': task.description,
+                'completed': task.completed,
+            }, ensure_ascii=False))
+            stream.write("\n")
+            count += 1
+    elif fmt == 'csv':
+        import csv
+        writer = csv.writer(stream, lineterminator="\n")
+        writer.writerow(CSV_FIELDS)
+        for task in tasks:
+            writer.writerow((task.id, task.title, task.description or '', 'true' if task.completed else 'false'))
+            count += 1
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+    return count
@@ -0,0 +1,385 @@
+"""
+HTTP/JSON server exposing TodoService to local clients.
+
+Endpoints (request and response bodies are JSON):
+
+    GET    /tasks?completed=&after=&limit=     one page of tasks and the next cursor
+    GET    /tasks/<id>                         one task
+    POST   /tasks                              {"title", "description"} -> task
+    PATCH  /tasks/<id>                         {"title", "description", "expected_version"} -> task
+    POST   /tasks/<id>/complete                {"expected_version"}
+    DELETE /tasks/<id>?expected_version=
+    POST   /tasks/batch                        {"tasks": [{"title", "description"}, ...]} -> tasks
+    PATCH  /tasks/batch                        {"updates": [{"id", "title", "description"}, ...]} -> tasks
+    POST   /tasks/batch/complete               {"ids": [...]} -> count
+    POST   /tasks/batch/delete                 {"ids": [...]} -> count
+    GET    /search?q=&limit=                   best matches first
+    GET    /stats                              task counts
+
+Errors are {"error": message} with 400, 404 for unknown tasks or routes,
+405 for the wrong method and 409 for a version conflict, which also
+carries the current task.
+"""
+import asyncio
+import json
+import re
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+from .models import Task
+from .service import TaskNotFoundError, TodoService, VersionConflictError
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_MAX_IN_FLIGHT = 64
+# Page size for GET /tasks when the client gives none, and the most it may ask for
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+# Largest request head and body accepted, in bytes
+MAX_HEAD_SIZE = 16 * 1024
+MAX_BODY_SIZE = 8 * 1024 * 1024
+
+_TRUE_VALUES = ('1', 'true', 'yes')
+
+
+class HttpError(Exception):
+    """An error answered with the given status and message"""
+
+    def __init__(self, status: int, message: str, payload: Optional[Dict] = None):
+        super().__init__(message)
+        self.status = status
+        self.payload = payload or {}
+
+
+@dataclass(slots=True)
+class Request:
+    method: str
+    path: str
+    params: Dict[str, List[str]]
+    body: bytes
+    keep_alive: bool
+
+    def param(self, name: str) -> Optional[str]:
+        values = self.params.get(name)
+        return values[-1] if values else None
+
+    def json(self) -> Dict:
+        if not self.body:
+            return {}
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            raise HttpError(400, "Request body is not valid JSON")
+        if not isinstance(data, dict):
+            raise HttpError(400, "Request body must be a JSON object")
+        return data
+
+
+def task_json(task: Task) -> Dict:
+    return {
+        'id': task.id,
+        'title': task.title,
+        'description': task.description,
+        'completed': task.completed,
+        'version': task.version,
+    }
+
+
+def _int(value, name: str) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise HttpError(400, f"{name} must be an integer")
+
+
+def _ids(data: Dict) -> List[int]:
+    ids = data.get('ids')
+    if not isinstance(ids, list):
+        raise HttpError(400, "ids must be a list")
+    return [_int(task_id, "id") for task_id in ids]
+
+
+def encode_response(status: int, payload, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    head = (f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """Read one request from the connection; None when the client closed it between requests"""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as error:
+        if not error.partial.strip():
+            return None
+        raise HttpError(400, "Incomplete request")
+    except asyncio.LimitOverrunError:
+        raise HttpError(431, "Request head too large")
+    lines = head.decode('latin-1').split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        raise HttpError(400, "Malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    if 'transfer-encoding' in headers:
+        raise HttpError(501, "Chunked request bodies are not supported")
+    length = _int(headers.get('content-length', 0), "Content-Length")
+    if length < 0 or length > MAX_BODY_SIZE:
+        raise HttpError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    connection = headers.get('connection', '').lower()
+    keep_alive = connection != 'close' if version == "HTTP/1.1" else connection == 'keep-alive'
+    url = urlsplit(target)
+    return Request(method, url.path, parse_qs(url.query), body, keep_alive)
+
+
+class TodoServer:
+    """
+    Asyncio HTTP/1.1 server in front of one TodoService.
+
+    Connections are kept alive and may pipeline requests: the connection
+    reader keeps parsing while earlier requests run, and responses are
+    written back in request order. Service calls run on a pool of `workers`
+    threads, one by default, so the store sees one call at a time and any
+    backend can be served; use more workers only with a thread-safe
+    repository. At most max_in_flight requests are parsed and not yet
+    answered across all connections; beyond that, connections stop being
+    read until a response goes out.
+    """
+
+    def __init__(self, service: TodoService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, workers: int = 1):
+        if max_in_flight <= 0:
+            raise ValueError("In-flight limit must be positive")
+        self._service = service
+        self._host = host
+        self._port = port
+        self._max_in_flight = max_in_flight
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="todo-server")
+        self._in_flight: Optional[asyncio.Semaphore] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._connections: Set[asyncio.StreamWriter] = set()
+        self._routes: List[Tuple[str, re.Pattern, Callable]] = [
+            ('GET', re.compile(r"/tasks"), self._list_tasks),
+            ('POST', re.compile(r"/tasks"), self._add_task),
+            ('POST', re.compile(r"/tasks/batch"), self._add_tasks),
+            ('PATCH', re.compile(r"/tasks/batch"), self._update_tasks),
+            ('POST', re.compile(r"/tasks/batch/complete"), self._complete_tasks),
+            ('POST', re.compile(r"/tasks/batch/delete"), self._delete_tasks),
+            ('GET', re.compile(r"/tasks/(\d+)"), self._get_task),
+            ('PATCH', re.compile(r"/tasks/(\d+)"), self._update_task),
+            ('DELETE', re.compile(r"/tasks/(\d+)"), self._delete_task),
+            ('POST', re.compile(r"/tasks/(\d+)/complete"), self._complete_task),
+            ('GET', re.compile(r"/search"), self._search),
+            ('GET', re.compile(r"/stats"), self._stats),
+        ]
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Host and port the server is listening on; the port is resolved when 0 was asked for"""
+        if self._server is None:
+            return self._host, self._port
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def start(self) -> None:
+        self._in_flight = asyncio.Semaphore(self._max_in_flight)
+        self._server = await asyncio.start_server(self._serve_connection, self._host, self._port,
+                                                  limit=MAX_HEAD_SIZE)
+
+    async def close(self) -> None:
+        """Stop accepting connections, close the open ones and wait for running calls"""
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=True)
+
+    # -- Connections ----------------------------------------------------------
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections.add(writer)
+        responses: asyncio.Queue = asyncio.Queue()
+        sender = asyncio.create_task(self._send_responses(responses, writer))
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HttpError as error:
+                    await self._in_flight.acquire()
+                    responses.put_nowait((self._answered(error.status, {'error': str(error)}), False))
+                    break
+                if request is None:
+                    break
+                await self._in_flight.acquire()
+                responses.put_nowait((asyncio.ensure_future(self._dispatch(request)), request.keep_alive))
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            responses.put_nowait(None)
+            await sender
+            self._connections.discard(writer)
+            writer.close()
+
+    @staticmethod
+    def _answered(status: int, payload) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        future.set_result((status, payload))
+        return future
+
+    async def _send_responses(self, responses: asyncio.Queue, writer: asyncio.StreamWriter) -> None:
+        """Write responses in request order, draining once per burst of pipelined responses"""
+        broken = False
+        while (item := await responses.get()) is not None:
+            future, keep_alive = item
+            try:
+                status, payload = await future
+            finally:
+                self._in_flight.release()
+            if broken:
+                continue
+            try:
+                writer.write(encode_response(status, payload, keep_alive))
+                if responses.empty():
+                    await writer.drain()
+            except ConnectionError:
+                broken = True
+
+    async def _dispatch(self, request: Request) -> Tuple[int, object]:
+        allowed = False
+        for method, pattern, handler in self._routes:
+            match = pattern.fullmatch(request.path)
+            if match is None:
+                continue
+            if method != request.method:
+                allowed = True
+                continue
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._call, handler, request, match.groups())
+        if allowed:
+            return 405, {'error': f"Method {request.method} not allowed for {request.path}"}
+        return 404, {'error': f"No such endpoint: {request.path}"}
+
+    @staticmethod
+    def _call(handler: Callable, request: Request, groups: Tuple[str, ...]) -> Tuple[int, object]:
+        try:
+            return handler(request, *(int(group) for group in groups))
+        except HttpError as error:
+            return error.status, {'error': str(error), **error.payload}
+        except VersionConflictError as error:
+            return 409, {'error': str(error), 'task': task_json(error.task)}
+        except TaskNotFoundError as error:
+            return 404, {'error': str(error)}
+        except ValueError as error:
+            return 400, {'error': str(error)}
+        except Exception as error:
+            return 500, {'error': f"{type(error).__name__}: {error}"}
+
+    # -- Handlers -------------------------------------------------------------
+
+    def _list_tasks(self, request: Request):
+        limit = _int(request.param('limit'), "limit") or DEFAULT_PAGE_SIZE
+        if not 0 < limit <= MAX_PAGE_SIZE:
+            raise HttpError(400, f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        completed = request.param('completed')
+        if completed is not None:
+            completed = completed.lower() in _TRUE_VALUES
+        tasks, cursor = self._service.get_page(limit, completed=completed,
+                                               after_id=_int(request.param('after'), "after"))
+        return 200, {'tasks': [task_json(task) for task in tasks], 'next': cursor}
+
+    def _get_task(self, request: Request, task_id: int):
+        task = self._service.get_task(task_id)
+        if task is None:
+            raise HttpError(404, f"Task with ID {task_id} does not exist")
+        return 200, task_json(task)
+
+    def _add_task(self, request: Request):
+        data = request.json()
+        return 201, task_json(self._service.add_task(data.get('title') or '', data.get('description')))
+
+    def _update_task(self, request: Request, task_id: int):
+        data = request.json()
+        task = self._service.update_task(task_id, data.get('title'), data.get('description'),
+                                         expected_version=_int(data.get('expected_version'), "expected_version"))
+        return 200, task_json(task)
+
+    def _complete_task(self, request: Request, task_id: int):
+        data = request.json()
+        self._service.complete_task(task_id, _int(data.get('expected_version'), "expected_version"))
+        return 200, {'completed': True}
+
+    def _delete_task(self, request: Request, task_id: int):
+        self._service.delete_task(task_id, _int(request.param('expected_version'), "expected_version"))
+        return 200, {'deleted': True}
+
+    def _add_tasks(self, request: Request):
+        entries = request.json().get('tasks')
+        if not isinstance(entries, list):
+            raise HttpError(400, "tasks must be a list")
+        added = self._service.add_tasks((entry.get('title') or '', entry.get('description')) for entry in entries)
+        return 201, {'tasks': [task_json(task) for task in added]}
+
+    def _update_tasks(self, request: Request):
+        entries = request.json().get('updates')
+        if not isinstance(entries, list):
+            raise HttpError(400, "updates must be a list")
+        updated = self._service.update_tasks(
+            (_int(entry.get('id'), "id"), entry.get('title'), entry.get('description')) for entry in entries)
+        return 200, {'tasks': [task_json(task) for task in updated]}
+
+    def _complete_tasks(self, request: Request):
+        return 200, {'completed': self._service.complete_tasks(_ids(request.json()))}
+
+    def _delete_tasks(self, request: Request):
+        return 200, {'deleted': self._service.delete_tasks(_ids(request.json()))}
+
+    def _search(self, request: Request):
+        limit = _int(request.param('limit'), "limit")
+        tasks = self._service.search(request.param('q') or '', limit if limit is not None else 20)
+        return 200, {'tasks': [task_json(task) for task in tasks]}
+
+    def _stats(self, request: Request):
+        stats = self._service.stats()
+        return 200, {'total': stats.total, 'completed': stats.completed, 'pending': stats.pending}
+
+
+def serve(service: TodoService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+          max_in_flight: int = DEFAULT_MAX_IN_FLIGHT) -> None:
+    """Run a TodoServer until SIGINT or SIGTERM, then close its connections and return"""
+    async def run():
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, stop.set)
+            except (NotImplementedError, RuntimeError, ValueError):
+                # Not the main thread, or no signal support in this event loop
+                pass
+        server = TodoServer(service, host, port, max_in_flight)
+        await server.start()
+        bound_host, bound_port = server.address
+        print(f"Serving on http://{bound_host}:{bound_port} (Ctrl+C to stop)", flush=True)
+        try:
+            await stop.wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
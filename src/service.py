@@ -1,8 +1,38 @@
-from typing import List, Optional
-from .models import Task
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+from .markers import instrumented, instrumented_class
+from .models import MutationResult, MutationStatus, Task, TaskQuery, TaskStats
 from .repository import TaskRepository
 
+if TYPE_CHECKING:
+    from .search import SearchIndex
 
+# Tasks read per _lock acquisition while the search index is built
+_INDEX_PAGE_SIZE = 10_000
+
+
+class TaskNotFoundError(ValueError):
+    """Raised when an operation names a task ID that does not exist"""
+
+
+class VersionConflictError(ValueError):
+    """Raised when a task changed after the version the caller expected"""
+
+    def __init__(self, task: Task):
+        super().__init__(f"Task with ID {task.id} was modified by someone else (now at version {task.version})")
+        self.task = task
+
+
+def require_applied(task_id: int, result: MutationResult) -> Task:
+    """Return the task from a conditional mutation, raising if the mutation did not apply"""
+    if result.status is MutationStatus.NOT_FOUND:
+        raise TaskNotFoundError(f"Task with ID {task_id} does not exist")
+    if result.status is MutationStatus.CONFLICT:
+        raise VersionConflictError(result.task)
+    return result.task
+
+
+@instrumented_class
 class TodoService:
     def __init__(self, repository: TaskRepository):
         """
@@ -10,26 +40,84 @@ class TodoService:
         This allows for easy testing and future replacement of storage implementations.
         """
         self._repository = repository
+        # Built on the first search, then kept current by every mutation below
+        self._search_index: Optional['SearchIndex'] = None
+        # Changes made while that first build runs, replayed into the index
+        # before it is used; None when no build is running
+        self._index_backlog: Optional[List[Tuple[int, Optional[Task]]]] = None
+        # Makes batch check-then-act sequences and search index maintenance atomic
+        # when threads share the service; single-task writes rely on version checks
+        # and only take it to bring the index up to date afterwards
+        self._lock = threading.RLock()
+        self._index_built = threading.Condition(self._lock)
 
+    @instrumented
     def add_task(self, title: str, description: Optional[str] = None) -> Task:
         """Add a new task with validation"""
         if not title or not title.strip():
             raise ValueError("Title cannot be empty")
 
-        new_id = self._repository.generate_id()
-        task = Task(id=new_id, title=title.strip(), description=description, completed=False)
-        return self._repository.add(task)
+        with self._lock:
+            new_id = self._repository.generate_id()
+            task = Task(id=new_id, title=title.strip(), description=description, completed=False)
+            task = self._repository.add(task)
+            self._index_changes(added=[task])
+            return task
 
+    @instrumented
     def get_all_tasks(self) -> List[Task]:
         """Get all tasks"""
         return self._repository.get_all()
 
-    def update_task(self, task_id: int, title: Optional[str] = None, description: Optional[str] = None) -> Optional[Task]:
-        """Update task with validation"""
-        task = self._repository.get_by_id(task_id)
-        if not task:
-            raise ValueError(f"Task with ID {task_id} does not exist")
+    @instrumented
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """Get a single task by ID"""
+        return self._repository.get_by_id(task_id)
+
+    @instrumented
+    def stats(self) -> TaskStats:
+        """Get total, completed and pending task counts without scanning the tasks"""
+        return self._repository.task_stats()
 
+    def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                   limit: Optional[int] = None) -> Iterator[Task]:
+        """Lazily iterate tasks in ID order, optionally filtered by status and resuming after a cursor ID"""
+        return self._repository.iter_tasks(completed=completed, after_id=after_id, limit=limit)
+
+    @instrumented
+    def query_tasks(self, completed: Optional[bool] = None, min_id: Optional[int] = None,
+                    max_id: Optional[int] = None, title_prefix: Optional[str] = None,
+                    order_by: str = 'id', descending: bool = False, limit: Optional[int] = None) -> List[Task]:
+        """
+        Get the tasks matching the given filters, sorted by ID or title.
+        The repository evaluates the query, using its indexes where it can.
+        """
+        query = TaskQuery(completed=completed, min_id=min_id, max_id=max_id, title_prefix=title_prefix,
+                          order_by=order_by, descending=descending, limit=limit)
+        return list(self._repository.query(query))
+
+    @instrumented
+    def get_page(self, limit: int, completed: Optional[bool] = None,
+                 after_id: Optional[int] = None) -> Tuple[List[Task], Optional[int]]:
+        """
+        Get one page of tasks and the cursor for the next page.
+        The cursor is None when there are no further tasks.
+        """
+        if limit <= 0:
+            raise ValueError("Page size must be positive")
+        tasks = list(self._repository.iter_tasks(completed=completed, after_id=after_id, limit=limit + 1))
+        if len(tasks) > limit:
+            return tasks[:limit], tasks[limit - 1].id
+        return tasks, None
+
+    @instrumented
+    def update_task(self, task_id: int, title: Optional[str] = None, description: Optional[str] = None,
+                    expected_version: Optional[int] = None) -> Optional[Task]:
+        """
+        Update task with validation.
+        With expected_version, the update only applies if nobody has changed
+        the task since that version was read.
+        """
         updates = {}
         if title is not None:
             if not title.strip():
@@ -38,20 +126,176 @@ class TodoService:
         if description is not None:
             updates['description'] = description
 
-        return self._repository.update(task_id, **updates)
+        task = require_applied(task_id, self._repository.update_if(task_id, expected_version, **updates))
+        self._reindex([task_id])
+        return task
 
-    def complete_task(self, task_id: int) -> bool:
+    @instrumented
+    def complete_task(self, task_id: int, expected_version: Optional[int] = None) -> bool:
         """Mark task as completed"""
-        task = self._repository.get_by_id(task_id)
-        if not task:
-            raise ValueError(f"Task with ID {task_id} does not exist")
-
-        result = self._repository.update(task_id, completed=True)
-        return result is not None
+        require_applied(task_id, self._repository.complete_if(task_id, expected_version))
+        return True
 
-    def delete_task(self, task_id: int) -> bool:
+    @instrumented
+    def delete_task(self, task_id: int, expected_version: Optional[int] = None) -> bool:
         """Delete task with validation"""
-        if not self._repository.get_by_id(task_id):
-            raise ValueError(f"Task with ID {task_id} does not exist")
+        require_applied(task_id, self._repository.delete_if(task_id, expected_version))
+        self._reindex([task_id])
+        return True
+
+    def _index_changes(self, added: Iterable[Task] = (), removed: Iterable[int] = ()) -> None:
+        """Apply written tasks and deletions to the search index, or queue them during its build; caller holds _lock"""
+        if self._search_index is not None:
+            self._search_index.add_many(added)
+            for task_id in removed:
+                self._search_index.remove(task_id)
+        elif self._index_backlog is not None:
+            self._index_backlog.extend((task.id, task) for task in added)
+            self._index_backlog.extend((task_id, None) for task_id in removed)
+
+    def _reindex(self, task_ids: List[int]) -> None:
+        """
+        Bring the search index in line with the stored state of tasks written
+        without _lock. The state is read under _lock rather than taken from
+        the write, so racing writes to one task cannot leave an older version
+        indexed: whichever writer gets here last sees the latest.
+        """
+        with self._lock:
+            if self._search_index is None and self._index_backlog is None:
+                return
+            found = self._repository.get_many(task_ids)
+            self._index_changes(added=[found[task_id] for task_id in task_ids if task_id in found],
+                                removed=[task_id for task_id in task_ids if task_id not in found])
+
+    def _ensure_search_index(self) -> 'SearchIndex':
+        """
+        Return the search index, building it on first use.
+        The build reads tasks a page at a time under _lock and indexes them
+        without it, so writers carry on meanwhile; their changes are queued
+        and replayed into the new index before it is published. Concurrent
+        searches wait for it.
+        """
+        with self._lock:
+            while self._search_index is None and self._index_backlog is not None:
+                self._index_built.wait()
+            if self._search_index is not None:
+                return self._search_index
+            self._index_backlog = []
+        from .search import SearchIndex
+        index = SearchIndex()
+        built = False
+        try:
+            after_id = None
+            while True:
+                with self._lock:
+                    page = list(self._repository.iter_tasks(after_id=after_id, limit=_INDEX_PAGE_SIZE))
+                index.add_many(page)
+                if len(page) < _INDEX_PAGE_SIZE:
+                    break
+                after_id = page[-1].id
+            built = True
+        finally:
+            with self._lock:
+                backlog, self._index_backlog = self._index_backlog, None
+                if built:
+                    for task_id, task in backlog:
+                        if task is None:
+                            index.remove(task_id)
+                        else:
+                            index.add(task)
+                    self._search_index = index
+                self._index_built.notify_all()
+        return index
+
+    def _require_existing(self, task_ids: List[int]) -> Dict[int, Task]:
+        """Look up a batch of tasks at once, raising if any of them is missing"""
+        found = self._repository.get_many(task_ids)
+        missing = [task_id for task_id in task_ids if task_id not in found]
+        if len(missing) == 1:
+            raise TaskNotFoundError(f"Task with ID {missing[0]} does not exist")
+        if missing:
+            raise TaskNotFoundError(f"Tasks with IDs {', '.join(map(str, missing))} do not exist")
+        return found
+
+    @instrumented
+    def add_tasks(self, tasks: Iterable[Tuple]) -> List[Task]:
+        """
+        Add a batch of (title, description) pairs, or (title, description, completed)
+        triples for tasks that are already done, as one repository write.
+        Nothing is added if any title is invalid.
+        """
+        entries = []
+        for title, description, *completed in tasks:
+            if not title or not title.strip():
+                raise ValueError("Title cannot be empty")
+            entries.append((title.strip(), description, bool(completed and completed[0])))
+        if not entries:
+            return []
+
+        with self._lock:
+            new_ids = self._repository.generate_ids(len(entries))
+            added = self._repository.add_many([
+                Task(id=new_id, title=title, description=description, completed=completed)
+                for new_id, (title, description, completed) in zip(new_ids, entries)
+            ])
+            self._index_changes(added=added)
+            return added
+
+    @instrumented
+    def update_tasks(self, updates: Iterable[Tuple[int, Optional[str], Optional[str]]]) -> List[Task]:
+        """Update a batch of (task_id, title, description) entries after validating all of them"""
+        changes: Dict[int, Dict] = {}
+        for task_id, title, description in updates:
+            fields = changes.setdefault(task_id, {})
+            if title is not None:
+                if not title.strip():
+                    raise ValueError("Title cannot be empty")
+                fields['title'] = title.strip()
+            if description is not None:
+                fields['description'] = description
+        with self._lock:
+            self._require_existing(list(changes))
+            updated = self._repository.update_many(changes)
+            self._index_changes(added=updated)
+            return updated
+
+    @instrumented
+    def complete_tasks(self, task_ids: Iterable[int]) -> int:
+        """Mark a batch of tasks as completed; returns how many were updated"""
+        task_ids = list(dict.fromkeys(task_ids))
+        with self._lock:
+            self._require_existing(task_ids)
+            updated = self._repository.update_many({task_id: {'completed': True} for task_id in task_ids})
+            return len(updated)
+
+    @instrumented
+    def delete_tasks(self, task_ids: Iterable[int]) -> int:
+        """Delete a batch of tasks; nothing is deleted if any ID does not exist"""
+        task_ids = list(dict.fromkeys(task_ids))
+        with self._lock:
+            self._require_existing(task_ids)
+            deleted = self._repository.delete_many(task_ids)
+            self._index_changes(removed=task_ids)
+            return deleted
+
+    @instrumented
+    def search(self, query: str, limit: Optional[int] = 20) -> List[Task]:
+        """
+        Full-text search over titles and descriptions, best matches first.
+        All terms must match; a term ending in '*' matches as a prefix.
+        """
+        if not query or not query.strip():
+            raise ValueError("Search query cannot be empty")
+        index = self._ensure_search_index()
+        with self._lock:
+            hits = index.search(query, limit)
+        found = self._repository.get_many([task_id for task_id, _ in hits])
+        return [found[task_id] for task_id, _ in hits if task_id in found]
+
+    def flush(self) -> None:
+        """Make every acknowledged write durable"""
+        self._repository.flush()
 
-        return self._repository.delete(task_id)
\ No newline at end of file
+    def close(self) -> None:
+        """Release resources held by the underlying repository"""
+        self._repository.close()
@@ -0,0 +1,291 @@
+import heapq
+import multiprocessing
+import threading
+from collections import deque
+from itertools import islice
+from operator import attrgetter
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+from .models import MutationResult, Task, TaskQuery, TaskStats
+from .repository import IndexedTaskRepository, TaskRepository
+
+# IDs reserved from a shard per round trip when generating IDs one at a time
+_ID_BLOCK = 64
+# Tasks fetched per shard round trip while streaming with iter_tasks
+_PAGE_SIZE = 500
+
+
+class _ShardRepository(IndexedTaskRepository):
+    """
+    Store held by one worker process. It only generates IDs congruent to
+    its shard number, so the IDs of all shards interleave without overlap.
+    """
+
+    def __init__(self, shard: int, shards: int):
+        super().__init__()
+        self._shard = shard
+        self._shards = shards
+
+    def _first_free_id(self) -> int:
+        return self._next_id + (self._shard - self._next_id) % self._shards
+
+    def generate_id(self) -> int:
+        """Generate the next ID that belongs to this shard"""
+        new_id = self._first_free_id()
+        self._next_id = new_id + 1
+        return new_id
+
+    def generate_ids(self, count: int) -> List[int]:
+        """Reserve the next count IDs that belong to this shard"""
+        start = self._first_free_id()
+        ids = list(range(start, start + count * self._shards, self._shards))
+        if ids:
+            self._next_id = ids[-1] + 1
+        return ids
+
+
+def _serve(conn, shard: int, shards: int) -> None:
+    """Worker loop: run repository calls received over the pipe until told to stop"""
+    repository = _ShardRepository(shard, shards)
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+        method, args, kwargs = request
+        try:
+            result = getattr(repository, method)(*args, **kwargs)
+            if method in ('iter_tasks', 'query'):
+                result = list(result)
+        except Exception as error:
+            conn.send((False, error))
+        else:
+            conn.send((True, result))
+    conn.close()
+
+
+class ShardedTaskRepository(TaskRepository):
+    """
+    Repository that hash-partitions tasks by ID across worker processes.
+
+    Task ``id`` lives on shard ``id % shards``; each shard is an
+    IndexedTaskRepository in its own process, so shards do not share a GIL
+    or a heap. Single-task calls are one round trip to the owning shard.
+    Bulk calls are split by shard, sent to every shard involved and then
+    collected, so the shards work in parallel; get_all and iter_tasks merge
+    the per-shard results back into ID order.
+
+    IDs come from per-shard residue classes: shard ``i`` only hands out IDs
+    congruent to ``i``, which keeps them globally unique without a
+    coordinator. generate_id reserves blocks of IDs from the shards in
+    rotation, so generated IDs stay sequential and tasks spread evenly.
+    """
+
+    def __init__(self, shards: int = 4, start_method: Optional[str] = None):
+        if shards <= 0:
+            raise ValueError("Shard count must be positive")
+        context = multiprocessing.get_context(start_method)
+        self._shards = shards
+        self._connections = []
+        self._processes = []
+        # A pipe carries one request at a time; multi-shard calls take locks in shard order
+        self._locks = [threading.Lock() for _ in range(shards)]
+        for shard in range(shards):
+            parent, child = context.Pipe()
+            process = context.Process(target=_serve, args=(child, shard, shards),
+                                      name=f"todo-shard-{shard}", daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+        self._reserved: List[Deque[int]] = [deque() for _ in range(shards)]
+        # Generation starts at shard 1 so the first IDs are 1, 2, 3, ...
+        self._next_shard: int = 1 % shards
+        self._id_lock = threading.Lock()
+
+    @property
+    def shards(self) -> int:
+        return self._shards
+
+    def shard_of(self, task_id: int) -> int:
+        """Return the shard that owns a task ID"""
+        return task_id % self._shards
+
+    # -- Shard calls ----------------------------------------------------------
+
+    def _call(self, shard: int, method: str, *args, **kwargs):
+        with self._locks[shard]:
+            conn = self._connections[shard]
+            conn.send((method, args, kwargs))
+            ok, result = conn.recv()
+        if not ok:
+            raise result
+        return result
+
+    def _scatter(self, requests: Dict[int, tuple]) -> Dict[int, object]:
+        """Send one (method, args) request to each listed shard, then collect every reply"""
+        shards = sorted(requests)
+        for shard in shards:
+            self._locks[shard].acquire()
+        try:
+            for shard in shards:
+                method, *args = requests[shard]
+                self._connections[shard].send((method, tuple(args), {}))
+            replies = {shard: self._connections[shard].recv() for shard in shards}
+        finally:
+            for shard in shards:
+                self._locks[shard].release()
+        results = {}
+        for shard, (ok, result) in replies.items():
+            if not ok:
+                raise result
+            results[shard] = result
+        return results
+
+    def _broadcast(self, method: str, *args) -> List:
+        results = self._scatter({shard: (method, *args) for shard in range(self._shards)})
+        return [results[shard] for shard in range(self._shards)]
+
+    def _partition(self, task_ids: Iterable[int]) -> Dict[int, List[int]]:
+        groups: Dict[int, List[int]] = {}
+        for task_id in task_ids:
+            groups.setdefault(task_id % self._shards, []).append(task_id)
+        return groups
+
+    def _release_reserved(self, task_id: int) -> None:
+        """Drop reserved IDs an explicitly chosen ID has overtaken, as the shard itself does"""
+        reserved = self._reserved[task_id % self._shards]
+        with self._id_lock:
+            while reserved and reserved[0] <= task_id:
+                reserved.popleft()
+
+    # -- TaskRepository -------------------------------------------------------
+
+    def get_all(self) -> List[Task]:
+        """Return all tasks in ID order, gathered from every shard"""
+        return list(heapq.merge(*self._broadcast('get_all'), key=attrgetter('id')))
+
+    def get_by_id(self, task_id: int) -> Optional[Task]:
+        """Find task by ID"""
+        return self._call(task_id % self._shards, 'get_by_id', task_id)
+
+    def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                   limit: Optional[int] = None) -> Iterator[Task]:
+        """
+        Yield tasks in ID order, merged from every shard.
+        A bounded request asks all shards for up to limit tasks at once;
+        an unbounded one streams each shard a page at a time.
+        """
+        if limit is not None:
+            pages = self._broadcast('iter_tasks', completed, after_id, limit)
+            return islice(heapq.merge(*pages, key=attrgetter('id')), limit)
+        streams = [self._stream(shard, completed, after_id) for shard in range(self._shards)]
+        return heapq.merge(*streams, key=attrgetter('id'))
+
+    def _stream(self, shard: int, completed: Optional[bool], after_id: Optional[int]) -> Iterator[Task]:
+        cursor = after_id
+        while True:
+            page = self._call(shard, 'iter_tasks', completed, cursor, _PAGE_SIZE)
+            yield from page
+            if len(page) < _PAGE_SIZE:
+                return
+            cursor = page[-1].id
+
+    def query(self, query: TaskQuery) -> Iterator[Task]:
+        """
+        Run a query on every shard in parallel, each using its own indexes
+        and limit, and merge the per-shard results in the query's order.
+        """
+        results = self._broadcast('query', query)
+        merged = heapq.merge(*results, key=query.sort_key(), reverse=query.descending)
+        return merged if query.limit is None else islice(merged, query.limit)
+
+    def task_stats(self) -> TaskStats:
+        """Return task counts summed over every shard's counters"""
+        stats = TaskStats()
+        for shard_stats in self._broadcast('task_stats'):
+            stats.total += shard_stats.total
+            stats.completed += shard_stats.completed
+        return stats
+
+    def add(self, task: Task) -> Task:
+        """Add a new task to the shard that owns its ID"""
+        self._call(task.id % self._shards, 'add', task)
+        self._release_reserved(task.id)
+        return task
+
+    def update(self, task_id: int, **updates) -> Optional[Task]:
+        """Update a task by ID"""
+        return self._call(task_id % self._shards, 'update', task_id, **updates)
+
+    def update_if(self, task_id: int, expected_version: Optional[int] = None, **updates) -> MutationResult:
+        """Conditionally update a task in one round trip to its shard"""
+        return self._call(task_id % self._shards, 'update_if', task_id, expected_version, **updates)
+
+    def complete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally mark a task as completed in one round trip to its shard"""
+        return self._call(task_id % self._shards, 'complete_if', task_id, expected_version)
+
+    def delete(self, task_id: int) -> bool:
+        """Delete a task by ID"""
+        return self._call(task_id % self._shards, 'delete', task_id)
+
+    def delete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally delete a task in one round trip to its shard"""
+        return self._call(task_id % self._shards, 'delete_if', task_id, expected_version)
+
+    def generate_id(self) -> int:
+        """Take the next reserved ID, rotating through the shards"""
+        with self._id_lock:
+            shard = self._next_shard
+            self._next_shard = (shard + 1) % self._shards
+            reserved = self._reserved[shard]
+            if not reserved:
+                reserved.extend(self._call(shard, 'generate_ids', _ID_BLOCK))
+            return reserved.popleft()
+
+    def generate_ids(self, count: int) -> List[int]:
+        """Reserve a block of IDs"""
+        return [self.generate_id() for _ in range(count)]
+
+    def get_many(self, task_ids: Iterable[int]) -> Dict[int, Task]:
+        """Find several tasks by ID, asking every shard involved in parallel"""
+        task_ids = list(task_ids)
+        found: Dict[int, Task] = {}
+        groups = self._partition(task_ids)
+        for shard_found in self._scatter({shard: ('get_many', ids) for shard, ids in groups.items()}).values():
+            found.update(shard_found)
+        return {task_id: found[task_id] for task_id in task_ids if task_id in found}
+
+    def add_many(self, tasks: List[Task]) -> List[Task]:
+        """Add a batch of tasks, one call per shard involved"""
+        groups: Dict[int, List[Task]] = {}
+        for task in tasks:
+            groups.setdefault(task.id % self._shards, []).append(task)
+        self._scatter({shard: ('add_many', batch) for shard, batch in groups.items()})
+        for task in tasks:
+            self._release_reserved(task.id)
+        return list(tasks)
+
+    def update_many(self, updates: Dict[int, Dict]) -> List[Task]:
+        """Apply per-task field updates, one call per shard involved"""
+        groups = self._partition(updates)
+        results = self._scatter({
+            shard: ('update_many', {task_id: updates[task_id] for task_id in ids})
+            for shard, ids in groups.items()
+        })
+        updated = {task.id: task for tasks in results.values() for task in tasks}
+        return [updated[task_id] for task_id in updates if task_id in updated]
+
+    def delete_many(self, task_ids: Iterable[int]) -> int:
+        """Delete a batch of tasks, one call per shard involved"""
+        groups = self._partition(dict.fromkeys(task_ids))
+        return sum(self._scatter({shard: ('delete_many', ids) for shard, ids in groups.items()}).values())
+
+    def close(self) -> None:
+        """Stop the worker processes"""
+        for shard, conn in enumerate(self._connections):
+            with self._locks[shard]:
+                if not conn.closed:
+                    conn.send(None)
+                    conn.close()
+        for process in self._processes:
+            process.join()
@@ -0,0 +1,432 @@
+import heapq
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import weakref
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import replace
+from operator import attrgetter
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set
+from .log_repository import encode_record, read_records, task_record
+from .models import Task, TaskStats
+from .repository import TaskRepository, apply_updates, paginate
+
+# Snapshot layout, all little-endian:
+#
+#   header    magic, format version, two reserved fields, task count,
+#             completed count, next ID
+#   ids       int64 per task, ascending
+#   offsets   uint64 per string plus one end offset; task i owns strings
+#             2i (title) and 2i + 1 (description) of the heap
+#   versions  uint32 per task
+#   flags     uint8 per task
+#   heap      UTF-8 strings back to back
+#
+# Every column starts on a multiple of its width, so each one can be viewed
+# in place with memoryview.cast.
+_HEADER = struct.Struct("<8sHHIQQQ")
+_MAGIC = b"TODOSNAP"
+_FORMAT_VERSION = 1
+
+_COMPLETED = 0x01
+_HAS_DESCRIPTION = 0x02
+
+# Tasks whose strings are encoded per heap write while saving
+_WRITE_CHUNK = 10_000
+
+# The delta file next to a snapshot uses the operation log's framing, one
+# record per flush so a torn flush is dropped whole: [next ID, changes],
+# each change a task record (see task_record) or a deletion
+_DELTA_DELETE = "d"
+_DELTA_SUFFIX = ".delta"
+
+# The delta is merged into a new snapshot once it holds more changes than
+# this, or than 1/_DELTA_RATIO of the snapshot's tasks
+_DELTA_MIN_CHANGES = 1000
+_DELTA_RATIO = 16
+
+
+def _write_file(path: str, tasks: Iterable[Task], next_id: Optional[int]) -> None:
+    """Write tasks, in ascending ID order, as a snapshot file at path and fsync it"""
+    ids, offsets, versions, flags = array('q'), array('Q', [0]), array('I'), bytearray()
+    completed = 0
+    end = 0
+    with tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(path))) as heap:
+        strings: List[bytes] = []
+        for task in tasks:
+            if ids and task.id <= ids[-1]:
+                raise ValueError("Snapshot tasks must be in ascending ID order")
+            title = task.title.encode('utf-8')
+            description = task.description.encode('utf-8') if task.description is not None else b""
+            ids.append(task.id)
+            versions.append(task.version)
+            flags.append((_COMPLETED if task.completed else 0)
+                         | (_HAS_DESCRIPTION if task.description is not None else 0))
+            completed += task.completed
+            end += len(title)
+            offsets.append(end)
+            end += len(description)
+            offsets.append(end)
+            strings.append(title)
+            strings.append(description)
+            if len(strings) >= 2 * _WRITE_CHUNK:
+                heap.write(b"".join(strings))
+                strings.clear()
+        heap.write(b"".join(strings))
+        if next_id is None:
+            next_id = ids[-1] + 1 if ids else 1
+        if sys.byteorder != 'little':
+            for column in (ids, offsets, versions):
+                column.byteswap()
+
+        with open(path, 'wb') as out:
+            out.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, 0, 0, len(ids), completed, next_id))
+            for column in (ids, offsets, versions):
+                out.write(column.tobytes())
+            out.write(flags)
+            heap.seek(0)
+            shutil.copyfileobj(heap, out, 1 << 20)
+            out.flush()
+            os.fsync(out.fileno())
+
+
+def write_snapshot(path: str, tasks: Iterable[Task], next_id: Optional[int] = None) -> None:
+    """
+    Atomically replace path with a snapshot of tasks, given in ascending ID
+    order. next_id defaults to one past the highest ID.
+    """
+    _write_file(path + ".tmp", tasks, next_id)
+    os.replace(path + ".tmp", path)
+
+
+class _Snapshot:
+    """
+    A snapshot file mapped read-only. Columns are memoryviews over the
+    mapping, so opening reads only the header and a task's bytes are paged
+    in when it is decoded. Scans register as readers, so a snapshot retired
+    while one is open stays mapped until the last of them finishes.
+    """
+
+    def __init__(self, path: str):
+        if sys.byteorder != 'little':
+            raise ValueError("Snapshots can only be mapped on little-endian hosts")
+        self._file = open(path, 'rb')
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"{path} is not a task snapshot")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+        self._views: List[memoryview] = []
+        self._readers = 0
+        self._retired = False
+        view = self._view(memoryview(self._mmap))
+        magic, version, _, _, count, completed, next_id = _HEADER.unpack_from(view)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a task snapshot")
+        if version != _FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} uses snapshot format {version}; this version reads format {_FORMAT_VERSION}")
+        self.count = count
+        self.completed = completed
+        self.next_id = next_id
+        position = _HEADER.size
+        self.ids = self._column(view, position, count, 'q')
+        position += 8 * count
+        self.offsets = self._column(view, position, 2 * count + 1, 'Q')
+        position += 8 * (2 * count + 1)
+        self.versions = self._column(view, position, count, 'I')
+        position += 4 * count
+        self.flags = self._view(view[position:position + count])
+        position += count
+        self.heap = self._view(view[position:])
+        if len(self.flags) != count or len(self.heap) != self.offsets[-1]:
+            self.close()
+            raise ValueError(f"{path} is truncated")
+
+    def _view(self, view: memoryview) -> memoryview:
+        self._views.append(view)
+        return view
+
+    def _column(self, view: memoryview, position: int, length: int, fmt: str) -> memoryview:
+        size = struct.calcsize(fmt)
+        data = self._view(view[position:position + length * size])
+        if len(data) != length * size:
+            self.close()
+            raise ValueError("Snapshot is truncated")
+        return self._view(data.cast(fmt))
+
+    def row(self, task_id: int) -> int:
+        """Return the row holding a task ID, or -1"""
+        ids = self.ids
+        row = bisect_left(ids, task_id)
+        return row if row < len(ids) and ids[row] == task_id else -1
+
+    def task(self, row: int) -> Task:
+        """Decode the task stored in a row"""
+        offsets = self.offsets
+        heap = self.heap
+        flags = self.flags[row]
+        title = str(heap[offsets[2 * row]:offsets[2 * row + 1]], 'utf-8')
+        description = None
+        if flags & _HAS_DESCRIPTION:
+            description = str(heap[offsets[2 * row + 1]:offsets[2 * row + 2]], 'utf-8')
+        return Task(id=self.ids[row], title=title, description=description,
+                    completed=bool(flags & _COMPLETED), version=self.versions[row])
+
+    def acquire(self) -> None:
+        """Register a scan that will read the mapping"""
+        self._readers += 1
+
+    def release(self) -> None:
+        """Unregister a finished scan, closing a retired snapshot when it was the last"""
+        self._readers -= 1
+        if self._retired and not self._readers:
+            self.close()
+
+    def retire(self) -> None:
+        """Close the snapshot once no scan is reading it"""
+        self._retired = True
+        if not self._readers:
+            self.close()
+
+    def close(self) -> None:
+        # Views must be released before the mapping can be closed
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._mmap.close()
+        self._file.close()
+
+
+class SnapshotTaskRepository(TaskRepository):
+    """
+    Repository backed by a memory-mapped binary snapshot file.
+
+    Opening maps the file and reads its header, so it takes the same time
+    for ten tasks or ten million. Lookups binary-search the ID column in
+    place and decode only the task asked for; scans decode tasks as they
+    are consumed and test status on the flag column first. Resident memory
+    grows with the pages actually read.
+
+    The snapshot itself is immutable. Changes are kept in an overlay of
+    tasks by ID (None marks a deletion). flush and close append the changes
+    made since the last flush to a delta file next to the snapshot, which
+    opening replays into the overlay, so a small change costs a small write
+    rather than a rewrite of every task. Once the delta outgrows
+    _DELTA_MIN_CHANGES and 1/_DELTA_RATIO of the snapshot, flush merges it
+    into a new snapshot instead, as save always does. A missing file starts
+    an empty store. A scan merges the snapshot rows and changed tasks of the
+    moment it was started, even across a save; a replaced mapping is closed
+    when the last scan reading it finishes.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        if not os.path.exists(path):
+            write_snapshot(path, [])
+        self._snapshot = _Snapshot(path)
+        self._overlay: Dict[int, Optional[Task]] = {}
+        self._total: int = self._snapshot.count
+        self._completed: int = self._snapshot.completed
+        self._next_id: int = self._snapshot.next_id
+        # IDs changed since the delta was last written
+        self._unflushed: Set[int] = set()
+        self._delta_changes = 0
+        self._load_delta()
+        self._dirty = False
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def _delta_path(self) -> str:
+        return self._path + _DELTA_SUFFIX
+
+    def _load_delta(self) -> None:
+        """Replay the delta file, if any, into the overlay"""
+        try:
+            with open(self._delta_path, 'rb') as delta:
+                data = delta.read()
+        except FileNotFoundError:
+            return
+        flushes, valid_length = read_records(data)
+        for next_id, changes in flushes:
+            for change in changes:
+                if change[0] == _DELTA_DELETE:
+                    previous = self.get_by_id(change[1])
+                    if previous is not None:
+                        self._replace(change[1], previous, None)
+                else:
+                    _, task_id, title, description, completed, version = change
+                    self.add(Task(id=task_id, title=title, description=description, completed=completed,
+                                  version=version))
+            self._next_id = max(self._next_id, next_id)
+            self._delta_changes += len(changes)
+        self._unflushed.clear()
+        if valid_length < len(data):
+            # Drop a torn tail left behind by a crash mid-write
+            with open(self._delta_path, 'r+b') as delta:
+                delta.truncate(valid_length)
+                os.fsync(delta.fileno())
+
+    def save(self) -> None:
+        """Write every task, including unsaved changes, to a new snapshot, map it and drop the delta"""
+        tmp = self._path + ".tmp"
+        _write_file(tmp, self.iter_tasks(), self._next_id)
+        self._snapshot.retire()
+        os.replace(tmp, self._path)
+        self._snapshot = _Snapshot(self._path)
+        # Only once the snapshot holds its changes; replaying a stale delta would be harmless
+        if os.path.exists(self._delta_path):
+            os.remove(self._delta_path)
+        self._overlay.clear()
+        self._unflushed.clear()
+        self._delta_changes = 0
+        self._dirty = False
+
+    def flush(self) -> None:
+        """Append changes to the delta file, or merge them into a new snapshot once it is large"""
+        if not self._dirty:
+            return
+        changed = self._delta_changes + len(self._unflushed)
+        if changed > max(_DELTA_MIN_CHANGES, self._snapshot.count // _DELTA_RATIO):
+            self.save()
+            return
+        overlay = self._overlay
+        changes = [task_record(overlay[task_id]) if overlay.get(task_id) is not None
+                   else [_DELTA_DELETE, task_id]
+                   for task_id in sorted(self._unflushed)]
+        with open(self._delta_path, 'ab') as delta:
+            delta.write(encode_record([self._next_id, changes]))
+            delta.flush()
+            os.fsync(delta.fileno())
+        self._delta_changes = changed
+        self._unflushed.clear()
+        self._dirty = False
+
+    def close(self) -> None:
+        """Save unsaved changes and unmap the snapshot"""
+        self.flush()
+        self._snapshot.retire()
+
+    # -- Reads ----------------------------------------------------------------
+
+    def get_all(self) -> List[Task]:
+        """Return all tasks"""
+        return list(self.iter_tasks())
+
+    def get_by_id(self, task_id: int) -> Optional[Task]:
+        """Find task by ID, decoding it from the snapshot unless it was changed"""
+        if task_id in self._overlay:
+            return self._overlay[task_id]
+        row = self._snapshot.row(task_id)
+        return self._snapshot.task(row) if row >= 0 else None
+
+    def task_stats(self) -> TaskStats:
+        """Return task counts from the snapshot header, kept current by every write"""
+        return TaskStats(total=self._total, completed=self._completed)
+
+    def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                   limit: Optional[int] = None) -> Iterator[Task]:
+        """Yield tasks in ID order, merging snapshot rows with changed tasks"""
+        snapshot = self._snapshot
+        start = 0 if after_id is None else bisect_right(snapshot.ids, after_id)
+        changed = sorted(
+            (task for task in self._overlay.values()
+             if task is not None and (after_id is None or task.id > after_id)
+             and (completed is None or task.completed == completed)),
+            key=attrgetter('id'),
+        )
+        # Both taken now, so the scan merges the rows and changes of one moment
+        # even if tasks are written or the store saved before it finishes
+        stored = self._stored_tasks(snapshot, frozenset(self._overlay), start, completed)
+        return paginate(heapq.merge(stored, changed, key=attrgetter('id')), None, None, limit)
+
+    @staticmethod
+    def _stored_tasks(snapshot: _Snapshot, changed_ids: FrozenSet[int], start: int,
+                      completed: Optional[bool]) -> Iterator[Task]:
+        """Return a scan of snapshot rows that holds the snapshot open until it finishes or is dropped"""
+        def rows():
+            try:
+                ids, flags = snapshot.ids, snapshot.flags
+                wanted = None if completed is None else (_COMPLETED if completed else 0)
+                for row in range(start, snapshot.count):
+                    if wanted is not None and flags[row] & _COMPLETED != wanted:
+                        continue
+                    if changed_ids and ids[row] in changed_ids:
+                        continue
+                    yield snapshot.task(row)
+            finally:
+                release()
+
+        snapshot.acquire()
+        scan = rows()
+        # Runs once: when the scan ends, or when a scan that never started is dropped
+        release = weakref.finalize(scan, snapshot.release)
+        return scan
+
+    # -- Writes ---------------------------------------------------------------
+
+    def _replace(self, task_id: int, previous: Optional[Task], task: Optional[Task]) -> None:
+        if previous is not None:
+            self._total -= 1
+            self._completed -= previous.completed
+        if task is not None:
+            self._total += 1
+            self._completed += task.completed
+        if task is None and self._snapshot.row(task_id) < 0:
+            self._overlay.pop(task_id, None)
+        else:
+            self._overlay[task_id] = task
+        self._unflushed.add(task_id)
+        self._dirty = True
+
+    def add(self, task: Task) -> Task:
+        """Add a new task to the repository"""
+        self._replace(task.id, self.get_by_id(task.id), task)
+        # Keep generated IDs ahead of explicitly chosen ones
+        self._next_id = max(self._next_id, task.id + 1)
+        return task
+
+    def update(self, task_id: int, **updates) -> Optional[Task]:
+        """Update a task by ID"""
+        task = self.get_by_id(task_id)
+        if task is None:
+            return None
+        was_completed = task.completed
+        # A copy, so scans already holding the previous version never see the change
+        task = apply_updates(replace(task), updates)
+        self._completed += task.completed - was_completed
+        self._overlay[task_id] = task
+        self._unflushed.add(task_id)
+        self._dirty = True
+        return task
+
+    def delete(self, task_id: int) -> bool:
+        """Delete a task by ID"""
+        task = self.get_by_id(task_id)
+        if task is None:
+            return False
+        self._replace(task_id, task, None)
+        return True
+
+    def generate_id(self) -> int:
+        """Generate next available ID"""
+        new_id = self._next_id
+        self._next_id += 1
+        return new_id
+
+    def generate_ids(self, count: int) -> List[int]:
+        """Reserve a block of IDs"""
+        start = self._next_id
+        self._next_id += count
+        return list(range(start, self._next_id))
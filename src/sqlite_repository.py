@@ -0,0 +1,388 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+from .models import MutationResult, MutationStatus, Task, TaskQuery, TaskStats
+from .repository import TaskRepository
+
+
+_SCHEMA = (
+    # INTEGER PRIMARY KEY aliases the rowid, so lookups by ID use the table b-tree
+    """CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        description TEXT,
+        completed INTEGER NOT NULL DEFAULT 0,
+        version INTEGER NOT NULL DEFAULT 1
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (completed)",
+    # Serves title prefix ranges and title ordering in query
+    "CREATE INDEX IF NOT EXISTS idx_tasks_title ON tasks (title)",
+    "CREATE TABLE IF NOT EXISTS id_sequence (name TEXT PRIMARY KEY, next_id INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO id_sequence (name, next_id) VALUES ('tasks', 1)",
+)
+
+# Single-row counter table kept current by triggers, so task_stats is one
+# primary-key read instead of a count over the whole table. Seeding from the
+# existing rows also brings older databases up to date.
+_COUNTERS = (
+    """CREATE TABLE IF NOT EXISTS task_counts (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        total INTEGER NOT NULL,
+        completed INTEGER NOT NULL
+    )""",
+    "INSERT OR IGNORE INTO task_counts (id, total, completed) "
+    "SELECT 1, count(*), coalesce(sum(completed), 0) FROM tasks",
+    """CREATE TRIGGER IF NOT EXISTS tasks_count_insert AFTER INSERT ON tasks BEGIN
+        UPDATE task_counts SET total = total + 1, completed = completed + NEW.completed WHERE id = 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_count_delete AFTER DELETE ON tasks BEGIN
+        UPDATE task_counts SET total = total - 1, completed = completed - OLD.completed WHERE id = 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_count_update AFTER UPDATE OF completed ON tasks
+    WHEN OLD.completed != NEW.completed BEGIN
+        UPDATE task_counts SET completed = completed + NEW.completed - OLD.completed WHERE id = 1;
+    END""",
+)
+
+# Stored in the database header once _SCHEMA, _migrate and _COUNTERS have
+# been applied; bump it whenever any of them changes
+_SCHEMA_VERSION = 1
+
+# Statements are kept as constants so the connection's statement cache
+# reuses the prepared form instead of recompiling them on every call.
+_COLUMNS = "id, title, description, completed, version"
+_SELECT_ALL = f"SELECT {_COLUMNS} FROM tasks ORDER BY id"
+_SELECT_BY_ID = f"SELECT {_COLUMNS} FROM tasks WHERE id = ?"
+_INSERT = f"INSERT OR REPLACE INTO tasks ({_COLUMNS}) VALUES (?, ?, ?, ?, ?)"
+_RESERVE_ID = "UPDATE id_sequence SET next_id = max(next_id, ? + 1) WHERE name = 'tasks'"
+_DELETE = "DELETE FROM tasks WHERE id = ?"
+_DELETE_RETURNING = f"DELETE FROM tasks WHERE id = ? RETURNING {_COLUMNS}"
+_DELETE_VERSION = f"DELETE FROM tasks WHERE id = ? AND version = ? RETURNING {_COLUMNS}"
+_SELECT_COUNTS = "SELECT total, completed FROM task_counts WHERE id = 1"
+_NEXT_ID = "UPDATE id_sequence SET next_id = next_id + 1 WHERE name = 'tasks' RETURNING next_id - 1"
+_NEXT_IDS = "UPDATE id_sequence SET next_id = next_id + ? WHERE name = 'tasks' RETURNING next_id - ?"
+
+_SELECT_PAGE = f"SELECT {_COLUMNS} FROM tasks WHERE id > ? ORDER BY id LIMIT ?"
+_SELECT_STATUS_PAGE = f"SELECT {_COLUMNS} FROM tasks WHERE completed = ? AND id > ? ORDER BY id LIMIT ?"
+# Rows fetched per query while streaming with iter_tasks
+_PAGE_SIZE = 500
+
+# Keep IN (...) lists below SQLite's default host parameter limit
+_MAX_PARAMETERS = 500
+
+_UPDATABLE_COLUMNS = ('title', 'description', 'completed')
+
+
+def _row_to_task(row) -> Task:
+    return Task(id=row[0], title=row[1], description=row[2], completed=bool(row[3]), version=row[4])
+
+
+def _task_row(task: Task) -> tuple:
+    return (task.id, task.title, task.description, int(task.completed), task.version)
+
+
+def _chunks(items: List, size: int = _MAX_PARAMETERS):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    Return the smallest string above every string starting with prefix,
+    or None when there is none. SQLite's default collation compares UTF-8
+    bytes, which orders strings the same way as their code points.
+    """
+    prefix = prefix.rstrip(chr(0x10FFFF))
+    if not prefix:
+        return None
+    code = ord(prefix[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        # Surrogates cannot be encoded; skip to the next encodable code point
+        code = 0xE000
+    return prefix[:-1] + chr(code)
+
+
+def _query_filters(query: TaskQuery):
+    """Return the WHERE conditions and their values for the filters in a query"""
+    conditions, values = [], []
+    if query.completed is not None:
+        conditions.append("completed = ?")
+        values.append(int(query.completed))
+    if query.min_id is not None:
+        conditions.append("id >= ?")
+        values.append(query.min_id)
+    if query.max_id is not None:
+        conditions.append("id <= ?")
+        values.append(query.max_id)
+    if query.title_prefix:
+        conditions.append("title >= ?")
+        values.append(query.title_prefix)
+        upper = _prefix_upper_bound(query.title_prefix)
+        if upper is not None:
+            conditions.append("title < ?")
+            values.append(upper)
+    return conditions, values
+
+
+def _assignments(fields: Dict):
+    """
+    Return the SET clause and values for the known fields in an update.
+    Every update also bumps the row version.
+    """
+    columns = tuple(column for column in _UPDATABLE_COLUMNS if column in fields)
+    values = [int(fields[column]) if column == 'completed' else fields[column] for column in columns]
+    clause = ", ".join([f"{column} = ?" for column in columns] + ["version = version + 1"])
+    return clause, values
+
+
+class SqliteTaskRepository(TaskRepository):
+    """
+    Persistent repository stored in a SQLite database file.
+
+    A single long-lived connection is opened in WAL mode and reused for every
+    call; access to it is serialised with a lock so the repository can be
+    shared between threads. ID generation happens inside the database, so
+    IDs stay unique across processes sharing the same file.
+    """
+
+    def __init__(self, path: str, cached_statements: int = 64):
+        self._path = path
+        self._lock = threading.Lock()
+        # Autocommit mode; multi-statement writes open explicit transactions
+        self._conn = sqlite3.connect(
+            path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=cached_statements,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL makes NORMAL durable against application crashes
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        # INSERT OR REPLACE only fires the delete trigger with recursive triggers on
+        self._conn.execute("PRAGMA recursive_triggers=ON")
+        # Databases already at the current schema skip the DDL and its write transaction
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+            with self._transaction() as conn:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+                self._migrate(conn)
+                for statement in _COUNTERS:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+    @staticmethod
+    def _migrate(conn) -> None:
+        """Bring databases created by older versions up to the current schema"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+        if 'version' not in columns:
+            conn.execute("ALTER TABLE tasks ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+
+    def get_all(self) -> List[Task]:
+        """Return all tasks"""
+        with self._lock:
+            rows = self._conn.execute(_SELECT_ALL).fetchall()
+        return [_row_to_task(row) for row in rows]
+
+    def get_by_id(self, task_id: int) -> Optional[Task]:
+        """Find task by ID"""
+        with self._lock:
+            row = self._conn.execute(_SELECT_BY_ID, (task_id,)).fetchone()
+        return _row_to_task(row) if row else None
+
+    def task_stats(self) -> TaskStats:
+        """Return task counts from the trigger-maintained counter row"""
+        with self._lock:
+            total, completed = self._conn.execute(_SELECT_COUNTS).fetchone()
+        return TaskStats(total=total, completed=completed)
+
+    @contextmanager
+    def _transaction(self):
+        """Hold the connection lock and run the enclosed statements as one transaction"""
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                   limit: Optional[int] = None) -> Iterator[Task]:
+        """
+        Yield tasks in ID order, fetching one keyset page at a time.
+        The lock is only held while a page is read, so writers are not
+        blocked by a slow consumer.
+        """
+        cursor = after_id if after_id is not None else 0
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_size = _PAGE_SIZE if remaining is None else min(_PAGE_SIZE, remaining)
+            with self._lock:
+                if completed is None:
+                    rows = self._conn.execute(_SELECT_PAGE, (cursor, page_size)).fetchall()
+                else:
+                    rows = self._conn.execute(_SELECT_STATUS_PAGE, (int(completed), cursor, page_size)).fetchall()
+            for row in rows:
+                yield _row_to_task(row)
+            if len(rows) < page_size:
+                return
+            cursor = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def query(self, query: TaskQuery) -> Iterator[Task]:
+        """
+        Yield the tasks matching a query, with filters and order pushed into
+        SQL so SQLite can use the primary key, the status index or the title
+        index. Results are fetched one keyset page at a time, like iter_tasks.
+        """
+        conditions, values = _query_filters(query)
+        direction = "DESC" if query.descending else "ASC"
+        if query.order_by == 'title':
+            order = f"title {direction}, id {direction}"
+            after = "(title, id) < (?, ?)" if query.descending else "(title, id) > (?, ?)"
+        else:
+            order = f"id {direction}"
+            after = "id < ?" if query.descending else "id > ?"
+        cursor = None
+        remaining = query.limit
+        while remaining is None or remaining > 0:
+            page_size = _PAGE_SIZE if remaining is None else min(_PAGE_SIZE, remaining)
+            page_conditions = conditions if cursor is None else conditions + [after]
+            where = f" WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+            sql = f"SELECT {_COLUMNS} FROM tasks{where} ORDER BY {order} LIMIT ?"
+            with self._lock:
+                rows = self._conn.execute(sql, (*values, *(cursor or ()), page_size)).fetchall()
+            for row in rows:
+                yield _row_to_task(row)
+            if len(rows) < page_size:
+                return
+            last = rows[-1]
+            cursor = (last[1], last[0]) if query.order_by == 'title' else (last[0],)
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def add(self, task: Task) -> Task:
+        """Add a new task to the repository"""
+        with self._transaction() as conn:
+            conn.execute(_INSERT, _task_row(task))
+            # Keep the sequence ahead of explicitly chosen IDs
+            conn.execute(_RESERVE_ID, (task.id,))
+        return task
+
+    def update(self, task_id: int, **updates) -> Optional[Task]:
+        """Update a task by ID"""
+        assignments, values = _assignments(updates)
+        sql = f"UPDATE tasks SET {assignments} WHERE id = ? RETURNING {_COLUMNS}"
+        with self._lock:
+            # fetchall steps the statement to completion so the write commits
+            rows = self._conn.execute(sql, (*values, task_id)).fetchall()
+        return _row_to_task(rows[0]) if rows else None
+
+    def _missing_or_conflict(self, conn, task_id: int) -> MutationResult:
+        """Classify a conditional write that matched no row; only runs on the failure path"""
+        rows = conn.execute(_SELECT_BY_ID, (task_id,)).fetchall()
+        if not rows:
+            return MutationResult(MutationStatus.NOT_FOUND)
+        return MutationResult(MutationStatus.CONFLICT, _row_to_task(rows[0]))
+
+    def update_if(self, task_id: int, expected_version: Optional[int] = None, **updates) -> MutationResult:
+        """Conditionally update a task with one UPDATE ... RETURNING statement"""
+        assignments, values = _assignments(updates)
+        sql = f"UPDATE tasks SET {assignments} WHERE id = ?"
+        params = [*values, task_id]
+        if expected_version is not None:
+            sql += " AND version = ?"
+            params.append(expected_version)
+        with self._lock:
+            rows = self._conn.execute(sql + f" RETURNING {_COLUMNS}", params).fetchall()
+            if rows:
+                return MutationResult(MutationStatus.OK, _row_to_task(rows[0]))
+            return self._missing_or_conflict(self._conn, task_id)
+
+    def delete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally delete a task with one DELETE ... RETURNING statement"""
+        with self._lock:
+            if expected_version is None:
+                rows = self._conn.execute(_DELETE_RETURNING, (task_id,)).fetchall()
+            else:
+                rows = self._conn.execute(_DELETE_VERSION, (task_id, expected_version)).fetchall()
+            if rows:
+                return MutationResult(MutationStatus.OK, _row_to_task(rows[0]))
+            return self._missing_or_conflict(self._conn, task_id)
+
+    def delete(self, task_id: int) -> bool:
+        """Delete a task by ID"""
+        with self._lock:
+            cursor = self._conn.execute(_DELETE, (task_id,))
+        return cursor.rowcount > 0
+
+    def generate_id(self) -> int:
+        """Generate next available ID atomically inside the database"""
+        with self._lock:
+            return self._conn.execute(_NEXT_ID).fetchall()[0][0]
+
+    def _select_many(self, conn, task_ids: List[int]) -> Dict[int, Task]:
+        found = {}
+        for chunk in _chunks(task_ids):
+            placeholders = ", ".join("?" * len(chunk))
+            sql = f"SELECT {_COLUMNS} FROM tasks WHERE id IN ({placeholders})"
+            for row in conn.execute(sql, chunk):
+                found[row[0]] = _row_to_task(row)
+        return found
+
+    def get_many(self, task_ids: Iterable[int]) -> Dict[int, Task]:
+        """Find several tasks by ID with batched IN queries"""
+        task_ids = list(dict.fromkeys(task_ids))
+        with self._lock:
+            found = self._select_many(self._conn, task_ids)
+        return {task_id: found[task_id] for task_id in task_ids if task_id in found}
+
+    def add_many(self, tasks: List[Task]) -> List[Task]:
+        """Add a batch of tasks in a single transaction"""
+        if not tasks:
+            return []
+        with self._transaction() as conn:
+            conn.executemany(
+                _INSERT,
+                [_task_row(task) for task in tasks],
+            )
+            conn.execute(_RESERVE_ID, (max(task.id for task in tasks),))
+        return list(tasks)
+
+    def update_many(self, updates: Dict[int, Dict]) -> List[Task]:
+        """Apply per-task field updates in a single transaction"""
+        # Group rows by the set of columns they change so each group is one executemany
+        groups: Dict[str, List] = {}
+        for task_id, fields in updates.items():
+            assignments, values = _assignments(fields)
+            groups.setdefault(assignments, []).append((*values, task_id))
+        with self._transaction() as conn:
+            for assignments, rows in groups.items():
+                conn.executemany(f"UPDATE tasks SET {assignments} WHERE id = ?", rows)
+            found = self._select_many(conn, list(updates))
+        return [found[task_id] for task_id in updates if task_id in found]
+
+    def delete_many(self, task_ids: Iterable[int]) -> int:
+        """Delete a batch of tasks in a single transaction"""
+        rows = [(task_id,) for task_id in dict.fromkeys(task_ids)]
+        with self._transaction() as conn:
+            cursor = conn.executemany(_DELETE, rows)
+        return cursor.rowcount
+
+    def generate_ids(self, count: int) -> List[int]:
+        """Reserve a contiguous block of IDs with one statement"""
+        if count <= 0:
+            return []
+        with self._lock:
+            start = self._conn.execute(_NEXT_IDS, (count, count)).fetchall()[0][0]
+        return list(range(start, start + count))
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,448 @@
+import threading
+import time
+from dataclasses import replace
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+from .models import MutationResult, MutationStatus, Task, TaskQuery, TaskStats
+from .repository import TaskRepository, apply_updates
+
+# Durability modes: when a mutation is acknowledged relative to its backend write
+IMMEDIATE = 'immediate'
+GROUPED = 'grouped'
+DEFERRED = 'deferred'
+DURABILITY_MODES = (IMMEDIATE, GROUPED, DEFERRED)
+
+# Tasks read per backend lock acquisition while streaming with iter_tasks
+_PAGE_SIZE = 500
+# Pause before the flusher retries after a failed backend write
+_RETRY_DELAY = 1.0
+# Failed writes of the same changes after which immediate and grouped modes give them up
+_MAX_ATTEMPTS = 3
+
+T = TypeVar('T')
+
+
+class _Outcome:
+    """Fate of the changes buffered between two batches, shared by the writers waiting on them"""
+
+    __slots__ = ('stored', 'error', 'merged_into')
+
+    def __init__(self):
+        self.stored = False
+        self.error: Optional[BaseException] = None
+        # Set when a rejected batch is put back in front of these changes
+        self.merged_into: Optional['_Outcome'] = None
+
+    def current(self) -> '_Outcome':
+        outcome = self
+        while outcome.merged_into is not None:
+            outcome = outcome.merged_into
+        return outcome
+
+
+class WriteBehindTaskRepository(TaskRepository):
+    """
+    Write-behind buffer in front of any TaskRepository.
+
+    Mutations are applied to an in-memory overlay keyed by task ID, so
+    repeated changes to one task collapse into a single pending entry, and
+    a background thread writes the overlay to the backend in batches: one
+    delete_many and one add_many, followed by the backend's flush. The
+    backend's add must replace an existing task with the same ID, as every
+    persistent backend does. The durability mode decides when a mutation
+    returns:
+
+    * immediate - after its own batch has been written, on the calling thread
+    * grouped   - after a batch containing it has been written; writers that
+                  arrive while a batch is being written share the next one
+    * deferred  - at once; the batch is written max_delay seconds after its
+                  first mutation, or sooner when max_batch tasks are pending.
+                  Anything still buffered is lost if the process dies
+                  without calling flush or close.
+
+    Lookups by ID are answered from the overlay first. get_all, iter_tasks,
+    query and task_stats flush the overlay and then read the backend. A batch
+    the backend rejects stays buffered and is retried every _RETRY_DELAY
+    seconds, and flush raises the error. In immediate and grouped modes the
+    buffered changes are given up after _MAX_ATTEMPTS failed writes, and every
+    writer waiting on them raises the backend error, so a broken backend
+    fails writers instead of blocking them. Deferred changes are already
+    acknowledged, so they are retried until close, which gives up whatever
+    it cannot write. Either way an error means the change is not stored,
+    unless the backend applied part of the batch before failing.
+    """
+
+    def __init__(self, repository: TaskRepository, durability: str = GROUPED,
+                 max_delay: float = 0.05, max_batch: int = 1000):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        if max_delay < 0:
+            raise ValueError("Flush delay cannot be negative")
+        if max_batch <= 0:
+            raise ValueError("Batch size must be positive")
+        self._repository = repository
+        self._durability = durability
+        self._max_delay = max_delay
+        self._max_batch = max_batch
+        # Task ID -> latest state, or None for a pending delete
+        self._pending: Dict[int, Optional[Task]] = {}
+        # The batch being written; still consulted by reads until it lands
+        self._flushing: Dict[int, Optional[Task]] = {}
+        self._oldest: Optional[float] = None
+        # Shared by the writers of the changes in _pending
+        self._outcome = _Outcome()
+        # Consecutive failed writes of the changes now buffered
+        self._attempts: int = 0
+        # Bumped whenever a batch lands in the backend, so backend reads made
+        # without _lock can tell whether they may have missed a change
+        self._landed: int = 0
+        self._closed = False
+        # Guards the overlay and counters; never held while waiting on a flush
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        # Serialises backend calls between callers and the flusher
+        self._backend_lock = threading.RLock()
+        # One batch in flight at a time
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        if durability != IMMEDIATE:
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    @property
+    def durability(self) -> str:
+        return self._durability
+
+    @property
+    def pending_writes(self) -> int:
+        """Number of tasks with changes not yet written to the backend"""
+        with self._lock:
+            return len(self._pending) + len(self._flushing)
+
+    # -- Flushing -------------------------------------------------------------
+
+    def flush(self) -> None:
+        """Write every buffered change to the backend and flush the backend"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, {}
+                outcome, self._outcome = self._outcome, _Outcome()
+                self._flushing = batch
+                self._oldest = None
+            try:
+                deleted = [task_id for task_id, task in batch.items() if task is None]
+                stored = [task for task in batch.values() if task is not None]
+                with self._backend_lock:
+                    if deleted:
+                        self._repository.delete_many(deleted)
+                    if stored:
+                        self._repository.add_many(stored)
+                    self._repository.flush()
+            except BaseException as error:
+                with self._lock:
+                    self._flushing = {}
+                    self._attempts += 1
+                    if self._closed or (self._durability != DEFERRED and self._attempts >= _MAX_ATTEMPTS):
+                        # Give up the batch and the newer changes built on it
+                        outcome.error = self._outcome.error = error
+                        self._outcome = _Outcome()
+                        self._pending = {}
+                        self._oldest = None
+                        self._attempts = 0
+                    else:
+                        # Changes buffered while the batch was being written are newer
+                        batch.update(self._pending)
+                        self._pending = batch
+                        self._outcome.merged_into = outcome
+                        self._outcome = outcome
+                        self._oldest = time.monotonic()
+                    self._changed.notify_all()
+                raise
+            with self._lock:
+                self._flushing = {}
+                outcome.stored = True
+                self._attempts = 0
+                self._landed += 1
+                self._changed.notify_all()
+
+    def _run(self) -> None:
+        """Flusher thread: write batches as the durability mode requires until closed"""
+        while True:
+            try:
+                with self._lock:
+                    while not self._pending and not self._closed:
+                        self._changed.wait()
+                    if self._closed:
+                        return
+                    if self._durability == DEFERRED:
+                        # A read may flush the batch while we wait, clearing _oldest
+                        while (not self._closed and self._pending and self._oldest is not None
+                               and len(self._pending) < self._max_batch):
+                            remaining = self._oldest + self._max_delay - time.monotonic()
+                            if remaining <= 0:
+                                break
+                            self._changed.wait(remaining)
+                self.flush()
+            except Exception:
+                with self._lock:
+                    self._changed.wait_for(lambda: self._closed, _RETRY_DELAY)
+
+    def _buffer(self, task_id: int, task: Optional[Task]) -> _Outcome:
+        """Record a change in the overlay; the caller holds _lock. Returns the outcome to wait on"""
+        self._pending[task_id] = task
+        if self._oldest is None:
+            # Wakes the flusher to start the delay
+            self._oldest = time.monotonic()
+            self._changed.notify_all()
+        elif self._durability == GROUPED or len(self._pending) >= self._max_batch:
+            self._changed.notify_all()
+        return self._outcome
+
+    def _commit(self, outcome: _Outcome) -> None:
+        """Return once a change is as durable as the mode promises, raising if it was given up"""
+        if self._durability == DEFERRED:
+            return
+        while True:
+            if self._durability == IMMEDIATE:
+                try:
+                    # Returns once every earlier batch, ours included, has been written or retried
+                    self.flush()
+                except Exception:
+                    pass  # Whether our change was given up is read from its outcome
+            with self._lock:
+                if outcome.current().error is None and not outcome.current().stored:
+                    # The flusher, or our next flush, retries a rejected batch
+                    self._changed.wait(_RETRY_DELAY if self._durability == IMMEDIATE else None)
+                outcome = outcome.current()
+                if outcome.error is not None:
+                    raise outcome.error
+                if outcome.stored:
+                    return
+
+    def _with_current(self, task_ids: List[int], apply: Callable[[Dict[int, Optional[Task]]], T]) -> T:
+        """
+        Call apply with the latest state of each task, buffered or stored,
+        while holding _lock. Tasks without buffered changes are read from the
+        backend with _lock released, so callers never wait on a batch write;
+        the reads are repeated if a batch landed in the meantime.
+        """
+        stored: Dict[int, Optional[Task]] = {}
+        stored_at = None
+        while True:
+            with self._lock:
+                if stored_at != self._landed:
+                    stored = {}
+                states: Dict[int, Optional[Task]] = {}
+                missing = []
+                for task_id in task_ids:
+                    if task_id in self._pending:
+                        states[task_id] = self._pending[task_id]
+                    elif task_id in self._flushing:
+                        states[task_id] = self._flushing[task_id]
+                    elif task_id in stored:
+                        states[task_id] = stored[task_id]
+                    else:
+                        missing.append(task_id)
+                if not missing:
+                    return apply(states)
+                stored_at = self._landed
+            with self._backend_lock:
+                found = self._repository.get_many(missing)
+            stored.update((task_id, found.get(task_id)) for task_id in missing)
+
+    @staticmethod
+    def _update(task: Optional[Task], expected_version: Optional[int], updates: Dict) -> MutationResult:
+        """Apply an update to a copy of the latest state of a task"""
+        if task is None:
+            return MutationResult(MutationStatus.NOT_FOUND)
+        if expected_version is not None and task.version != expected_version:
+            return MutationResult(MutationStatus.CONFLICT, task)
+        # Copy so tasks already handed out, or held by the backend, never change
+        return MutationResult(MutationStatus.OK, apply_updates(replace(task), updates))
+
+    # -- Reads ----------------------------------------------------------------
+
+    def get_all(self) -> List[Task]:
+        """Return all tasks, writing buffered changes first"""
+        self.flush()
+        with self._backend_lock:
+            return self._repository.get_all()
+
+    def get_by_id(self, task_id: int) -> Optional[Task]:
+        """Find task by ID, buffered changes first"""
+        with self._lock:
+            if task_id in self._pending:
+                return self._pending[task_id]
+            if task_id in self._flushing:
+                return self._flushing[task_id]
+        with self._backend_lock:
+            return self._repository.get_by_id(task_id)
+
+    def get_many(self, task_ids: Iterable[int]) -> Dict[int, Task]:
+        """Find several tasks by ID, fetching those without buffered changes with one backend call"""
+        task_ids = list(dict.fromkeys(task_ids))
+        found: Dict[int, Task] = {}
+        missing = []
+        with self._lock:
+            for task_id in task_ids:
+                if task_id in self._pending:
+                    task = self._pending[task_id]
+                elif task_id in self._flushing:
+                    task = self._flushing[task_id]
+                else:
+                    missing.append(task_id)
+                    continue
+                if task is not None:
+                    found[task_id] = task
+        if missing:
+            with self._backend_lock:
+                found.update(self._repository.get_many(missing))
+        return {task_id: found[task_id] for task_id in task_ids if task_id in found}
+
+    def task_stats(self) -> TaskStats:
+        """Return task counts, writing buffered changes first"""
+        self.flush()
+        with self._backend_lock:
+            return self._repository.task_stats()
+
+    def iter_tasks(self, completed: Optional[bool] = None, after_id: Optional[int] = None,
+                   limit: Optional[int] = None) -> Iterator[Task]:
+        """
+        Yield tasks in ID order, writing buffered changes first.
+        Tasks are read a page at a time, so the flusher is never blocked
+        while the caller is consuming results.
+        """
+        self.flush()
+        cursor = after_id
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_size = _PAGE_SIZE if remaining is None else min(_PAGE_SIZE, remaining)
+            with self._backend_lock:
+                page = list(self._repository.iter_tasks(completed=completed, after_id=cursor, limit=page_size))
+            yield from page
+            if len(page) < page_size:
+                return
+            cursor = page[-1].id
+            if remaining is not None:
+                remaining -= len(page)
+
+    def query(self, query: TaskQuery) -> Iterator[Task]:
+        """Yield the tasks matching a query, writing buffered changes first"""
+        self.flush()
+        with self._backend_lock:
+            return iter(list(self._repository.query(query)))
+
+    # -- Writes ---------------------------------------------------------------
+
+    def add(self, task: Task) -> Task:
+        """Add a new task to the repository"""
+        with self._lock:
+            outcome = self._buffer(task.id, task)
+        self._commit(outcome)
+        return task
+
+    def add_many(self, tasks: List[Task]) -> List[Task]:
+        """Add a batch of tasks"""
+        if not tasks:
+            return []
+        with self._lock:
+            for task in tasks:
+                outcome = self._buffer(task.id, task)
+        self._commit(outcome)
+        return list(tasks)
+
+    def update(self, task_id: int, **updates) -> Optional[Task]:
+        """Update a task by ID"""
+        return self.update_if(task_id, None, **updates).task
+
+    def update_many(self, updates: Dict[int, Dict]) -> List[Task]:
+        """Apply per-task field updates; returns the tasks that were found"""
+        def apply(states):
+            updated, outcome = [], None
+            for task_id, fields in updates.items():
+                result = self._update(states[task_id], None, fields)
+                if result.ok:
+                    outcome = self._buffer(task_id, result.task)
+                    states[task_id] = result.task
+                    updated.append(result.task)
+            return updated, outcome
+
+        updated, outcome = self._with_current(list(updates), apply)
+        if outcome is not None:
+            self._commit(outcome)
+        return updated
+
+    def update_if(self, task_id: int, expected_version: Optional[int] = None, **updates) -> MutationResult:
+        """Conditionally update a task, checking the version against buffered changes"""
+        def apply(states):
+            result = self._update(states[task_id], expected_version, updates)
+            return result, self._buffer(task_id, result.task) if result.ok else None
+
+        result, outcome = self._with_current([task_id], apply)
+        if outcome is not None:
+            self._commit(outcome)
+        return result
+
+    def complete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally mark a task as completed"""
+        return self.update_if(task_id, expected_version, completed=True)
+
+    def delete(self, task_id: int) -> bool:
+        """Delete a task by ID"""
+        return self.delete_if(task_id).ok
+
+    def delete_if(self, task_id: int, expected_version: Optional[int] = None) -> MutationResult:
+        """Conditionally delete a task; the result carries the deleted task"""
+        def apply(states):
+            task = states[task_id]
+            if task is None:
+                return MutationResult(MutationStatus.NOT_FOUND), None
+            if expected_version is not None and task.version != expected_version:
+                return MutationResult(MutationStatus.CONFLICT, task), None
+            return MutationResult(MutationStatus.OK, task), self._buffer(task_id, None)
+
+        result, outcome = self._with_current([task_id], apply)
+        if outcome is not None:
+            self._commit(outcome)
+        return result
+
+    def delete_many(self, task_ids: Iterable[int]) -> int:
+        """Delete a batch of tasks; returns how many were deleted"""
+        task_ids = list(dict.fromkeys(task_ids))
+
+        def apply(states):
+            deleted, outcome = 0, None
+            for task_id in task_ids:
+                if states[task_id] is not None:
+                    outcome = self._buffer(task_id, None)
+                    deleted += 1
+            return deleted, outcome
+
+        deleted, outcome = self._with_current(task_ids, apply)
+        if outcome is not None:
+            self._commit(outcome)
+        return deleted
+
+    def generate_id(self) -> int:
+        """Generate next available ID"""
+        with self._backend_lock:
+            return self._repository.generate_id()
+
+    def generate_ids(self, count: int) -> List[int]:
+        """Reserve a block of IDs"""
+        with self._backend_lock:
+            return self._repository.generate_ids(count)
+
+    def close(self) -> None:
+        """Stop the flusher, write what is still buffered and close the wrapped repository"""
+        with self._lock:
+            self._closed = True
+            self._changed.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            self.flush()
+        finally:
+            with self._backend_lock:
+                self._repository.close()
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.async_repository import AsyncLogTaskRepository, ThreadPoolTaskRepository
+from src.async_service import AsyncTodoService
+from src.log_repository import LogTaskRepository
+from src.models import Task
+from src.repository import IndexedTaskRepository
+
+
+class AsyncServiceContract:
+    """Behaviour every AsyncTaskRepository must show behind AsyncTodoService"""
+
+    async def make_repository(self):
+        raise NotImplementedError
+
+    async def asyncSetUp(self):
+        self.repository = await self.make_repository()
+        self.service = AsyncTodoService(self.repository)
+
+    async def asyncTearDown(self):
+        await self.service.close()
+
+    async def test_crud(self):
+        """Test add, update, complete and delete"""
+        # Act
+        first = await self.service.add_task("First", "Description")
+        second = await self.service.add_task("Second")
+        await self.service.update_task(first.id, title="Renamed")
+        await self.service.complete_task(second.id)
+        await self.service.delete_task(first.id)
+
+        # Assert
+        self.assertEqual(await self.service.get_all_tasks(), [Task(id=2, title="Second", completed=True, version=2)])
+        with self.assertRaises(ValueError) as context:
+            await self.service.complete_task(first.id)
+        self.assertEqual(str(context.exception), "Task with ID 1 does not exist")
+
+    async def test_bulk_and_pagination(self):
+        """Test batch methods and cursor pagination"""
+        # Act
+        await self.service.add_tasks([(f"Task {i}", None) for i in range(1, 8)])
+        await self.service.complete_tasks([2, 4])
+        await self.service.delete_tasks([3])
+        page, cursor = await self.service.get_page(3)
+        rest, last_cursor = await self.service.get_page(10, after_id=cursor)
+
+        # Assert
+        self.assertEqual([t.id for t in page], [1, 2, 4])
+        self.assertEqual([t.id for t in rest], [5, 6, 7])
+        self.assertIsNone(last_cursor)
+        self.assertEqual([t.id async for t in self.service.iter_tasks(completed=True)], [2, 4])
+
+    async def test_concurrent_coroutines_get_unique_ids(self):
+        """Test many coroutines adding at the same time"""
+        # Act
+        tasks = await asyncio.gather(*(self.service.add_task(f"Task {i}") for i in range(200)))
+
+        # Assert
+        self.assertEqual(sorted(task.id for task in tasks), list(range(1, 201)))
+
+    async def test_search(self):
+        """Test full-text search through the async service"""
+        # Arrange
+        await self.service.add_tasks([("Buy milk", None), ("Walk dog", None)])
+
+        # Act
+        result = await self.service.search("mil*")
+
+        # Assert
+        self.assertEqual([t.title for t in result], ["Buy milk"])
+
+    async def test_search_index_follows_the_last_of_racing_writes(self):
+        """Test that an update finishing after a delete of the same task does not put it back in the index"""
+        # Arrange
+        await self.service.add_tasks([("Buy milk", None), ("Buy bread", None)])
+        await self.service.search("buy")
+        update_if = self.repository.update_if
+
+        async def racing_update_if(task_id, expected_version=None, **updates):
+            result = await update_if(task_id, expected_version, **updates)
+            # Another coroutine deletes the task before this update reaches the index
+            await self.service.delete_task(task_id)
+            return result
+
+        # Act
+        with patch.object(self.repository, "update_if", side_effect=racing_update_if):
+            await self.service.update_task(1, title="Buy cheese")
+
+        # Assert
+        self.assertEqual(len(self.service._search_index), 1)
+        self.assertEqual([t.title for t in await self.service.search("buy")], ["Buy bread"])
+
+
+class TestThreadPoolTaskRepository(AsyncServiceContract, unittest.IsolatedAsyncioTestCase):
+    async def make_repository(self):
+        return ThreadPoolTaskRepository(IndexedTaskRepository(), max_workers=4)
+
+
+class TestAsyncLogTaskRepository(AsyncServiceContract, unittest.IsolatedAsyncioTestCase):
+    async def make_repository(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.directory = os.path.join(self._tmpdir.name, "store")
+        return await AsyncLogTaskRepository.open(self.directory, snapshot_every=50)
+
+    async def test_group_commit_is_durable(self):
+        """Test that acknowledged writes from concurrent coroutines survive reopening"""
+        # Act
+        await asyncio.gather(*(self.service.add_task(f"Task {i}") for i in range(120)))
+        await self.service.complete_tasks([1, 2])
+
+        # Assert: read the files with the synchronous store
+        reopened = LogTaskRepository(self.directory)
+        self.assertEqual(len(reopened.get_all()), 120)
+        self.assertTrue(reopened.get_by_id(2).completed)
+        self.assertLess(reopened.log_records, 50)  # a snapshot was taken
+        reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import patch
+from src.caching_repository import CachingTaskRepository
+from src.models import Task
+from src.repository import IndexedTaskRepository
+from src.service import TodoService
+
+
+class TestCachingTaskRepository(unittest.TestCase):
+    def setUp(self):
+        self.backend = IndexedTaskRepository()
+        self.backend.add_many([Task(id=i, title=f"Task {i}") for i in range(1, 6)])
+        self.repository = CachingTaskRepository(self.backend, max_size=3, cache_pages=True)
+
+    def test_read_through_and_hits(self):
+        """Test that repeated reads are served from the cache"""
+        # Act
+        with patch.object(self.backend, "get_by_id", wraps=self.backend.get_by_id) as backend_get:
+            first = self.repository.get_by_id(1)
+            second = self.repository.get_by_id(1)
+
+        # Assert
+        self.assertIs(first, second)
+        self.assertEqual(backend_get.call_count, 1)
+        stats = self.repository.cache_stats()
+        self.assertEqual((stats.hits, stats.misses), (1, 1))
+        self.assertEqual(stats.hit_rate, 0.5)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used task is evicted first"""
+        # Act
+        for task_id in (1, 2, 3, 1, 4):
+            self.repository.get_by_id(task_id)
+
+        # Assert
+        self.assertEqual(list(self.repository._tasks), [3, 1, 4])
+        self.assertEqual(self.repository.cache_stats().evictions, 1)
+
+    def test_writes_invalidate(self):
+        """Test that updates and deletes are visible on the next read"""
+        # Arrange
+        self.repository.get_by_id(1)
+        self.repository.get_by_id(2)
+
+        # Act
+        self.repository.update(1, title="Renamed")
+        self.repository.delete(2)
+
+        # Assert
+        self.assertEqual(self.repository.get_by_id(1).title, "Renamed")
+        self.assertIsNone(self.repository.get_by_id(2))
+
+    def test_get_many_fetches_misses_in_one_call(self):
+        """Test that get_many combines cache hits with one backend lookup"""
+        # Arrange
+        self.repository.get_by_id(1)
+
+        # Act
+        with patch.object(self.backend, "get_many", wraps=self.backend.get_many) as backend_get_many:
+            result = self.repository.get_many([1, 2, 9])
+
+        # Assert
+        self.assertEqual(list(result), [1, 2])
+        backend_get_many.assert_called_once_with([2, 9])
+
+    def test_page_cache_invalidated_by_writes(self):
+        """Test that cached pages are reused until the next write"""
+        # Act
+        with patch.object(self.backend, "iter_tasks", wraps=self.backend.iter_tasks) as backend_iter:
+            first = list(self.repository.iter_tasks(limit=2))
+            second = list(self.repository.iter_tasks(limit=2))
+            self.repository.update(1, completed=True)
+            third = list(self.repository.iter_tasks(completed=False, limit=2))
+
+        # Assert
+        self.assertEqual(first, second)
+        self.assertEqual([t.id for t in third], [2, 3])
+        self.assertEqual(backend_iter.call_count, 2)
+        stats = self.repository.cache_stats()
+        self.assertEqual((stats.page_hits, stats.page_misses), (1, 2))
+
+    def test_drop_in_for_todo_service(self):
+        """Test the cache behind a real TodoService"""
+        # Arrange
+        service = TodoService(self.repository)
+
+        # Act
+        task = service.add_task("New")
+        service.complete_task(task.id)
+        service.delete_task(1)
+
+        # Assert
+        self.assertTrue(service.get_task(task.id).completed)
+        self.assertEqual(len(service.get_all_tasks()), 5)
+        with self.assertRaises(ValueError):
+            service.delete_task(1)
+
+
+if __name__ == "__main__":
+    unittest.main()
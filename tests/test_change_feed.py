@@ -0,0 +1,122 @@
+import threading
+import unittest
+from src.change_feed import ChangeFeed, ChangeFeedGapError, ChangeFeedTaskRepository, ChangeKind
+from src.models import Task
+from src.repository import IndexedTaskRepository
+from src.service import TodoService, VersionConflictError
+
+
+class TestChangeFeed(unittest.TestCase):
+    def setUp(self):
+        self.repository = ChangeFeedTaskRepository(IndexedTaskRepository(), ChangeFeed(capacity=8))
+        self.service = TodoService(self.repository)
+        self.feed = self.repository.feed
+
+    def test_writes_publish_sequenced_events(self):
+        """Test that adds, updates and deletes become events in the order applied"""
+        # Arrange
+        subscription = self.feed.subscribe(after=0)
+
+        # Act
+        self.service.add_task("Buy milk")
+        self.service.update_task(1, title="Buy oat milk")
+        self.service.complete_task(1)
+        self.service.delete_task(1)
+        events = subscription.poll()
+
+        # Assert
+        self.assertEqual([(event.sequence, event.kind, event.task_id) for event in events], [
+            (1, ChangeKind.ADDED, 1), (2, ChangeKind.UPDATED, 1), (3, ChangeKind.UPDATED, 1),
+            (4, ChangeKind.DELETED, 1),
+        ])
+        self.assertEqual(events[1].task, Task(id=1, title="Buy oat milk", version=2))
+        self.assertTrue(events[2].task.completed)
+        self.assertIsNone(events[3].task)
+        self.assertEqual(subscription.position, 4)
+
+    def test_failed_writes_publish_nothing(self):
+        """Test that rejected conditional writes and missing deletes leave the feed alone"""
+        # Arrange
+        self.service.add_task("Task")
+
+        # Act
+        with self.assertRaises(VersionConflictError):
+            self.service.update_task(1, title="Other", expected_version=5)
+        with self.assertRaises(ValueError):
+            self.service.delete_tasks([1, 2])
+        deleted = self.repository.delete_many([1, 2])
+
+        # Assert
+        self.assertEqual(deleted, 1)
+        self.assertEqual([event.kind for event in self.feed.read(0)], [ChangeKind.ADDED, ChangeKind.DELETED])
+
+    def test_reads_in_batches_and_resumes(self):
+        """Test that readers take bounded batches and can resume from any buffered sequence"""
+        # Arrange
+        self.service.add_tasks([(f"Task {i}", None) for i in range(5)])
+        subscription = self.feed.subscribe(after=0)
+
+        # Act
+        first = subscription.poll(max_events=3)
+        second = subscription.poll(max_events=3)
+        empty = subscription.poll()
+        resumed = self.feed.read(after=2)
+
+        # Assert
+        self.assertEqual([event.sequence for event in first], [1, 2, 3])
+        self.assertEqual([event.sequence for event in second], [4, 5])
+        self.assertEqual(empty, [])
+        self.assertEqual([event.sequence for event in resumed], [3, 4, 5])
+
+    def test_reader_that_falls_behind_gets_gap_error(self):
+        """Test that events overwritten in the ring buffer are reported, not skipped"""
+        # Arrange
+        subscription = self.feed.subscribe()
+        self.service.add_tasks([(f"Task {i}", None) for i in range(10)])
+
+        # Act / Assert
+        with self.assertRaises(ChangeFeedGapError) as context:
+            subscription.poll()
+        self.assertEqual(context.exception.oldest, 3)
+        self.assertEqual([event.sequence for event in self.feed.read(2)], list(range(3, 11)))
+
+    def test_waiting_reader_wakes_on_publish(self):
+        """Test that a blocked read returns once a write publishes"""
+        # Arrange
+        subscription = self.feed.subscribe()
+        received = []
+        reader = threading.Thread(target=lambda: received.extend(subscription.poll(timeout=5)))
+        reader.start()
+
+        # Act
+        self.service.add_tasks([("A", None), ("B", None)])
+        reader.join(5)
+
+        # Assert
+        self.assertFalse(reader.is_alive())
+        self.assertEqual([event.task_id for event in received], [1, 2])
+
+    def test_incremental_consumer_mirrors_store(self):
+        """Test that applying events to a copy keeps it equal to the store"""
+        # Arrange
+        self.service.add_tasks([(f"Task {i}", None) for i in range(3)])
+        mirror = {task.id: task for task in self.service.get_all_tasks()}
+        subscription = self.feed.subscribe()
+
+        # Act
+        self.service.complete_tasks([1, 3])
+        self.service.update_tasks([(2, "Renamed", "Details")])
+        self.service.delete_task(3)
+        self.service.add_task("Task 4")
+        for event in subscription.poll():
+            if event.kind is ChangeKind.DELETED:
+                mirror.pop(event.task_id)
+            else:
+                mirror[event.task_id] = event.task
+
+        # Assert
+        self.assertEqual(sorted(mirror.values(), key=lambda task: task.id), self.service.get_all_tasks())
+
+
+if __name__ == "__main__":
+    unittest.main()
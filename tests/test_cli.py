@@ -0,0 +1,231 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest.mock import patch
+from src.cli import TodoCLI
+from src.models import Task
+from src.repository import IndexedTaskRepository
+from src.service import TodoService
+
+
+class TestTodoCLICommands(unittest.TestCase):
+    def setUp(self):
+        self.repository = IndexedTaskRepository()
+        self.service = TodoService(self.repository)
+        self.cli = TodoCLI(self.service)
+
+    def _run(self, *args, stdin=""):
+        out, err = io.StringIO(), io.StringIO()
+        with patch("sys.stdin", io.StringIO(stdin)), redirect_stdout(out), redirect_stderr(err):
+            self.cli.run(list(args))
+        return out.getvalue(), err.getvalue()
+
+    def test_add_and_list(self):
+        """Test the add and list subcommands"""
+        # Act
+        added, _ = self._run("add", "Buy Milk", "2 litres")
+        self.service.add_task("Done")
+        self.service.complete_task(2)
+        listed, _ = self._run("list")
+
+        # Assert
+        self.assertEqual(added, "Task #1 created: Buy Milk\n")
+        self.assertEqual(listed, "1. [ ] Buy Milk\n   2 litres\n2. [x] Done\n")
+
+    def test_list_filters_and_sorts(self):
+        """Test the list subcommand's query options"""
+        # Arrange
+        self.service.add_tasks([("Buy milk", None), ("Call mum", None), ("Buy bread", None), ("Buy eggs", None)])
+        self.service.complete_task(4)
+
+        # Act
+        listed, _ = self._run("list", "--pending", "--prefix", "Buy", "--sort", "title", "--desc")
+        limited, _ = self._run("list", "--min-id", "2", "--limit", "2")
+
+        # Assert
+        self.assertEqual(listed, "1. [ ] Buy milk\n3. [ ] Buy bread\n")
+        self.assertEqual(limited, "2. [ ] Call mum\n3. [ ] Buy bread\n")
+
+    def test_complete_and_delete_accept_several_ids(self):
+        """Test that complete and delete operate on batches of IDs"""
+        # Arrange
+        self.service.add_tasks([("A", None), ("B", None), ("C", None)])
+
+        # Act
+        self._run("complete", "1", "3")
+        self._run("delete", "2", "3")
+
+        # Assert
+        self.assertEqual(self.service.get_all_tasks(), [Task(id=1, title="A", completed=True, version=2)])
+
+    def test_stats_reports_counts(self):
+        """Test the stats subcommand"""
+        # Arrange
+        self.service.add_tasks([("A", None), ("B", None), ("C", None)])
+        self.service.complete_task(2)
+
+        # Act
+        out, _ = self._run("stats")
+
+        # Assert
+        self.assertEqual(out, "Total: 3\nPending: 2\nCompleted: 1\n")
+
+    def test_errors_exit_with_status_one(self):
+        """Test that validation errors are reported on stderr"""
+        # Act
+        with self.assertRaises(SystemExit) as context:
+            self._run("complete", "42")
+
+        # Assert
+        self.assertEqual(context.exception.code, 1)
+
+    def test_import_jsonl_in_chunks(self):
+        """Test that import feeds the service in chunks of the requested size"""
+        # Arrange
+        lines = "".join(
+            json.dumps({"title": f"Task {i}", "completed": i == 2}) + "\n" for i in range(5)
+        )
+
+        # Act
+        with patch.object(self.service, "add_tasks", wraps=self.service.add_tasks) as add_tasks, \
+                patch.object(self.service, "complete_tasks") as complete_tasks:
+            _, err = self._run("import", "--chunk-size", "2", stdin=lines)
+
+        # Assert
+        self.assertEqual(add_tasks.call_count, 3)
+        complete_tasks.assert_not_called()
+        self.assertEqual(err, "Imported 5 tasks.\n")
+        self.assertEqual([(task.completed, task.version) for task in self.service.get_all_tasks()],
+                         [(False, 1), (False, 1), (True, 1), (False, 1), (False, 1)])
+
+    def test_import_rejects_malformed_records_by_line(self):
+        """Test that a bad title stops the import with an error naming its line"""
+        for line, message in (('{"title": 5}', "Line 3: title must be a non-empty string"),
+                              ('{"title": " "}', "Line 3: title must be a non-empty string"),
+                              ('{"title": "x", "description": [1]}', "Line 3: description must be a string or null"),
+                              ('{"title": ', "Line 3: invalid JSON")):
+            with self.subTest(line=line):
+                # Arrange
+                service = TodoService(IndexedTaskRepository())
+                cli = TodoCLI(service)
+                stdin = '{"title": "ok"}\n{"title": "also ok"}\n' + line + '\n'
+
+                # Act
+                err = io.StringIO()
+                with patch("sys.stdin", io.StringIO(stdin)), redirect_stderr(err), \
+                        self.assertRaises(SystemExit) as context:
+                    cli.run(["import", "--chunk-size", "1"])
+
+                # Assert
+                self.assertEqual(context.exception.code, 1)
+                self.assertIn("Imported 2 tasks before the error.", err.getvalue())
+                self.assertIn(f"Error: {message}", err.getvalue())
+                self.assertEqual([task.title for task in service.get_all_tasks()], ["ok", "also ok"])
+
+    def test_csv_export_import_round_trip(self):
+        """Test exporting CSV and importing it into another store"""
+        # Arrange
+        self.service.add_tasks([("First", "With, comma"), ("Second", None)])
+        self.service.complete_task(2)
+
+        # Act
+        exported, _ = self._run("export", "--format", "csv")
+        other = TodoCLI(TodoService(IndexedTaskRepository()))
+        with patch("sys.stdin", io.StringIO(exported)), redirect_stderr(io.StringIO()):
+            other.run(["import", "--format", "csv"])
+
+        # Assert: versions are not exported, so imported tasks start again at 1
+        fields = lambda task: (task.id, task.title, task.description, task.completed)
+        self.assertEqual(exported.splitlines()[0], "id,title,description,completed")
+        self.assertEqual(list(map(fields, other.service.get_all_tasks())),
+                         list(map(fields, self.service.get_all_tasks())))
+
+    def test_jsonl_export(self):
+        """Test that export writes one JSON object per line"""
+        # Arrange
+        self.service.add_task("Task", "Details")
+
+        # Act
+        exported, _ = self._run("export")
+
+        # Assert
+        self.assertEqual(
+            [json.loads(line) for line in exported.splitlines()],
+            [{"id": 1, "title": "Task", "description": "Details", "completed": False}],
+        )
+
+
+class TestTodoCLIInteractive(unittest.TestCase):
+    def setUp(self):
+        self.service = TodoService(IndexedTaskRepository())
+        self.cli = TodoCLI(self.service)
+
+    def test_view_renders_one_page_at_a_time(self):
+        """Test that the task list stops after the first page when the user quits"""
+        # Arrange
+        self.service.add_tasks([(f"Task {i}", None) for i in range(1, 46)])
+        out = io.StringIO()
+
+        # Act
+        with patch("builtins.input", side_effect=["q"]) as prompt, redirect_stdout(out):
+            self.cli.view_tasks_interactive()
+
+        # Assert
+        self.assertEqual(prompt.call_count, 1)
+        self.assertIn("20. ⏳ Task 20", out.getvalue())
+        self.assertNotIn("21. ⏳ Task 21", out.getvalue())
+        self.assertIn("45 pending, 0 completed out of 45 total tasks", out.getvalue())
+
+    def test_update_looks_up_the_selected_task(self):
+        """Test updating a task picked by ID from the interactive view"""
+        # Arrange
+        self.service.add_tasks([("First", None), ("Second", None)])
+
+        # Act
+        with patch("builtins.input", side_effect=["2", "Renamed", ""]), redirect_stdout(io.StringIO()):
+            self.cli.update_task_interactive()
+
+        # Assert
+        self.assertEqual(self.service.get_task(2).title, "Renamed")
+
+    def test_pick_prompts_skip_preview_for_large_stores(self):
+        """Test that the task listing is skipped above the preview limit"""
+        # Arrange
+        self.service.add_tasks([(f"Task {i}", None) for i in range(1, 6)])
+        out = io.StringIO()
+
+        # Act
+        with patch("src.cli.PREVIEW_LIMIT", 3), patch("builtins.input", side_effect=["4"]), redirect_stdout(out):
+            self.cli.complete_task_interactive()
+
+        # Assert
+        self.assertIn("5 tasks - too many to list here", out.getvalue())
+        self.assertNotIn("Task 1", out.getvalue())
+        self.assertTrue(self.service.get_task(4).completed)
+
+    def test_view_streams_long_lists_through_pager(self):
+        """Test that a long list goes to the pager in one pass"""
+        # Arrange
+        self.service.add_tasks([(f"Task {i}", None) for i in range(1, 46)])
+        with tempfile.TemporaryDirectory() as directory:
+            paged = os.path.join(directory, "paged.txt")
+
+            # Act
+            with patch("src.render.pager_command", return_value=f"cat > '{paged}'"), \
+                    patch("builtins.input") as prompt, redirect_stdout(io.StringIO()) as out:
+                self.cli.view_tasks_interactive()
+            with open(paged, encoding='utf-8') as pager_input:
+                lines = pager_input.read().splitlines()
+
+        # Assert
+        prompt.assert_not_called()
+        self.assertEqual(len(lines), 45)
+        self.assertEqual(lines[-1], "45. ⏳ Task 45")
+        self.assertIn("45 pending", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+from src.models import MutationStatus, Task, TaskStats
+from src.service import TodoService
+from src.columnar_repository import ColumnarTaskRepository
+
+
+class TestColumnarTaskRepository(unittest.TestCase):
+    def setUp(self):
+        self.repository = ColumnarTaskRepository()
+        self.service = TodoService(self.repository)
+
+    def test_round_trip(self):
+        """Test that tasks read back exactly as they were stored"""
+        # Arrange
+        first = self.service.add_task("First", "Description")
+        second = self.service.add_task("Second")
+
+        # Act
+        self.service.complete_task(second.id)
+
+        # Assert
+        self.assertEqual(self.repository.get_all(), [first, Task(id=2, title="Second", completed=True, version=2)])
+        self.assertEqual(self.repository.get_by_id(1), first)
+        self.assertIsNone(self.repository.get_by_id(3))
+
+    def test_strings_are_interned(self):
+        """Test that repeated titles and descriptions are stored once"""
+        # Act
+        self.service.add_tasks([("Same", "Shared")] * 100)
+
+        # Assert
+        self.assertEqual(len(self.repository._strings), 2)
+        self.assertEqual(len(self.repository), 100)
+
+    def test_replaced_and_deleted_strings_are_released(self):
+        """Test that strings no row uses any more are dropped and their slots reused"""
+        # Arrange
+        task = self.service.add_task("Title 0", "Shared")
+        other = self.service.add_task("Other", "Shared")
+
+        # Act
+        for number in range(1, 100):
+            self.repository.update(task.id, title=f"Title {number}")
+        self.repository.delete(other.id)
+
+        # Assert
+        strings = self.repository._strings
+        self.assertEqual(len(strings), 2)
+        self.assertLessEqual(len(strings._strings), 4)
+        self.assertEqual(strings.refs_with_prefix("Title"), {self.repository._titles[0]})
+        self.assertEqual(self.repository.get_by_id(task.id).description, "Shared")
+
+    def test_update_fields(self):
+        """Test updating title, description and status"""
+        # Arrange
+        task = self.service.add_task("Task", "Details")
+
+        # Act
+        self.repository.update(task.id, completed=True)
+        result = self.repository.update(task.id, title="Renamed", description=None, completed=False)
+
+        # Assert
+        self.assertEqual(result, Task(id=task.id, title="Renamed", version=3))
+        self.assertIsNone(self.repository.update(99, title="Missing"))
+
+    def test_delete_and_compaction(self):
+        """Test tombstones hide deleted rows and compaction reclaims them"""
+        # Arrange
+        self.service.add_tasks([(f"Task {i}", None) for i in range(3000)])
+
+        # Act
+        deleted = self.service.delete_tasks(range(1, 2501))
+
+        # Assert
+        self.assertEqual(deleted, 2500)
+        self.assertEqual(len(self.repository), 500)
+        self.assertLess(len(self.repository._ids), 3000)  # compacted at least once
+        self.assertEqual(self.repository.get_by_id(2501).title, "Task 2500")
+        self.assertFalse(self.repository.delete(1))
+
+    def test_compaction_waits_for_a_live_scan(self):
+        """Test that deleting behind a scan does not renumber the rows it is walking"""
+        # Arrange
+        self.service.add_tasks([(f"Task {i}", None) for i in range(1, 3001)])
+        scan = self.repository.iter_tasks()
+
+        # Act
+        titles = [next(scan).title]
+        for task_id in range(1, 2501):
+            self.repository.delete(task_id)
+        titles.extend(task.title for task in scan)
+        self.repository.delete(2501)
+
+        # Assert
+        self.assertEqual(titles, ["Task 1"] + [f"Task {i}" for i in range(2501, 3001)])
+        self.assertEqual(len(self.repository._ids), 499)  # compacted once the scan ended
+
+    def test_out_of_order_and_replaced_ids(self):
+        """Test explicit IDs keep the ID column sorted"""
+        # Act
+        self.repository.add(Task(id=5, title="Five"))
+        self.repository.add(Task(id=2, title="Two"))
+        self.repository.add(Task(id=5, title="Five again"))
+
+        # Assert
+        self.assertEqual([t.title for t in self.repository.get_all()], ["Two", "Five again"])
+        self.assertEqual(self.repository.generate_id(), 6)
+
+    def test_iter_tasks(self):
+        """Test streaming iteration with a cursor, a status filter and a limit"""
+        # Arrange
+        self.service.add_tasks([(f"Task {i}", None) for i in range(1, 9)])
+        self.service.complete_tasks([2, 4, 6])
+        self.service.delete_task(3)
+
+        # Act & Assert
+        self.assertEqual([t.id for t in self.repository.iter_tasks(after_id=1, limit=3)], [2, 4, 5])
+        self.assertEqual([t.id for t in self.repository.iter_tasks(completed=True, after_id=2)], [4, 6])
+        self.assertEqual([t.id for t in self.repository.iter_tasks(completed=False)], [1, 5, 7, 8])
+
+    def test_conditional_mutations(self):
+        """Test that conditional writes check the version column"""
+        # Arrange
+        task = self.service.add_task("Task")
+
+        # Act
+        updated = self.repository.update_if(task.id, 1, completed=True)
+        stale = self.repository.delete_if(task.id, 1)
+        deleted = self.repository.delete_if(task.id, 2)
+
+        # Assert
+        self.assertEqual(updated.task, Task(id=task.id, title="Task", completed=True, version=2))
+        self.assertEqual(stale.status, MutationStatus.CONFLICT)
+        self.assertEqual(deleted.task, updated.task)
+        self.assertEqual(self.repository.delete_if(task.id).status, MutationStatus.NOT_FOUND)
+
+    def test_stats_survive_tombstones_and_compaction(self):
+        """Test that the counters ignore deleted rows, including revived and compacted ones"""
+        # Arrange
+        for task_id in range(1, 2001):
+            self.repository.add(Task(id=task_id, title="Task", completed=task_id % 2 == 0))
+
+        # Act
+        for task_id in range(1, 1501):
+            self.repository.delete(task_id)
+        self.repository.add(Task(id=1500, title="Revived", completed=True))
+        self.repository.add(Task(id=1502, title="Replaced", completed=False))
+
+        # Assert
+        self.assertEqual(self.repository.task_stats(), TaskStats(total=501, completed=250))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import threading
+import unittest
+from src.concurrency import ConcurrentTaskRepository, ReadWriteLock
+from src.models import Task
+from src.repository import IndexedTaskRepository
+from src.service import TodoService
+
+THREADS = 16
+ITERATIONS = 300
+
+
+def _run_threads(target, count=THREADS):
+    """Start all workers together and re-raise the first worker failure"""
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def worker(index):
+        barrier.wait()
+        try:
+            target(index)
+        except Exception as e:  # pragma: no cover - only reached on failure
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+class TestReadWriteLock(unittest.TestCase):
+    def test_readers_share_the_lock(self):
+        """Test that several readers hold the lock at the same time"""
+        # Arrange
+        lock = ReadWriteLock()
+        inside = threading.Barrier(3, timeout=5)
+
+        def reader(_):
+            with lock.read_locked():
+                inside.wait()  # would time out if readers were serialised
+
+        # Act & Assert
+        _run_threads(reader, count=3)
+
+    def test_writer_excludes_readers(self):
+        """Test that a reader waits for an active writer"""
+        # Arrange
+        lock = ReadWriteLock()
+        events = []
+        writer_holding = threading.Event()
+
+        def reader():
+            writer_holding.wait()
+            with lock.read_locked():
+                events.append("read")
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+
+        # Act
+        with lock.write_locked():
+            writer_holding.set()
+            thread.join(timeout=0.1)
+            events.append("write done")
+        thread.join()
+
+        # Assert
+        self.assertEqual(events, ["write done", "read"])
+
+    def test_writer_can_reenter(self):
+        """Test that the writing thread may take nested read and write locks"""
+        lock = ReadWriteLock()
+        with lock.write_locked():
+            with lock.read_locked():
+                with lock.write_locked():
+                    pass
+        with lock.read_locked():
+            pass
+
+
+class TestConcurrentStress(unittest.TestCase):
+    def setUp(self):
+        self.repository = ConcurrentTaskRepository(IndexedTaskRepository())
+        self.service = TodoService(self.repository)
+
+    def test_no_duplicate_ids(self):
+        """Test that IDs stay unique when many threads add tasks at once"""
+        # Act
+        _run_threads(lambda i: [self.service.add_task(f"T{i}-{n}") for n in range(ITERATIONS)])
+
+        # Assert
+        ids = [task.id for task in self.service.get_all_tasks()]
+        self.assertEqual(len(ids), THREADS * ITERATIONS)
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_no_lost_updates(self):
+        """Test that read-modify-write under write_locked never loses an increment"""
+        # Arrange
+        counter = self.service.add_task("0")
+
+        def increment(_):
+            for _ in range(ITERATIONS):
+                with self.repository.write_locked():
+                    current = int(self.repository.get_by_id(counter.id).title)
+                    self.repository.update(counter.id, title=str(current + 1))
+
+        # Act
+        _run_threads(increment)
+
+        # Assert
+        self.assertEqual(self.service.get_task(counter.id).title, str(THREADS * ITERATIONS))
+
+    def test_each_task_is_deleted_exactly_once(self):
+        """Test that check-then-delete in the service is atomic"""
+        # Arrange
+        self.service.add_tasks([(f"Task {i}", None) for i in range(ITERATIONS)])
+        successes = []
+
+        def delete_all(_):
+            for task_id in range(1, ITERATIONS + 1):
+                try:
+                    if self.service.delete_task(task_id):
+                        successes.append(task_id)
+                except ValueError:
+                    pass
+
+        # Act
+        _run_threads(delete_all)
+
+        # Assert
+        self.assertEqual(sorted(successes), list(range(1, ITERATIONS + 1)))
+        self.assertEqual(self.service.get_all_tasks(), [])
+
+    def test_readers_see_consistent_pages_during_writes(self):
+        """Test that iteration while writers run never fails or yields duplicates"""
+        # Arrange
+        self.service.add_tasks([(f"Task {i}", None) for i in range(2000)])
+
+        def work(index):
+            if index % 2:
+                for n in range(ITERATIONS):
+                    self.service.complete_task(index * ITERATIONS % 2000 + n % 50 + 1)
+            else:
+                ids = [task.id for task in self.service.iter_tasks()]
+                self.assertEqual(ids, sorted(set(ids)))
+
+        # Act & Assert
+        _run_threads(work)
+        self.assertEqual(len(self.service.get_all_tasks()), 2000)
+
+    def test_wrapper_supports_bulk_operations(self):
+        """Test that bulk calls pass through the wrapper"""
+        # Act
+        added = self.service.add_tasks([("A", None), ("B", None)])
+        self.service.complete_tasks([added[0].id])
+        self.service.delete_tasks([added[1].id])
+
+        # Assert
+        self.assertEqual(self.repository.get_many([1, 2]), {1: Task(id=1, title="A", completed=True, version=2)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from src.cli import main
+from src.instrumentation import (
+    InstrumentedTaskRepository, PerfRecorder, REPOSITORY, SERVICE, add_hook, remove_hook,
+)
+from src.markers import instrumented, instrumented_class, instrumented_classes
+from src.repository import IndexedTaskRepository
+from src.service import TodoService
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.service = TodoService(InstrumentedTaskRepository(IndexedTaskRepository()))
+        self.recorder = PerfRecorder()
+
+    def tearDown(self):
+        remove_hook(self.recorder)
+
+    def test_methods_are_untouched_without_hooks(self):
+        """Test that service methods carry no wrapper while nothing is listening"""
+        # Act
+        add_hook(self.recorder)
+        wrapped = TodoService.__dict__['get_task']
+        remove_hook(self.recorder)
+
+        # Assert
+        self.assertIsNot(wrapped, TodoService.__plain_methods__['get_task'])
+        self.assertIs(TodoService.__dict__['get_task'], TodoService.__plain_methods__['get_task'])
+
+    def test_classes_marked_while_hooks_exist_are_timed(self):
+        """Test that a class defined after a hook was added, as the CLI's lazy imports do, is timed"""
+        # Arrange
+        add_hook(self.recorder)
+
+        # Act
+        @instrumented_class
+        class Late:
+            @instrumented
+            def ping(self):
+                return 'pong'
+
+        self.addCleanup(instrumented_classes.remove, Late)
+        Late().ping()
+
+        # Assert
+        self.assertEqual(self.recorder.operations()[(SERVICE, 'ping')].count, 1)
+
+    def test_service_calls_record_repository_round_trips(self):
+        """Test that each service call is attributed the repository calls behind it"""
+        # Arrange
+        add_hook(self.recorder)
+
+        # Act
+        task = self.service.add_task("Task")
+        self.service.update_task(task.id, title="Renamed")
+        with self.assertRaises(ValueError):
+            self.service.complete_task(99)
+
+        # Assert
+        operations = self.recorder.operations()
+        self.assertEqual(operations[(SERVICE, 'add_task')].repository_calls, {'generate_id': 1, 'add': 1})
+        self.assertEqual(operations[(SERVICE, 'update_task')].repository_calls, {'update_if': 1})
+        self.assertEqual(operations[(SERVICE, 'complete_task')].errors, 1)
+        self.assertEqual(operations[(REPOSITORY, 'complete_if')].count, 1)
+        slowest = self.recorder.dump()['slowest']
+        self.assertEqual(sorted(entry['operation'] for entry in slowest),
+                         ['add_task', 'complete_task', 'update_task'])
+
+    def test_dumps_accumulate_across_runs(self):
+        """Test that saving merges with the figures already in the file"""
+        # Arrange
+        add_hook(self.recorder)
+        self.service.add_task("Task")
+        remove_hook(self.recorder)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "perf.json")
+
+            # Act
+            self.recorder.save(path)
+            self.recorder.save(path)
+            loaded = PerfRecorder.load(path)
+
+        # Assert
+        stats = loaded.operations()[(SERVICE, 'add_task')]
+        self.assertEqual(stats.count, 2)
+        self.assertEqual(stats.repository_calls, {'generate_id': 2, 'add': 2})
+        self.assertEqual(sum(stats.histogram.values()), 2)
+
+    def test_cli_records_and_reports_perf(self):
+        """Test todo --perf-file followed by stats --perf"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "perf.json")
+            db = os.path.join(directory, "todo.db")
+            out = io.StringIO()
+
+            # Act
+            with redirect_stdout(out):
+                main(["--backend", "sqlite", "--db", db, "--perf-file", path, "add", "Task"])
+                main(["--backend", "sqlite", "--db", db, "--perf-file", path, "update", "1", "--title", "Renamed"])
+            table = io.StringIO()
+            with redirect_stdout(table):
+                main(["stats", "--perf", "--perf-file", path])
+            raw = io.StringIO()
+            with redirect_stdout(raw):
+                main(["stats", "--perf", "--json", "--perf-file", path])
+
+        # Assert
+        self.assertIn("add_task", table.getvalue())
+        self.assertIn("update_task", table.getvalue())
+        self.assertIn("Slowest service calls:", table.getvalue())
+        operations = {item['operation'] for item in json.loads(raw.getvalue())['operations']}
+        self.assertTrue({'add_task', 'generate_id', 'add'} <= operations)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from src.models import MutationStatus, Task
+from src.service import TodoService
+from src.log_repository import LogTaskRepository
+
+
+def _snapshot_of(repository):
+    return [(t.id, t.title, t.description, t.completed) for t in repository.get_all()]
+
+
+class TestLogTaskRepository(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self._tmpdir.name, "store")
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _open(self, **options):
+        return LogTaskRepository(self.directory, **options)
+
+    def test_state_survives_reopen(self):
+        """Test that adds, updates and deletes are replayed on startup"""
+        # Arrange
+        repository = self._open()
+        service = TodoService(repository)
+        first = service.add_task("First", "Description")
+        second = service.add_task("Second")
+        service.complete_task(first.id)
+        service.delete_task(second.id)
+        repository.close()
+
+        # Act
+        reopened = self._open()
+
+        # Assert
+        self.assertEqual(reopened.get_all(), [Task(id=1, title="First", description="Description", completed=True, version=2)])
+        self.assertEqual(reopened.generate_id(), 3)
+        reopened.close()
+
+    def test_compaction_bounds_the_log(self):
+        """Test that snapshots replace old history and recovery still works"""
+        # Arrange
+        repository = self._open(snapshot_every=10)
+        service = TodoService(repository)
+        for i in range(25):
+            task = service.add_task(f"Task {i}")
+            if i % 2:
+                service.delete_task(task.id)
+        expected = _snapshot_of(repository)
+        repository.close()
+
+        # Act
+        reopened = self._open(snapshot_every=10)
+
+        # Assert
+        files = sorted(os.listdir(self.directory))
+        self.assertEqual(len(files), 2)  # one snapshot, one log
+        self.assertLess(reopened._log_records, 10)
+        self.assertEqual(_snapshot_of(reopened), expected)
+        reopened.close()
+
+    def test_update_ignores_unknown_fields(self):
+        """Test that only task fields are written to the log"""
+        # Arrange
+        repository = self._open()
+        repository.add(Task(id=1, title="Task"))
+        repository.update(1, title="Renamed", priority="high")
+        repository.close()
+
+        # Act
+        reopened = self._open()
+
+        # Assert
+        self.assertEqual(reopened.get_by_id(1), Task(id=1, title="Renamed", version=2))
+        reopened.close()
+
+    def test_batch_is_recovered_all_or_nothing(self):
+        """Test that a torn batch record is dropped as a whole"""
+        # Arrange
+        repository = self._open()
+        service = TodoService(repository)
+        service.add_task("Before")
+        repository.flush()
+        log_path = repository._log_path(repository._generation)
+        size_before = os.path.getsize(log_path)
+        service.add_tasks([(f"Batch {i}", None) for i in range(5)])
+        repository.close()
+
+        # Act: cut the log in the middle of the batch record
+        with open(log_path, 'r+b') as log:
+            log.truncate((size_before + os.path.getsize(log_path)) // 2)
+        reopened = self._open()
+
+        # Assert
+        self.assertEqual([task.title for task in reopened.get_all()], ["Before"])
+        reopened.close()
+
+    def test_recovers_from_log_cut_at_random_offsets(self):
+        """Test crash recovery when the log is truncated at arbitrary byte offsets"""
+        # Arrange: record the log size and state after every durable operation
+        repository = self._open(sync_every=1, snapshot_every=1_000)
+        service = TodoService(repository)
+        log_path = repository._log_path(repository._generation)
+        checkpoints = [(0, [])]
+        rng = random.Random(1234)
+        for i in range(60):
+            tasks = service.get_all_tasks()
+            action = rng.random()
+            if tasks and action < 0.25:
+                service.complete_task(rng.choice(tasks).id)
+            elif tasks and action < 0.4:
+                service.delete_task(rng.choice(tasks).id)
+            elif tasks and action < 0.55:
+                service.update_task(rng.choice(tasks).id, title=f"Renamed ✏️ {i}")
+            else:
+                service.add_task(f"Task {i}", "x" * rng.randint(0, 40))
+            checkpoints.append((os.path.getsize(log_path), _snapshot_of(repository)))
+        repository.close()
+        full_log = open(log_path, 'rb').read()
+
+        for cut in sorted(rng.sample(range(len(full_log) + 1), 40)):
+            with self.subTest(cut=cut):
+                # Act: simulate a crash that kept only the first `cut` bytes
+                crashed = os.path.join(self._tmpdir.name, f"crash-{cut}")
+                shutil.copytree(self.directory, crashed)
+                with open(os.path.join(crashed, os.path.basename(log_path)), 'wb') as log:
+                    log.write(full_log[:cut])
+                recovered = LogTaskRepository(crashed)
+
+                # Assert: state equals the last operation fully contained in the cut
+                expected = [state for size, state in checkpoints if size <= cut][-1]
+                self.assertEqual(_snapshot_of(recovered), expected)
+
+                # The torn tail is dropped and the log accepts new writes
+                recovered.add(Task(id=recovered.generate_id(), title="After crash"))
+                recovered.close()
+                reopened = LogTaskRepository(crashed)
+                self.assertEqual(_snapshot_of(reopened)[:-1], expected)
+                reopened.close()
+
+    def test_conditional_mutations_are_replayed(self):
+        """Test that only successful conditional writes reach the log"""
+        # Arrange
+        repository = self._open()
+        repository.add(Task(id=1, title="Task"))
+        repository.update_if(1, 1, title="Renamed")
+        repository.update_if(1, 1, title="Stale")
+        repository.add(Task(id=2, title="Doomed"))
+        repository.delete_if(2, 1)
+        repository.close()
+
+        # Act
+        reopened = self._open()
+
+        # Assert
+        self.assertEqual(reopened.get_all(), [Task(id=1, title="Renamed", version=2)])
+        self.assertEqual(reopened.update_if(1, 1, completed=True).status, MutationStatus.CONFLICT)
+        reopened.close()
+
+    def test_idle_records_are_synced_after_the_interval(self):
+        """Test that a short burst reaches the OS at once and is fsynced without further writes"""
+        # Arrange
+        repository = self._open(sync_every=64, sync_interval=0.05)
+        self.addCleanup(repository.close)
+        log_path = os.path.join(self.directory, os.listdir(self.directory)[0])
+
+        # Act
+        with patch("src.log_repository.os.fsync", wraps=os.fsync) as fsync:
+            repository.add(Task(id=1, title="Quiet"))
+            written = os.path.getsize(log_path)
+            synced_at_once = fsync.call_count
+            deadline = time.monotonic() + 5
+            while not fsync.call_count and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        # Assert
+        self.assertGreater(written, 0)
+        self.assertEqual(synced_at_once, 0)
+        self.assertGreaterEqual(fsync.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import random
+import unittest
+from src.models import Task
+from src.mvcc_repository import MvccTaskRepository
+from src.service import TodoService
+
+
+class TestMvccTaskRepository(unittest.TestCase):
+    def setUp(self):
+        self.repository = MvccTaskRepository()
+        self.service = TodoService(self.repository)
+
+    def test_snapshot_is_unaffected_by_later_writes(self):
+        """Test that a snapshot keeps the tasks, fields and counts it was taken with"""
+        # Arrange
+        self.service.add_tasks([("A", None), ("B", None), ("C", None)])
+        snapshot = self.repository.snapshot()
+
+        # Act
+        self.service.update_task(1, title="Renamed")
+        self.service.complete_task(2)
+        self.service.delete_task(3)
+        self.service.add_task("D")
+
+        # Assert
+        self.assertEqual([task.title for task in snapshot], ["A", "B", "C"])
+        self.assertFalse(snapshot.get_by_id(2).completed)
+        self.assertIsNone(snapshot.get_by_id(4))
+        self.assertEqual((len(snapshot), snapshot.task_stats().completed), (3, 0))
+        self.assertEqual([task.title for task in self.repository.get_all()], ["Renamed", "B", "D"])
+        self.assertEqual(self.repository.task_stats().completed, 1)
+
+    def test_iteration_in_progress_sees_one_version(self):
+        """Test that an iterator started before writes does not see them"""
+        # Arrange
+        self.service.add_tasks([(f"Task {i}", None) for i in range(1, 101)])
+        tasks = self.repository.iter_tasks()
+        first = next(tasks)
+
+        # Act
+        self.service.delete_tasks(range(50, 101))
+        self.service.update_task(2, title="Changed")
+        rest = list(tasks)
+
+        # Assert
+        self.assertEqual(first.id, 1)
+        self.assertEqual(len(rest), 99)
+        self.assertEqual(rest[0].title, "Task 2")
+
+    def test_writes_share_untouched_nodes(self):
+        """Test that an update copies only the path to the changed task"""
+        # Arrange
+        self.service.add_tasks([(f"Task {i}", None) for i in range(1, 2000)])
+        before = self.repository.snapshot()
+
+        # Act
+        self.service.update_task(1999, title="Changed")
+        after = self.repository.snapshot()
+
+        # Assert
+        old_root, new_root = before._version.root, after._version.root
+        self.assertIsNot(old_root, new_root)
+        self.assertIs(old_root[1][0], new_root[1][0])
+        self.assertIs(before.get_by_id(1), after.get_by_id(1))
+
+    def test_returned_tasks_are_copies_of_what_was_passed(self):
+        """Test that modifying an added or updated task object does not reach the store"""
+        # Arrange
+        task = Task(id=1, title="Original")
+
+        # Act
+        stored = self.repository.add(task)
+        task.title = "Mutated by caller"
+        updated = self.repository.update(1, title="Updated")
+
+        # Assert
+        self.assertIsNot(stored, task)
+        self.assertEqual(stored.title, "Original")
+        self.assertEqual(updated.version, 2)
+        self.assertEqual(stored.version, 1)
+
+    def test_matches_dict_under_random_writes(self):
+        """Test lookups, cursors and counts against a dict after random sparse writes"""
+        # Arrange
+        rng = random.Random(7)
+        expected = {}
+
+        # Act
+        for _ in range(3000):
+            task_id = rng.choice((rng.randint(0, 100), rng.randint(0, 1 << 40)))
+            if rng.random() < 0.3 and expected:
+                task_id = rng.choice(list(expected))
+                self.assertTrue(self.repository.delete(task_id))
+                del expected[task_id]
+            else:
+                expected[task_id] = self.repository.add(Task(id=task_id, title=str(task_id),
+                                                             completed=rng.random() < 0.5))
+        cursor = sorted(expected)[len(expected) // 2]
+
+        # Assert
+        self.assertEqual(self.repository.get_all(), [expected[task_id] for task_id in sorted(expected)])
+        self.assertEqual([task.id for task in self.repository.iter_tasks(after_id=cursor, limit=10)],
+                         [task_id for task_id in sorted(expected) if task_id > cursor][:10])
+        self.assertIsNone(self.repository.get_by_id(1 << 50))
+        stats = self.repository.task_stats()
+        self.assertEqual((stats.total, stats.completed),
+                         (len(expected), sum(task.completed for task in expected.values())))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.caching_repository import CachingTaskRepository
+from src.columnar_repository import ColumnarTaskRepository
+from src.log_repository import LogTaskRepository
+from src.models import Task, TaskQuery
+from src.mvcc_repository import MvccTaskRepository
+from src.repository import InMemoryTaskRepository, IndexedTaskRepository
+from src.service import TodoService
+from src.sharded_repository import ShardedTaskRepository
+from src.snapshot_repository import SnapshotTaskRepository
+from src.sqlite_repository import SqliteTaskRepository
+from src.write_behind_repository import WriteBehindTaskRepository
+
+TITLES = ("Buy milk", "Buy bread", "Call mum", "buy stamps", "Bake", "Büro", "Buy", "Clean")
+
+QUERIES = (
+    TaskQuery(),
+    TaskQuery(completed=True),
+    TaskQuery(completed=False, min_id=5, limit=4),
+    TaskQuery(min_id=3, max_id=17),
+    TaskQuery(min_id=20, max_id=10),
+    TaskQuery(title_prefix="Buy"),
+    TaskQuery(title_prefix="B", order_by='title'),
+    TaskQuery(title_prefix="Bu", completed=False, order_by='title', descending=True, limit=3),
+    TaskQuery(order_by='id', descending=True, limit=5),
+    TaskQuery(max_id=12, order_by='title', limit=0),
+)
+
+
+class TestTaskQuery(unittest.TestCase):
+    """Every backend must return the same results as filtering and sorting the tasks in Python"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.factories = {
+            'memory': InMemoryTaskRepository,
+            'indexed': IndexedTaskRepository,
+            'columnar': ColumnarTaskRepository,
+            'mvcc': MvccTaskRepository,
+            'sqlite': lambda: SqliteTaskRepository(os.path.join(directory.name, "todo.db")),
+            'log': lambda: LogTaskRepository(os.path.join(directory.name, "log")),
+            'snapshot': lambda: SnapshotTaskRepository(os.path.join(directory.name, "todo.snap")),
+            'sharded': lambda: ShardedTaskRepository(shards=3),
+            'caching': lambda: CachingTaskRepository(IndexedTaskRepository()),
+            'write-behind': lambda: WriteBehindTaskRepository(ColumnarTaskRepository(), 'deferred', max_delay=60),
+        }
+        self.tasks = [Task(id=task_id, title=f"{TITLES[task_id % len(TITLES)]} {task_id // len(TITLES)}",
+                           completed=task_id % 3 == 0)
+                      for task_id in range(1, 25)]
+
+    @staticmethod
+    def _expected(tasks, query):
+        matching = [task for task in tasks if query.matches(task)]
+        matching.sort(key=query.sort_key(), reverse=query.descending)
+        return matching if query.limit is None else matching[:query.limit]
+
+    def test_backends_agree_with_reference(self):
+        """Test each query on every backend, with a deleted task and an updated title in the store"""
+        for name, factory in self.factories.items():
+            with self.subTest(repository=name):
+                # Arrange
+                repository = factory()
+                self.addCleanup(repository.close)
+                repository.add_many([Task(task.id, task.title, completed=task.completed) for task in self.tasks])
+                repository.delete(7)
+                repository.update(8, title="Buy eggs")
+                stored = sorted(repository.get_all(), key=lambda task: task.id)
+
+                for query in QUERIES:
+                    # Act
+                    result = list(repository.query(query))
+
+                    # Assert
+                    self.assertEqual([task.id for task in result],
+                                     [task.id for task in self._expected(stored, query)], query)
+
+    def test_indexed_query_uses_status_index_for_selective_status(self):
+        """Test that a selective status query only visits tasks with that status"""
+        # Arrange
+        repository = IndexedTaskRepository()
+        repository.add_many([Task(id=task_id, title=f"Task {task_id}") for task_id in range(1, 101)])
+        repository.update(40, completed=True)
+        repository.update(10, completed=True)
+        visited = []
+        original_matches = TaskQuery.matches
+
+        # Act
+        query = TaskQuery(completed=True)
+        with patch.object(TaskQuery, 'matches',
+                          lambda self, task: visited.append(task.id) or original_matches(self, task)):
+            result = list(repository.query(query))
+
+        # Assert
+        self.assertEqual([task.id for task in result], [10, 40])
+        self.assertEqual(visited, [10, 40])
+
+    def test_service_query_validates(self):
+        """Test that TodoService.query_tasks rejects unknown sort fields and negative limits"""
+        # Arrange
+        service = TodoService(IndexedTaskRepository())
+        service.add_tasks([("Write report", None), ("Water plants", None), ("Read", None)])
+
+        # Act
+        titles = [task.title for task in service.query_tasks(title_prefix="W", order_by='title', descending=True)]
+
+        # Assert
+        self.assertEqual(titles, ["Write report", "Water plants"])
+        with self.assertRaises(ValueError):
+            service.query_tasks(order_by='description')
+        with self.assertRaises(ValueError):
+            service.query_tasks(limit=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
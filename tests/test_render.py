@@ -0,0 +1,50 @@
+import io
+import unittest
+from unittest.mock import patch
+from src.models import Task
+from src.render import TaskRenderer, format_task, pager_command
+
+
+class _CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+class TestTaskRenderer(unittest.TestCase):
+    def test_format_styles(self):
+        """Test the interactive and plain line formats"""
+        task = Task(id=7, title="Task", description="Details", completed=True)
+
+        self.assertEqual(format_task(task, indent="  ", show_description=True),
+                         "  7. ✅ Task\n     📝 Description: Details\n")
+        self.assertEqual(format_task(task, show_description=True, plain=True), "7. [x] Task\n   Details\n")
+        self.assertEqual(format_task(Task(id=8, title="Open")), "8. ⏳ Open\n")
+
+    def test_writes_one_chunk_at_a_time(self):
+        """Test that a long list is written in a few large writes"""
+        # Arrange
+        stream = _CountingStream()
+        renderer = TaskRenderer(stream, chunk_size=1000)
+        tasks = (Task(id=task_id, title=f"Task {task_id}") for task_id in range(1, 2501))
+
+        # Act
+        written = renderer.write(tasks, plain=True)
+
+        # Assert
+        self.assertEqual(written, 2500)
+        self.assertEqual(stream.writes, 3)
+        self.assertEqual(stream.getvalue().count("\n"), 2500)
+
+    def test_no_pager_when_output_is_not_a_terminal(self):
+        """Test that redirected output never goes through a pager"""
+        with patch("sys.stdout", io.StringIO()):
+            self.assertIsNone(pager_command())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,235 @@
+import unittest
+from src.models import MutationResult, MutationStatus, Task, TaskStats
+from src.service import TodoService
+from src.repository import InMemoryTaskRepository, IndexedTaskRepository
+
+
+class TestIndexedTaskRepository(unittest.TestCase):
+    def setUp(self):
+        self.repository = IndexedTaskRepository()
+
+    def _add(self, title, completed=False):
+        task_id = self.repository.generate_id()
+        return self.repository.add(Task(id=task_id, title=title, completed=completed))
+
+    def test_get_all_keeps_insertion_order(self):
+        """Test that get_all returns tasks in the order they were added"""
+        # Arrange
+        first = self._add("First")
+        second = self._add("Second")
+        third = self._add("Third")
+
+        # Act
+        result = self.repository.get_all()
+
+        # Assert
+        self.assertEqual(result, [first, second, third])
+
+    def test_get_all_returns_a_copy(self):
+        """Test that mutating the returned list does not affect the repository"""
+        # Arrange
+        self._add("Task")
+
+        # Act
+        self.repository.get_all().clear()
+
+        # Assert
+        self.assertEqual(len(self.repository.get_all()), 1)
+
+    def test_get_by_id(self):
+        """Test finding existing and missing tasks by ID"""
+        # Arrange
+        task = self._add("Task")
+
+        # Act & Assert
+        self.assertIs(self.repository.get_by_id(task.id), task)
+        self.assertIsNone(self.repository.get_by_id(999))
+
+    def test_update_moves_task_between_status_index(self):
+        """Test that completing a task updates the secondary status index"""
+        # Arrange
+        task = self._add("Task")
+        other = self._add("Other")
+
+        # Act
+        self.repository.update(task.id, completed=True)
+
+        # Assert
+        self.assertEqual(self.repository.get_by_status(True), [task])
+        self.assertEqual(self.repository.get_by_status(False), [other])
+
+    def test_update_ignores_id_and_unknown_fields(self):
+        """Test that update does not re-key tasks or add unknown attributes"""
+        # Arrange
+        task = self._add("Task")
+
+        # Act
+        result = self.repository.update(task.id, id=42, priority="high", title="New")
+
+        # Assert
+        self.assertEqual(result.id, task.id)
+        self.assertEqual(result.title, "New")
+        self.assertFalse(hasattr(result, "priority"))
+        self.assertIsNone(self.repository.update(999, title="Missing"))
+
+    def test_delete(self):
+        """Test deleting tasks removes them from both indexes"""
+        # Arrange
+        task = self._add("Task", completed=True)
+
+        # Act & Assert
+        self.assertTrue(self.repository.delete(task.id))
+        self.assertFalse(self.repository.delete(task.id))
+        self.assertEqual(self.repository.get_all(), [])
+        self.assertEqual(self.repository.get_by_status(True), [])
+
+    def test_generate_id_is_sequential(self):
+        """Test that generated IDs are unique and sequential"""
+        # Act
+        ids = [self.repository.generate_id() for _ in range(3)]
+
+        # Assert
+        self.assertEqual(ids, [1, 2, 3])
+
+    def test_iter_tasks_with_cursor_status_and_limit(self):
+        """Test streaming iteration with a cursor, a status filter and a limit"""
+        # Arrange
+        tasks = [self._add(f"Task {i}", completed=i % 2 == 0) for i in range(1, 11)]
+        self.repository.delete(5)
+
+        # Act & Assert
+        self.assertEqual(list(self.repository.iter_tasks()), [t for t in tasks if t.id != 5])
+        self.assertEqual([t.id for t in self.repository.iter_tasks(after_id=3, limit=3)], [4, 6, 7])
+        self.assertEqual([t.id for t in self.repository.iter_tasks(completed=True, after_id=4)], [6, 8, 10])
+        self.assertEqual(list(self.repository.iter_tasks(after_id=10)), [])
+
+    def test_iter_tasks_orders_explicit_ids(self):
+        """Test that tasks added with out-of-order IDs are still iterated in ID order"""
+        # Arrange
+        self.repository.add(Task(id=5, title="Five"))
+        self.repository.add(Task(id=2, title="Two"))
+
+        # Act & Assert
+        self.assertEqual([t.id for t in self.repository.iter_tasks()], [2, 5])
+        self.assertEqual([t.id for t in self.repository.iter_tasks(after_id=2)], [5])
+        self.assertEqual(self.repository.generate_id(), 6)
+
+    def test_iter_tasks_resumes_across_an_id_gap_without_probing_it(self):
+        """Test that resuming before a large ID gap does not probe every ID in the gap"""
+        # Arrange
+        probes = []
+
+        class CountingDict(dict):
+            def get(self, key, default=None):
+                probes.append(key)
+                return super().get(key, default)
+
+        self.repository.add(Task(id=1, title="One"))
+        self.repository.add(Task(id=10 ** 6, title="Far"))
+        self.repository._tasks = CountingDict(self.repository._tasks)
+
+        # Act
+        page = [t.id for t in self.repository.iter_tasks(after_id=1, limit=1)]
+
+        # Assert
+        self.assertEqual(page, [10 ** 6])
+        self.assertLess(len(probes), 10)
+
+    def test_drop_in_for_todo_service(self):
+        """Test the repository behind a real TodoService"""
+        # Arrange
+        service = TodoService(self.repository)
+
+        # Act
+        first = service.add_task("First", "Description")
+        second = service.add_task("Second")
+        service.update_task(first.id, title="Renamed")
+        service.complete_task(second.id)
+        service.delete_task(first.id)
+
+        # Assert
+        self.assertEqual(service.get_all_tasks(), [Task(id=2, title="Second", completed=True, version=2)])
+        with self.assertRaises(ValueError):
+            service.complete_task(first.id)
+
+
+class TestBulkOperations(unittest.TestCase):
+    """Bulk methods must behave the same on every in-memory repository"""
+
+    repository_classes = (InMemoryTaskRepository, IndexedTaskRepository)
+
+    def test_bulk_round_trip(self):
+        """Test add_many, get_many, update_many and delete_many together"""
+        for repository_cls in self.repository_classes:
+            with self.subTest(repository=repository_cls.__name__):
+                # Arrange
+                repository = repository_cls()
+                ids = repository.generate_ids(3)
+                tasks = [Task(id=task_id, title=f"Task {task_id}") for task_id in ids]
+
+                # Act
+                repository.add_many(tasks)
+                updated = repository.update_many({1: {'completed': True}, 3: {'title': "Three"}, 9: {'title': "Missing"}})
+                deleted = repository.delete_many([2, 9])
+
+                # Assert
+                self.assertEqual(ids, [1, 2, 3])
+                self.assertEqual(repository.generate_id(), 4)
+                self.assertEqual([task.id for task in updated], [1, 3])
+                self.assertEqual(deleted, 1)
+                self.assertEqual(repository.get_many([3, 1, 2]), {
+                    3: Task(id=3, title="Three", version=2), 1: Task(id=1, title="Task 1", completed=True, version=2)
+                })
+
+    def test_conditional_mutations(self):
+        """Test update_if, complete_if and delete_if outcomes"""
+        for repository_cls in self.repository_classes:
+            with self.subTest(repository=repository_cls.__name__):
+                # Arrange
+                repository = repository_cls()
+                repository.add(Task(id=1, title="Task"))
+
+                # Act
+                updated = repository.update_if(1, 1, title="Renamed")
+                updated_version = updated.task.version
+                stale = repository.complete_if(1, 1)
+                stale_version = stale.task.version
+                completed = repository.complete_if(1)
+                missing = repository.update_if(9, title="Missing")
+                stale_delete = repository.delete_if(1, 2)
+                deleted = repository.delete_if(1, 3)
+
+                # Assert
+                self.assertTrue(updated.ok)
+                self.assertEqual(updated_version, 2)
+                self.assertEqual(stale.status, MutationStatus.CONFLICT)
+                self.assertEqual(stale_version, 2)
+                self.assertTrue(completed.ok)
+                self.assertEqual(missing, MutationResult(MutationStatus.NOT_FOUND))
+                self.assertEqual(stale_delete.status, MutationStatus.CONFLICT)
+                self.assertEqual(deleted.task, Task(id=1, title="Renamed", completed=True, version=3))
+                self.assertIsNone(repository.get_by_id(1))
+
+    def test_stats_follow_mutations(self):
+        """Test that task_stats stays in step with adds, updates and deletes"""
+        for repository_cls in self.repository_classes:
+            with self.subTest(repository=repository_cls.__name__):
+                # Arrange
+                repository = repository_cls()
+                repository.add_many([Task(id=task_id, title=f"Task {task_id}") for task_id in (1, 2, 3)])
+
+                # Act
+                repository.update(1, completed=True)
+                repository.update_many({2: {'completed': True}, 3: {'title': "Three"}})
+                repository.update(2, completed=False)
+                repository.complete_if(1)
+                repository.delete(1)
+                repository.delete_if(3)
+                repository.add(Task(id=4, title="Done", completed=True))
+
+                # Assert
+                self.assertEqual(repository.task_stats(), TaskStats(total=2, completed=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
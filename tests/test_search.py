@@ -0,0 +1,200 @@
+import random
+import threading
+import unittest
+from unittest.mock import patch
+from src.models import Task
+from src.repository import IndexedTaskRepository
+from src.search import SearchIndex, tokenize
+from src.service import TodoService
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.add_many([
+            Task(id=1, title="Buy milk", description="Semi-skimmed milk from the corner shop"),
+            Task(id=2, title="Buy bread"),
+            Task(id=3, title="Call the bank", description="Ask about the milk subscription"),
+            Task(id=4, title="Bake bread", description="Needs flour"),
+        ])
+
+    def _ids(self, query, limit=None):
+        return [task_id for task_id, _ in self.index.search(query, limit)]
+
+    def test_tokenize(self):
+        """Test that tokens are lowercase words"""
+        self.assertEqual(tokenize("Buy MILK, now!"), ["buy", "milk", "now"])
+        self.assertEqual(tokenize(None), [])
+
+    def test_single_term_ranks_title_matches_first(self):
+        """Test that a title match outranks a description match"""
+        self.assertEqual(self._ids("milk"), [1, 3])
+
+    def test_multi_term_and(self):
+        """Test that every term must match"""
+        self.assertEqual(self._ids("buy bread"), [2])
+        self.assertEqual(self._ids("buy flour"), [])
+
+    def test_prefix_terms(self):
+        """Test that a trailing * expands to every term with that prefix"""
+        self.assertEqual(sorted(self._ids("b*")), [1, 2, 3, 4])
+        self.assertEqual(sorted(self._ids("ba* bread")), [4])
+        self.assertEqual(self._ids("zz*"), [])
+
+    def test_standalone_star_is_ignored(self):
+        """Test that a '*' on its own does not turn the term before it into a prefix"""
+        self.assertEqual(self._ids("bu *"), [])
+        self.assertEqual(self._ids("bread * *"), self._ids("bread"))
+        self.assertEqual(self._ids("*"), [])
+
+    def test_limit(self):
+        """Test that only the best results are returned"""
+        self.assertEqual(len(self._ids("b*", limit=2)), 2)
+
+    def test_incremental_update_and_remove(self):
+        """Test that re-indexing and removal keep postings and vocabulary in sync"""
+        # Act
+        self.index.add(Task(id=2, title="Buy cheese"))
+        self.index.remove(4)
+
+        # Assert
+        self.assertEqual(self._ids("bread"), [])
+        self.assertEqual(self._ids("cheese"), [2])
+        self.assertNotIn("bread", self.index._vocabulary)
+        self.assertNotIn("flour", self.index._postings)
+
+    def test_vocabulary_merges_and_drops_terms_in_batches(self):
+        """Test that prefix lookups stay exact across vocabulary merges, removals and re-adds"""
+        # Arrange
+        index = SearchIndex()
+        with patch("src.search._MERGE_TERMS", 4):
+            # Act
+            index.add_many(Task(id=i, title=f"word{i:02}") for i in range(1, 21))
+            for task_id in range(1, 16):
+                index.remove(task_id)
+            index.add(Task(id=3, title="word03"))
+            index.add(Task(id=30, title="word30"))
+
+            # Assert
+            self.assertEqual(sorted(task_id for task_id, _ in index.search("word*")), [3, 16, 17, 18, 19, 20, 30])
+            self.assertEqual(sorted(index._expand("word1")), ["word16", "word17", "word18", "word19"])
+            self.assertLess(len(index._vocabulary) + len(index._recent_terms), 20)
+
+    def test_prefix_only_query_with_limit_finds_the_best_match(self):
+        """Test that a limited prefix query ranks a rare strong match above many weak ones"""
+        # Arrange
+        index = SearchIndex()
+        index.add_many([Task(id=i, title="de ze") for i in range(1, 20_011)])
+        index.add(Task(id=20_011, title="delta zebra"))
+
+        # Act
+        result = index.search("d* z*", limit=5)
+
+        # Assert
+        self.assertEqual(result[0][0], 20_011)
+        self.assertEqual([task_id for task_id, _ in result[1:]], [1, 2, 3, 4])
+
+    def test_prefix_only_query_with_limit_matches_the_full_ranking(self):
+        """Test that a limited prefix query returns the head of the unlimited ranking"""
+        # Arrange
+        rng = random.Random(7)
+        words = [f"{stem}{suffix}" for stem in ("plan", "play", "pen", "post") for suffix in ("", "s", "ned", "ning")]
+        index = SearchIndex()
+        index.add_many([Task(id=i, title=" ".join(rng.choices(words, k=3)),
+                             description=" ".join(rng.choices(words, k=rng.randrange(4))))
+                        for i in range(1, 400)])
+
+        for query in ("pla*", "p*", "plan* pos*", "pen* play*", "zz*"):
+            with self.subTest(query=query):
+                # Act
+                limited = index.search(query, limit=10)
+                full = index.search(query)
+
+                # Assert
+                self.assertEqual(limited, full[:10])
+
+
+class TestServiceSearch(unittest.TestCase):
+    def setUp(self):
+        self.service = TodoService(IndexedTaskRepository())
+        self.service.add_tasks([("Write report", "Quarterly numbers"), ("Review report", None)])
+
+    def test_search_returns_tasks(self):
+        """Test that search returns full tasks in ranked order"""
+        # Act
+        result = self.service.search("report quarterly")
+
+        # Assert
+        self.assertEqual(result, [Task(id=1, title="Write report", description="Quarterly numbers")])
+
+    def test_index_follows_service_mutations(self):
+        """Test that adds, updates and deletes after the first search are reflected"""
+        # Arrange
+        self.service.search("report")
+
+        # Act
+        added = self.service.add_task("Report bug")
+        self.service.update_task(1, title="Write summary")
+        self.service.delete_task(2)
+
+        # Assert
+        self.assertEqual(self.service.search("report"), [added])
+        self.assertEqual([t.id for t in self.service.search("summ*")], [1])
+
+    def test_index_build_does_not_block_writers(self):
+        """Test that writes made while the first search builds the index neither wait nor go missing"""
+        # Arrange
+        writes = []
+        add_many = SearchIndex.add_many
+
+        def write():
+            writes.append(self.service.add_task("Report added during build"))
+            writes.append(self.service.delete_task(2))
+
+        def index_page(index, tasks):
+            # Write from another thread between indexing the first page and reading the next
+            if not writes:
+                writer = threading.Thread(target=write)
+                writer.start()
+                writer.join(5)
+                self.assertFalse(writer.is_alive())
+            add_many(index, tasks)
+
+        # Act
+        with patch("src.service._INDEX_PAGE_SIZE", 1), \
+                patch.object(SearchIndex, "add_many", autospec=True, side_effect=index_page):
+            result = self.service.search("report")
+
+        # Assert
+        self.assertEqual(len(writes), 2)
+        self.assertEqual(sorted(task.id for task in result), [1, 3])
+
+    def test_index_follows_the_last_of_racing_writes(self):
+        """Test that an update finishing after a delete of the same task does not put it back in the index"""
+        # Arrange
+        self.service.search("report")
+        update_if = self.service._repository.update_if
+
+        def racing_update_if(task_id, expected_version=None, **updates):
+            result = update_if(task_id, expected_version, **updates)
+            # Another writer deletes the task before this update reaches the index
+            self.service.delete_task(task_id)
+            return result
+
+        # Act
+        with patch.object(self.service._repository, "update_if", side_effect=racing_update_if):
+            self.service.update_task(1, title="Write summary")
+
+        # Assert
+        self.assertEqual(len(self.service._search_index), 1)
+        self.assertEqual([task.id for task in self.service.search("report")], [2])
+
+    def test_empty_query_error(self):
+        """Test that an empty query is rejected"""
+        with self.assertRaises(ValueError) as context:
+            self.service.search("   ")
+        self.assertEqual(str(context.exception), "Search query cannot be empty")
+
+
+if __name__ == "__main__":
+    unittest.main()
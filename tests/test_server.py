@@ -0,0 +1,124 @@
+import asyncio
+import json
+import unittest
+from src.repository import IndexedTaskRepository
+from src.server import TodoServer
+from src.service import TodoService
+
+
+def _request(method, path, body=None, close=False):
+    data = json.dumps(body).encode('utf-8') if body is not None else b""
+    head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n"
+    if close:
+        head += "Connection: close\r\n"
+    return head.encode('latin-1') + b"\r\n" + data
+
+
+async def _response(reader):
+    head = (await reader.readuntil(b"\r\n\r\n")).decode('latin-1')
+    status = int(head.split(" ", 2)[1])
+    headers = dict(line.split(": ", 1) for line in head.split("\r\n")[1:] if line)
+    body = await reader.readexactly(int(headers['Content-Length']))
+    return status, json.loads(body)
+
+
+class TestTodoServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.service = TodoService(IndexedTaskRepository())
+        self.server = TodoServer(self.service, port=0, max_in_flight=4)
+        await self.server.start()
+        self.reader, self.writer = await asyncio.open_connection(*self.server.address)
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.server.close()
+
+    async def _call(self, method, path, body=None):
+        self.writer.write(_request(method, path, body))
+        return await _response(self.reader)
+
+    async def test_task_crud(self):
+        """Test creating, reading, updating, completing and deleting over one connection"""
+        # Act
+        created = await self._call("POST", "/tasks", {"title": "Buy milk", "description": "2 litres"})
+        updated = await self._call("PATCH", "/tasks/1", {"title": "Buy oat milk", "expected_version": 1})
+        completed = await self._call("POST", "/tasks/1/complete")
+        fetched = await self._call("GET", "/tasks/1")
+        stats = await self._call("GET", "/stats")
+        deleted = await self._call("DELETE", "/tasks/1")
+        missing = await self._call("GET", "/tasks/1")
+
+        # Assert
+        self.assertEqual(created, (201, {"id": 1, "title": "Buy milk", "description": "2 litres",
+                                         "completed": False, "version": 1}))
+        self.assertEqual(updated[1]["title"], "Buy oat milk")
+        self.assertEqual(completed, (200, {"completed": True}))
+        self.assertEqual(fetched[1]["completed"], True)
+        self.assertEqual(stats, (200, {"total": 1, "completed": 1, "pending": 0}))
+        self.assertEqual(deleted, (200, {"deleted": True}))
+        self.assertEqual(missing[0], 404)
+
+    async def test_error_statuses(self):
+        """Test that failures map to HTTP status codes"""
+        # Arrange
+        await self._call("POST", "/tasks", {"title": "Task"})
+
+        # Act
+        conflict = await self._call("PATCH", "/tasks/1", {"title": "Other", "expected_version": 7})
+        invalid = await self._call("POST", "/tasks", {"title": "  "})
+        unknown = await self._call("POST", "/tasks/9/complete")
+        wrong_method = await self._call("PUT", "/tasks/1")
+        no_route = await self._call("GET", "/nowhere")
+
+        # Assert
+        self.assertEqual(conflict[0], 409)
+        self.assertEqual(conflict[1]["task"]["version"], 1)
+        self.assertEqual(invalid[0], 400)
+        self.assertEqual(unknown[0], 404)
+        self.assertEqual(wrong_method[0], 405)
+        self.assertEqual(no_route[0], 404)
+
+    async def test_pipelined_responses_keep_request_order(self):
+        """Test that requests sent back to back are answered in order on one connection"""
+        # Act
+        self.writer.write(b"".join(_request("POST", "/tasks", {"title": f"Task {i}"}) for i in range(10)))
+        created = [await _response(self.reader) for _ in range(10)]
+        self.writer.write(_request("GET", "/tasks?limit=4") + _request("GET", "/tasks?limit=4&after=4"))
+        first, second = await _response(self.reader), await _response(self.reader)
+
+        # Assert
+        self.assertEqual([body["id"] for _, body in created], list(range(1, 11)))
+        self.assertEqual([task["id"] for task in first[1]["tasks"]], [1, 2, 3, 4])
+        self.assertEqual(first[1]["next"], 4)
+        self.assertEqual([task["id"] for task in second[1]["tasks"]], [5, 6, 7, 8])
+
+    async def test_batch_endpoints(self):
+        """Test the batch add, update, complete and delete endpoints"""
+        # Act
+        added = await self._call("POST", "/tasks/batch", {"tasks": [{"title": "A"}, {"title": "B"}, {"title": "C"}]})
+        updated = await self._call("PATCH", "/tasks/batch", {"updates": [{"id": 2, "title": "Bee"}]})
+        completed = await self._call("POST", "/tasks/batch/complete", {"ids": [1, 2]})
+        deleted = await self._call("POST", "/tasks/batch/delete", {"ids": [3]})
+        pending = await self._call("GET", "/tasks?completed=false")
+
+        # Assert
+        self.assertEqual([task["id"] for task in added[1]["tasks"]], [1, 2, 3])
+        self.assertEqual(updated[1]["tasks"][0]["title"], "Bee")
+        self.assertEqual(completed, (200, {"completed": 2}))
+        self.assertEqual(deleted, (200, {"deleted": 1}))
+        self.assertEqual(pending, (200, {"tasks": [], "next": None}))
+
+    async def test_connection_close_is_honoured(self):
+        """Test that a Connection: close request gets its response and then EOF"""
+        # Act
+        self.writer.write(_request("GET", "/stats", close=True))
+        status, _ = await _response(self.reader)
+        rest = await self.reader.read()
+
+        # Assert
+        self.assertEqual(status, 200)
+        self.assertEqual(rest, b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 from unittest.mock import Mock
-from src.models import Task
-from src.service import TodoService
+from src.models import MutationResult, MutationStatus, Task
+from src.service import TodoService, VersionConflictError
 from src.repository import TaskRepository
 
 
@@ -70,40 +70,33 @@ class TestTodoService(unittest.TestCase):
     def test_update_task_success(self):
         """Test updating a task successfully"""
         # Arrange
-        existing_task = Task(id=1, title="Old Title", description="Old Description", completed=False)
-        self.mock_repository.get_by_id.return_value = existing_task
-        updated_task = Task(id=1, title="New Title", description="New Description", completed=False)
-        self.mock_repository.update.return_value = updated_task
+        updated_task = Task(id=1, title="New Title", description="New Description", completed=False, version=2)
+        self.mock_repository.update_if.return_value = MutationResult(MutationStatus.OK, updated_task)
 
         # Act
         result = self.service.update_task(1, "New Title", "New Description")
 
         # Assert
         self.assertEqual(result, updated_task)
-        self.mock_repository.get_by_id.assert_called_once_with(1)
-        self.mock_repository.update.assert_called_once_with(1, title="New Title", description="New Description")
+        self.mock_repository.update_if.assert_called_once_with(
+            1, None, title="New Title", description="New Description")
+        self.mock_repository.get_by_id.assert_not_called()
 
     def test_update_task_partial(self):
         """Test updating only title or description"""
         # Arrange
-        existing_task = Task(id=1, title="Old Title", completed=False)
-        self.mock_repository.get_by_id.return_value = existing_task
-        updated_task = Task(id=1, title="New Title", completed=False)
-        self.mock_repository.update.return_value = updated_task
+        updated_task = Task(id=1, title="New Title", completed=False, version=2)
+        self.mock_repository.update_if.return_value = MutationResult(MutationStatus.OK, updated_task)
 
         # Act
         result = self.service.update_task(1, title="New Title")
 
         # Assert
         self.assertEqual(result, updated_task)
-        self.mock_repository.update.assert_called_once_with(1, title="New Title")
+        self.mock_repository.update_if.assert_called_once_with(1, None, title="New Title")
 
     def test_update_task_empty_title_error(self):
         """Test that updating a task with empty title raises ValueError"""
-        # Arrange
-        existing_task = Task(id=1, title="Old Title", completed=False)
-        self.mock_repository.get_by_id.return_value = existing_task
-
         # Act & Assert
         with self.assertRaises(ValueError) as context:
             self.service.update_task(1, "")
@@ -112,37 +105,48 @@ class TestTodoService(unittest.TestCase):
         with self.assertRaises(ValueError) as context:
             self.service.update_task(1, "   ")  # whitespace only
         self.assertEqual(str(context.exception), "Title cannot be empty")
+        self.mock_repository.update_if.assert_not_called()
 
     def test_update_task_nonexistent_error(self):
         """Test that updating a non-existent task raises ValueError"""
         # Arrange
-        self.mock_repository.get_by_id.return_value = None
+        self.mock_repository.update_if.return_value = MutationResult(MutationStatus.NOT_FOUND)
 
         # Act & Assert
         with self.assertRaises(ValueError) as context:
             self.service.update_task(999, "New Title")
         self.assertEqual(str(context.exception), "Task with ID 999 does not exist")
 
+    def test_update_task_version_conflict(self):
+        """Test that a stale expected version raises VersionConflictError with the current task"""
+        # Arrange
+        current_task = Task(id=1, title="Changed", completed=False, version=3)
+        self.mock_repository.update_if.return_value = MutationResult(MutationStatus.CONFLICT, current_task)
+
+        # Act & Assert
+        with self.assertRaises(VersionConflictError) as context:
+            self.service.update_task(1, "New Title", expected_version=2)
+        self.assertIs(context.exception.task, current_task)
+        self.mock_repository.update_if.assert_called_once_with(1, 2, title="New Title")
+
     def test_complete_task_success(self):
         """Test completing a task successfully"""
         # Arrange
-        existing_task = Task(id=1, title="Test Task", completed=False)
-        self.mock_repository.get_by_id.return_value = existing_task
-        completed_task = Task(id=1, title="Test Task", completed=True)
-        self.mock_repository.update.return_value = completed_task
+        completed_task = Task(id=1, title="Test Task", completed=True, version=2)
+        self.mock_repository.complete_if.return_value = MutationResult(MutationStatus.OK, completed_task)
 
         # Act
         result = self.service.complete_task(1)
 
         # Assert
         self.assertTrue(result)
-        self.mock_repository.get_by_id.assert_called_once_with(1)
-        self.mock_repository.update.assert_called_once_with(1, completed=True)
+        self.mock_repository.complete_if.assert_called_once_with(1, None)
+        self.mock_repository.get_by_id.assert_not_called()
 
     def test_complete_task_nonexistent_error(self):
         """Test that completing a non-existent task raises ValueError"""
         # Arrange
-        self.mock_repository.get_by_id.return_value = None
+        self.mock_repository.complete_if.return_value = MutationResult(MutationStatus.NOT_FOUND)
 
         # Act & Assert
         with self.assertRaises(ValueError) as context:
@@ -152,28 +156,156 @@ class TestTodoService(unittest.TestCase):
     def test_delete_task_success(self):
         """Test deleting a task successfully"""
         # Arrange
-        existing_task = Task(id=1, title="Test Task", completed=False)
-        self.mock_repository.get_by_id.return_value = existing_task
-        self.mock_repository.delete.return_value = True
+        deleted_task = Task(id=1, title="Test Task", completed=False)
+        self.mock_repository.delete_if.return_value = MutationResult(MutationStatus.OK, deleted_task)
 
         # Act
         result = self.service.delete_task(1)
 
         # Assert
         self.assertTrue(result)
-        self.mock_repository.get_by_id.assert_called_once_with(1)
-        self.mock_repository.delete.assert_called_once_with(1)
+        self.mock_repository.delete_if.assert_called_once_with(1, None)
+        self.mock_repository.get_by_id.assert_not_called()
 
     def test_delete_task_nonexistent_error(self):
         """Test that deleting a non-existent task raises ValueError"""
         # Arrange
-        self.mock_repository.get_by_id.return_value = None
+        self.mock_repository.delete_if.return_value = MutationResult(MutationStatus.NOT_FOUND)
 
         # Act & Assert
         with self.assertRaises(ValueError) as context:
             self.service.delete_task(999)
         self.assertEqual(str(context.exception), "Task with ID 999 does not exist")
 
+    def test_add_tasks_reserves_ids_in_one_call(self):
+        """Test that a batch add reserves all IDs at once and adds in one call"""
+        # Arrange
+        self.mock_repository.generate_ids.return_value = [1, 2]
+        expected_tasks = [
+            Task(id=1, title="First", completed=False),
+            Task(id=2, title="Second", description="Details", completed=False)
+        ]
+        self.mock_repository.add_many.return_value = expected_tasks
+
+        # Act
+        result = self.service.add_tasks([(" First ", None), ("Second", "Details")])
+
+        # Assert
+        self.assertEqual(result, expected_tasks)
+        self.mock_repository.generate_ids.assert_called_once_with(2)
+        self.mock_repository.add_many.assert_called_once_with(expected_tasks)
+        self.mock_repository.generate_id.assert_not_called()
+
+    def test_add_tasks_with_completed_flag(self):
+        """Test that a (title, description, completed) triple adds a completed task in the same write"""
+        # Arrange
+        self.mock_repository.generate_ids.return_value = [1, 2]
+        expected_tasks = [
+            Task(id=1, title="Done", completed=True),
+            Task(id=2, title="Open", completed=False)
+        ]
+        self.mock_repository.add_many.return_value = expected_tasks
+
+        # Act
+        self.service.add_tasks([("Done", None, True), ("Open", None)])
+
+        # Assert
+        self.mock_repository.add_many.assert_called_once_with(expected_tasks)
+        self.mock_repository.update_many.assert_not_called()
+
+    def test_add_tasks_validates_whole_batch_first(self):
+        """Test that one invalid title rejects the batch before any ID is reserved"""
+        # Act & Assert
+        with self.assertRaises(ValueError) as context:
+            self.service.add_tasks([("Valid", None), ("  ", None)])
+        self.assertEqual(str(context.exception), "Title cannot be empty")
+        self.mock_repository.generate_ids.assert_not_called()
+        self.mock_repository.add_many.assert_not_called()
+
+    def test_update_tasks_success(self):
+        """Test updating a batch of tasks with a single lookup and a single update"""
+        # Arrange
+        self.mock_repository.get_many.return_value = {
+            1: Task(id=1, title="Old"), 2: Task(id=2, title="Other")
+        }
+        updated_tasks = [Task(id=1, title="New"), Task(id=2, title="Other", description="Details")]
+        self.mock_repository.update_many.return_value = updated_tasks
+
+        # Act
+        result = self.service.update_tasks([(1, "New", None), (2, None, "Details")])
+
+        # Assert
+        self.assertEqual(result, updated_tasks)
+        self.mock_repository.get_many.assert_called_once_with([1, 2])
+        self.mock_repository.update_many.assert_called_once_with(
+            {1: {'title': "New"}, 2: {'description': "Details"}}
+        )
+
+    def test_complete_tasks_success(self):
+        """Test completing a batch of tasks, ignoring duplicate IDs"""
+        # Arrange
+        self.mock_repository.get_many.return_value = {1: Task(id=1, title="A"), 2: Task(id=2, title="B")}
+        self.mock_repository.update_many.return_value = [
+            Task(id=1, title="A", completed=True), Task(id=2, title="B", completed=True)
+        ]
+
+        # Act
+        result = self.service.complete_tasks([1, 2, 1])
+
+        # Assert
+        self.assertEqual(result, 2)
+        self.mock_repository.update_many.assert_called_once_with({1: {'completed': True}, 2: {'completed': True}})
+
+    def test_delete_tasks_nonexistent_error(self):
+        """Test that a batch delete with missing IDs deletes nothing"""
+        # Arrange
+        self.mock_repository.get_many.return_value = {1: Task(id=1, title="A")}
+
+        # Act & Assert
+        with self.assertRaises(ValueError) as context:
+            self.service.delete_tasks([1, 7, 9])
+        self.assertEqual(str(context.exception), "Tasks with IDs 7, 9 do not exist")
+        self.mock_repository.delete_many.assert_not_called()
+
+    def test_delete_tasks_success(self):
+        """Test deleting a batch of tasks"""
+        # Arrange
+        self.mock_repository.get_many.return_value = {1: Task(id=1, title="A"), 2: Task(id=2, title="B")}
+        self.mock_repository.delete_many.return_value = 2
+
+        # Act
+        result = self.service.delete_tasks([1, 2])
+
+        # Assert
+        self.assertEqual(result, 2)
+        self.mock_repository.delete_many.assert_called_once_with([1, 2])
+
+    def test_get_page_returns_next_cursor(self):
+        """Test that get_page fetches one extra task to decide whether more pages exist"""
+        # Arrange
+        tasks = [Task(id=i, title=f"Task {i}") for i in (1, 2, 3)]
+        self.mock_repository.iter_tasks.return_value = iter(tasks)
+
+        # Act
+        page, cursor = self.service.get_page(2, completed=False, after_id=0)
+
+        # Assert
+        self.assertEqual(page, tasks[:2])
+        self.assertEqual(cursor, 2)
+        self.mock_repository.iter_tasks.assert_called_once_with(completed=False, after_id=0, limit=3)
+
+    def test_get_page_last_page_has_no_cursor(self):
+        """Test that the final page returns a None cursor"""
+        # Arrange
+        self.mock_repository.iter_tasks.return_value = iter([Task(id=1, title="Only")])
+
+        # Act
+        page, cursor = self.service.get_page(2)
+
+        # Assert
+        self.assertEqual(page, [Task(id=1, title="Only")])
+        self.assertIsNone(cursor)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,101 @@
+import unittest
+from src.models import MutationStatus, Task, TaskStats
+from src.service import TodoService
+from src.sharded_repository import ShardedTaskRepository
+
+
+class TestShardedTaskRepository(unittest.TestCase):
+    def setUp(self):
+        self.repository = ShardedTaskRepository(shards=3)
+        self.service = TodoService(self.repository)
+
+    def tearDown(self):
+        self.repository.close()
+
+    def test_generated_ids_are_sequential_and_spread_over_shards(self):
+        """Test that per-shard ID ranges interleave into one unique sequence"""
+        # Act
+        ids = [self.repository.generate_id() for _ in range(9)] + self.repository.generate_ids(3)
+
+        # Assert
+        self.assertEqual(ids, list(range(1, 13)))
+        self.assertEqual(sorted({self.repository.shard_of(task_id) for task_id in ids}), [0, 1, 2])
+
+    def test_drop_in_for_todo_service(self):
+        """Test the repository behind a real TodoService"""
+        # Act
+        first = self.service.add_task("First", "Description")
+        second = self.service.add_task("Second")
+        third = self.service.add_task("Third")
+        self.service.update_task(first.id, title="Renamed")
+        self.service.complete_task(third.id)
+        self.service.delete_task(second.id)
+
+        # Assert
+        self.assertEqual(self.service.get_all_tasks(), [
+            Task(id=1, title="Renamed", description="Description", version=2),
+            Task(id=3, title="Third", completed=True, version=2),
+        ])
+        self.assertEqual(self.service.stats(), TaskStats(total=2, completed=1))
+        with self.assertRaises(ValueError):
+            self.service.complete_task(second.id)
+
+    def test_queries_merge_shards_in_id_order(self):
+        """Test that filtered and paged queries gather results from every shard"""
+        # Arrange
+        added = self.service.add_tasks([(f"Task {number}", None) for number in range(1, 1201)])
+        self.service.complete_tasks(task.id for task in added if task.id % 4 == 0)
+
+        # Act
+        completed = list(self.repository.iter_tasks(completed=True))
+        page, cursor = self.service.get_page(5, completed=False, after_id=10)
+
+        # Assert
+        self.assertEqual([task.id for task in completed], list(range(4, 1201, 4)))
+        self.assertEqual([task.id for task in page], [11, 13, 14, 15, 17])
+        self.assertEqual(cursor, 17)
+
+    def test_bulk_operations_span_shards(self):
+        """Test the bulk methods against tasks on several shards"""
+        # Arrange
+        self.repository.add_many([Task(id=task_id, title=f"Task {task_id}") for task_id in range(1, 7)])
+
+        # Act
+        updated = self.repository.update_many({5: {'completed': True}, 1: {'title': "One"}, 9: {'title': "Missing"}})
+        deleted = self.repository.delete_many([2, 3, 3, 42])
+
+        # Assert
+        self.assertEqual([task.id for task in updated], [5, 1])
+        self.assertEqual(deleted, 2)
+        self.assertEqual(list(self.repository.get_many([6, 1, 2])), [6, 1])
+        self.assertEqual(self.repository.task_stats(), TaskStats(total=4, completed=1))
+
+    def test_explicit_ids_are_not_generated_again(self):
+        """Test that adding a chosen ID skips it in later generated IDs"""
+        # Arrange
+        self.repository.generate_ids(2)
+
+        # Act
+        self.repository.add(Task(id=5, title="Chosen"))
+        ids = [self.repository.generate_id() for _ in range(6)]
+
+        # Assert
+        self.assertNotIn(5, ids)
+        self.assertEqual(len(set(ids)), 6)
+
+    def test_conditional_mutations_route_to_owning_shard(self):
+        """Test that version checks run on the shard that owns the task"""
+        # Arrange
+        task = self.service.add_task("Task")
+
+        # Act
+        stale = self.repository.delete_if(task.id, 7)
+        missing = self.repository.update_if(99, title="Missing")
+
+        # Assert
+        self.assertEqual(stale.status, MutationStatus.CONFLICT)
+        self.assertEqual(missing.status, MutationStatus.NOT_FOUND)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.models import Task
+from src.service import TodoService
+from src.snapshot_repository import SnapshotTaskRepository, write_snapshot
+
+
+class TestSnapshotTaskRepository(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "todo.snap")
+
+    def _open(self):
+        repository = SnapshotTaskRepository(self.path)
+        self.addCleanup(repository.close)
+        return repository
+
+    def test_round_trip(self):
+        """Test that a written snapshot reads back every field"""
+        # Arrange
+        tasks = [
+            Task(id=1, title="Buy milk", description="2 litres"),
+            Task(id=4, title="Café ☕", completed=True, version=3),
+            Task(id=9, title="Empty description", description=""),
+        ]
+
+        # Act
+        write_snapshot(self.path, tasks)
+        repository = self._open()
+
+        # Assert
+        self.assertEqual(repository.get_all(), tasks)
+        self.assertEqual(repository.get_by_id(4), tasks[1])
+        self.assertIsNone(repository.get_by_id(5))
+        self.assertEqual((repository.task_stats().total, repository.task_stats().completed), (3, 1))
+        self.assertEqual(repository.generate_id(), 10)
+
+    def test_changes_overlay_the_snapshot_until_saved(self):
+        """Test that writes are visible at once and reach the file on close"""
+        # Arrange
+        write_snapshot(self.path, [Task(id=i, title=f"Task {i}") for i in range(1, 6)])
+        service = TodoService(SnapshotTaskRepository(self.path))
+
+        # Act
+        service.complete_task(2)
+        service.delete_task(3)
+        service.add_task("New")
+        listed = [(task.id, task.completed) for task in service.iter_tasks()]
+        pending = [task.id for task in service.iter_tasks(completed=False, after_id=1)]
+        service.close()
+        reopened = self._open()
+
+        # Assert
+        self.assertEqual(listed, [(1, False), (2, True), (4, False), (5, False), (6, False)])
+        self.assertEqual(pending, [4, 5, 6])
+        self.assertEqual([task.id for task in reopened.get_all()], [1, 2, 4, 5, 6])
+        self.assertEqual(reopened.get_by_id(2).version, 2)
+        self.assertEqual(reopened.task_stats().completed, 1)
+        self.assertEqual(reopened.generate_id(), 7)
+
+    def test_scan_open_across_save_keeps_its_snapshot(self):
+        """Test that saving while a scan is open neither breaks the scan nor shows it the later write"""
+        # Arrange
+        write_snapshot(self.path, [Task(id=i, title=f"Task {i}") for i in range(1, 6)])
+        repository = self._open()
+        old_snapshot = repository._snapshot
+        tasks = repository.iter_tasks()
+        first = next(tasks)
+
+        # Act
+        repository.update(3, completed=True)
+        repository.save()
+        rest = list(tasks)
+
+        # Assert
+        self.assertEqual([task.id for task in [first, *rest]], [1, 2, 3, 4, 5])
+        self.assertFalse(rest[1].completed)
+        self.assertTrue(old_snapshot._mmap.closed)
+        self.assertTrue(repository.get_by_id(3).completed)
+
+    def test_small_changes_go_to_the_delta_file(self):
+        """Test that closing after a few changes appends them to the delta instead of rewriting the snapshot"""
+        # Arrange
+        write_snapshot(self.path, [Task(id=i, title=f"Task {i}") for i in range(1, 6)])
+        with open(self.path, 'rb') as snapshot:
+            before = snapshot.read()
+
+        # Act
+        repository = SnapshotTaskRepository(self.path)
+        repository.update(2, completed=True)
+        repository.delete(3)
+        repository.add(Task(id=repository.generate_id(), title="New"))
+        repository.close()
+        with open(self.path, 'rb') as snapshot:
+            after = snapshot.read()
+        reopened = self._open()
+
+        # Assert
+        self.assertEqual(after, before)
+        self.assertTrue(os.path.exists(self.path + ".delta"))
+        self.assertEqual([(task.id, task.completed) for task in reopened.get_all()],
+                         [(1, False), (2, True), (4, False), (5, False), (6, False)])
+        self.assertEqual((reopened.task_stats().total, reopened.task_stats().completed), (5, 1))
+        self.assertEqual(reopened.generate_id(), 7)
+
+    def test_large_delta_is_merged_into_the_snapshot(self):
+        """Test that a flush past the delta threshold writes a new snapshot and removes the delta"""
+        # Arrange
+        write_snapshot(self.path, [Task(id=i, title=f"Task {i}") for i in range(1, 6)])
+        repository = self._open()
+
+        # Act
+        with patch("src.snapshot_repository._DELTA_MIN_CHANGES", 2):
+            repository.update(1, title="First")
+            repository.flush()
+            delta_after_first = os.path.exists(self.path + ".delta")
+            repository.update(2, title="Second")
+            repository.update(3, title="Third")
+            repository.flush()
+
+        # Assert
+        self.assertTrue(delta_after_first)
+        self.assertFalse(os.path.exists(self.path + ".delta"))
+        self.assertEqual(repository._overlay, {})
+        self.assertEqual([task.title for task in SnapshotTaskRepository(self.path).get_all()[:3]],
+                         ["First", "Second", "Third"])
+
+    def test_torn_delta_tail_is_ignored(self):
+        """Test that a delta cut mid-record replays the flushes before the cut"""
+        # Arrange
+        write_snapshot(self.path, [Task(id=1, title="Task")])
+        repository = SnapshotTaskRepository(self.path)
+        repository.update(1, title="Flushed")
+        repository.flush()
+        repository.update(1, title="Torn")
+        repository.close()
+        with open(self.path + ".delta", 'r+b') as delta:
+            delta.truncate(os.path.getsize(self.path + ".delta") - 3)
+
+        # Act
+        reopened = self._open()
+
+        # Assert
+        self.assertEqual(reopened.get_by_id(1).title, "Flushed")
+
+    def test_scan_does_not_see_later_updates_to_changed_tasks(self):
+        """Test that updating an already changed task after a scan started leaves the scan's copy alone"""
+        # Arrange
+        write_snapshot(self.path, [Task(id=i, title=f"Task {i}") for i in range(1, 4)])
+        repository = self._open()
+        repository.update(3, title="Changed")
+        tasks = repository.iter_tasks()
+        next(tasks)
+
+        # Act
+        repository.update(3, title="Changed again")
+        rest = list(tasks)
+
+        # Assert
+        self.assertEqual([task.title for task in rest], ["Task 2", "Changed"])
+        self.assertEqual(repository.get_by_id(3).title, "Changed again")
+
+    def test_missing_file_starts_empty(self):
+        """Test that opening a path with no snapshot creates an empty one"""
+        # Act
+        repository = self._open()
+
+        # Assert
+        self.assertEqual(repository.get_all(), [])
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_rejects_foreign_and_truncated_files(self):
+        """Test that files that are not complete snapshots are refused"""
+        # Arrange
+        write_snapshot(self.path, [Task(id=1, title="Task")])
+        with open(self.path, 'rb') as snapshot:
+            data = snapshot.read()
+
+        for name, content in (("foreign", b"x" * 64), ("truncated", data[:-2])):
+            with self.subTest(file=name):
+                with open(self.path, 'wb') as snapshot:
+                    snapshot.write(content)
+
+                # Act / Assert
+                with self.assertRaises(ValueError):
+                    SnapshotTaskRepository(self.path)
+
+    def test_write_requires_ascending_ids(self):
+        """Test that write_snapshot refuses tasks out of ID order"""
+        with self.assertRaises(ValueError):
+            write_snapshot(self.path, [Task(id=2, title="B"), Task(id=1, title="A")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,221 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.models import MutationResult, MutationStatus, Task, TaskStats
+from src.service import TodoService
+from src.sqlite_repository import SqliteTaskRepository
+
+
+class TestSqliteTaskRepository(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmpdir.name, "todo.db")
+        self.repository = SqliteTaskRepository(self.path)
+
+    def tearDown(self):
+        self.repository.close()
+        self._tmpdir.cleanup()
+
+    def _add(self, title, description=None):
+        task_id = self.repository.generate_id()
+        return self.repository.add(Task(id=task_id, title=title, description=description))
+
+    def test_uses_wal_journal(self):
+        """Test that the connection runs in WAL mode"""
+        mode = self.repository._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_add_and_get(self):
+        """Test adding tasks and reading them back"""
+        # Arrange
+        first = self._add("First", "Description")
+        second = self._add("Second")
+
+        # Act & Assert
+        self.assertEqual(self.repository.get_all(), [first, second])
+        self.assertEqual(self.repository.get_by_id(first.id), first)
+        self.assertIsNone(self.repository.get_by_id(999))
+
+    def test_update(self):
+        """Test updating known fields and ignoring unknown ones"""
+        # Arrange
+        task = self._add("Task")
+
+        # Act
+        result = self.repository.update(task.id, title="New", completed=True, priority="high")
+
+        # Assert
+        self.assertEqual(result, Task(id=task.id, title="New", completed=True, version=2))
+        self.assertEqual(self.repository.get_by_id(task.id), result)
+        self.assertIsNone(self.repository.update(999, title="Missing"))
+
+    def test_delete(self):
+        """Test deleting existing and missing tasks"""
+        # Arrange
+        task = self._add("Task")
+
+        # Act & Assert
+        self.assertTrue(self.repository.delete(task.id))
+        self.assertFalse(self.repository.delete(task.id))
+        self.assertEqual(self.repository.get_all(), [])
+
+    def test_generate_id_skips_explicit_ids(self):
+        """Test that the database sequence stays ahead of explicitly added IDs"""
+        # Arrange
+        self.repository.add(Task(id=10, title="Imported"))
+
+        # Act & Assert
+        self.assertEqual(self.repository.generate_id(), 11)
+
+    def test_data_survives_reopen(self):
+        """Test that tasks and the ID sequence persist across connections"""
+        # Arrange
+        task = self._add("Persistent")
+        self.repository.update(task.id, completed=True)
+        self.repository.close()
+
+        # Act
+        self.repository = SqliteTaskRepository(self.path)
+
+        # Assert
+        self.assertEqual(self.repository.get_all(), [Task(id=1, title="Persistent", completed=True, version=2)])
+        self.assertEqual(self.repository.generate_id(), 2)
+
+    def test_generate_id_is_shared_between_connections(self):
+        """Test that two connections to one file never hand out the same ID"""
+        # Arrange
+        other = SqliteTaskRepository(self.path)
+        try:
+            # Act
+            ids = [repo.generate_id() for _ in range(5) for repo in (self.repository, other)]
+        finally:
+            other.close()
+
+        # Assert
+        self.assertEqual(sorted(ids), list(range(1, 11)))
+
+    def test_iter_tasks_pages_through_keyset_queries(self):
+        """Test streaming iteration across several internal pages"""
+        # Arrange
+        ids = self.repository.generate_ids(7)
+        self.repository.add_many([Task(id=i, title=f"Task {i}", completed=i % 3 == 0) for i in ids])
+
+        # Act & Assert
+        with patch("src.sqlite_repository._PAGE_SIZE", 2):
+            self.assertEqual([t.id for t in self.repository.iter_tasks()], ids)
+            self.assertEqual([t.id for t in self.repository.iter_tasks(after_id=2, limit=3)], [3, 4, 5])
+            self.assertEqual([t.id for t in self.repository.iter_tasks(completed=False, after_id=1)], [2, 4, 5, 7])
+
+    def test_bulk_operations(self):
+        """Test the bulk methods against the database"""
+        # Act
+        ids = self.repository.generate_ids(3)
+        self.repository.add_many([Task(id=task_id, title=f"Task {task_id}") for task_id in ids])
+        updated = self.repository.update_many({1: {'completed': True}, 2: {'title': "Two", 'description': "D"}})
+        deleted = self.repository.delete_many([3, 3, 99])
+
+        # Assert
+        self.assertEqual(ids, [1, 2, 3])
+        self.assertEqual(self.repository.generate_id(), 4)
+        self.assertEqual(updated, [Task(id=1, title="Task 1", completed=True, version=2),
+                                   Task(id=2, title="Two", description="D", version=2)])
+        self.assertEqual(deleted, 1)
+        self.assertEqual(self.repository.get_many([2, 1, 3]), {2: updated[1], 1: updated[0]})
+
+    def test_add_many_is_one_transaction(self):
+        """Test that a failing row rolls back the whole batch"""
+        # Arrange
+        batch = [Task(id=1, title="Good"), Task(id=2, title=None)]
+
+        # Act & Assert
+        with self.assertRaises(Exception):
+            self.repository.add_many(batch)
+        self.assertEqual(self.repository.get_all(), [])
+
+    def test_drop_in_for_todo_service(self):
+        """Test the repository behind a real TodoService"""
+        # Arrange
+        service = TodoService(self.repository)
+
+        # Act
+        task = service.add_task("Task")
+        service.update_task(task.id, description="Details")
+        service.complete_task(task.id)
+
+        # Assert
+        self.assertEqual(service.get_all_tasks(), [Task(id=1, title="Task", description="Details", completed=True, version=3)])
+        with self.assertRaises(ValueError):
+            service.delete_task(999)
+
+    def test_conditional_mutations(self):
+        """Test that conditional writes check the stored version"""
+        # Arrange
+        task = self._add("Task")
+
+        # Act
+        updated = self.repository.update_if(task.id, 1, title="Renamed")
+        stale = self.repository.delete_if(task.id, 1)
+        missing = self.repository.complete_if(999)
+
+        # Assert
+        self.assertEqual(updated.task, Task(id=task.id, title="Renamed", version=2))
+        self.assertEqual(stale, MutationResult(MutationStatus.CONFLICT, updated.task))
+        self.assertEqual(missing.status, MutationStatus.NOT_FOUND)
+        self.assertEqual(self.repository.delete_if(task.id, 2).task, updated.task)
+        self.assertIsNone(self.repository.get_by_id(task.id))
+
+    def test_adds_version_column_to_old_databases(self):
+        """Test that a database created before versioning is migrated on open"""
+        # Arrange
+        self.repository.close()
+        os.remove(self.path)
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY, title TEXT NOT NULL, "
+                     "description TEXT, completed INTEGER NOT NULL DEFAULT 0)")
+        conn.execute("INSERT INTO tasks VALUES (1, 'Old', NULL, 0)")
+        conn.commit()
+        conn.close()
+
+        # Act
+        self.repository = SqliteTaskRepository(self.path)
+
+        # Assert
+        self.assertEqual(self.repository.get_by_id(1), Task(id=1, title="Old"))
+
+    def test_reopen_skips_schema_setup(self):
+        """Test that a database already at the current schema is opened without rerunning the DDL"""
+        # Arrange
+        self._add("Task")
+        self.repository.close()
+
+        # Act
+        with patch.object(SqliteTaskRepository, "_migrate") as migrate:
+            self.repository = SqliteTaskRepository(self.path)
+
+        # Assert
+        migrate.assert_not_called()
+        self.assertEqual(self.repository._conn.execute("PRAGMA user_version").fetchone()[0], 1)
+        self.assertEqual(self.repository.task_stats().total, 1)
+
+    def test_stats_maintained_by_triggers(self):
+        """Test that the counter row follows inserts, replacements, updates and deletes"""
+        # Arrange
+        for task_id in (1, 2, 3):
+            self.repository.add(Task(id=task_id, title="Task"))
+
+        # Act
+        self.repository.update(1, completed=True)
+        self.repository.add(Task(id=2, title="Replaced", completed=True))
+        self.repository.update_many({1: {'completed': True}, 3: {'title': "Three"}})
+        self.repository.delete_many([3])
+        self.repository.close()
+        self.repository = SqliteTaskRepository(self.path)
+
+        # Assert
+        self.assertEqual(self.repository.task_stats(), TaskStats(total=2, completed=2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from src import cli
+from src.cli import main
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds a `todo stats` run may take on top of a bare interpreter start.
+# Generous enough for a loaded CI machine; importing a backend, asyncio or
+# the compression modules on every start is what it is there to catch.
+COLD_START_BUDGET = 0.25
+
+# Modules only some commands or backends need; none may load at startup
+LAZY_MODULES = (
+    'asyncio', 'bz2', 'csv', 'json', 'lzma', 'mmap', 'shutil', 'sqlite3', 'subprocess',
+    'src.caching_repository', 'src.columnar_repository', 'src.instrumentation', 'src.log_repository',
+    'src.mvcc_repository', 'src.render', 'src.search', 'src.server', 'src.sharded_repository',
+    'src.snapshot_repository', 'src.sqlite_repository', 'src.write_behind_repository',
+)
+
+
+def _run_python(*args):
+    """Run a fresh interpreter in the project root and return its wall-clock time and stdout"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, *args], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    return time.perf_counter() - start, result.stdout
+
+
+class TestStartup(unittest.TestCase):
+    def test_stats_loads_no_optional_modules(self):
+        """Test that running a command on the default backend leaves optional modules unimported"""
+        # Act
+        _, loaded = _run_python("-c", "import sys; from src.cli import main; main(['stats']); "
+                                      "print(*sorted(sys.modules), sep='\\n')")
+
+        # Assert
+        self.assertEqual(sorted(set(LAZY_MODULES) & set(loaded.split())), [])
+
+    def test_cold_start_within_budget(self):
+        """Test that `todo stats` starts within the budget over a bare interpreter"""
+        # Act
+        bare = min(_run_python("-c", "pass")[0] for _ in range(3))
+        todo = min(_run_python("-m", "src.cli", "stats")[0] for _ in range(3))
+
+        # Assert
+        self.assertLess(todo - bare, COLD_START_BUDGET,
+                        f"todo stats took {todo * 1000:.0f} ms against {bare * 1000:.0f} ms for python -c pass")
+
+    def test_profile_startup_reports_phases(self):
+        """Test that --profile-startup prints each phase on stderr"""
+        # Arrange
+        err = io.StringIO()
+
+        # Act
+        with redirect_stdout(io.StringIO()), redirect_stderr(err):
+            main(["--profile-startup", "stats"])
+
+        # Assert
+        phases = [line.split()[0] for line in err.getvalue().splitlines()[1:]]
+        self.assertEqual(phases, ["import", "parse", "open", "run", "total"])
+
+    def test_profile_startup_import_phase_excludes_time_before_main(self):
+        """Test that the import phase reports the import's own cost, not the time since it ran"""
+        # Arrange
+        err = io.StringIO()
+        time.sleep(0.2)
+
+        # Act
+        with redirect_stdout(io.StringIO()), redirect_stderr(err):
+            main(["--profile-startup", "stats"])
+
+        # Assert
+        rows = {line.split()[0]: float(line.split()[-2]) for line in err.getvalue().splitlines()[1:]}
+        self.assertEqual(rows["import"], round(cli._IMPORT_SECONDS * 1000, 1))
+        self.assertLess(rows["total"], 200)
+
+    def test_usage_errors_do_not_open_the_store(self):
+        """Test that a bad command line exits before the database file is created"""
+        # Arrange
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "todo.db")
+
+            # Act
+            with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                main(["--backend", "sqlite", "--db", path, "list", "--bogus"])
+
+            # Assert
+            self.assertFalse(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
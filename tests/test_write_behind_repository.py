@@ -0,0 +1,337 @@
+import io
+import os
+import signal
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+from src.cli import TodoCLI
+from src.models import MutationStatus, Task
+from src.repository import IndexedTaskRepository
+from src.service import TodoService
+from src.sqlite_repository import SqliteTaskRepository
+from src.write_behind_repository import DEFERRED, GROUPED, IMMEDIATE, WriteBehindTaskRepository
+
+
+class TestWriteBehindTaskRepository(unittest.TestCase):
+    def setUp(self):
+        self.backend = IndexedTaskRepository()
+        self.backend.add_many([Task(id=i, title=f"Task {i}") for i in range(1, 4)])
+
+    def _repository(self, durability, **options):
+        repository = WriteBehindTaskRepository(self.backend, durability, **options)
+        self.addCleanup(repository.close)
+        return repository
+
+    def test_deferred_writes_are_acknowledged_from_the_buffer(self):
+        """Test that deferred writes are visible at once but reach the backend only on flush"""
+        # Arrange
+        repository = self._repository(DEFERRED, max_delay=60)
+
+        # Act
+        repository.add(Task(id=4, title="New"))
+        repository.update(1, title="Renamed")
+        repository.delete(2)
+
+        # Assert
+        self.assertEqual(repository.get_by_id(1).title, "Renamed")
+        self.assertIsNone(repository.get_by_id(2))
+        self.assertEqual(sorted(repository.get_many([1, 2, 4])), [1, 4])
+        self.assertEqual(self.backend.get_by_id(1).title, "Task 1")
+        self.assertIsNone(self.backend.get_by_id(4))
+        self.assertEqual(repository.pending_writes, 3)
+        repository.flush()
+        self.assertEqual(self.backend.get_by_id(1).title, "Renamed")
+        self.assertIsNone(self.backend.get_by_id(2))
+        self.assertEqual(repository.pending_writes, 0)
+
+    def test_repeated_updates_merge_into_one_write(self):
+        """Test that several updates to a task are written once, keeping every version bump"""
+        # Arrange
+        repository = self._repository(DEFERRED, max_delay=60)
+
+        # Act
+        for number in range(5):
+            repository.update(1, title=f"Title {number}")
+        with patch.object(self.backend, "add_many", wraps=self.backend.add_many) as backend_add_many:
+            repository.flush()
+
+        # Assert
+        backend_add_many.assert_called_once()
+        self.assertEqual(len(backend_add_many.call_args.args[0]), 1)
+        stored = self.backend.get_by_id(1)
+        self.assertEqual((stored.title, stored.version), ("Title 4", 6))
+
+    def test_deferred_batches_flush_after_delay_or_batch_size(self):
+        """Test that the flusher writes once the delay passes or the batch fills up"""
+        # Arrange
+        delayed = self._repository(DEFERRED, max_delay=0.01)
+
+        # Act
+        delayed.update(1, title="Renamed")
+        with delayed._lock:
+            delayed._changed.wait_for(lambda: not delayed._pending and not delayed._flushing, 5)
+
+        # Assert
+        self.assertEqual(self.backend.get_by_id(1).title, "Renamed")
+
+        # Arrange
+        batched = self._repository(DEFERRED, max_delay=60, max_batch=2)
+
+        # Act
+        batched.update(2, title="Renamed")
+        batched.update(3, title="Renamed")
+        with batched._lock:
+            batched._changed.wait_for(lambda: not batched._pending and not batched._flushing, 5)
+
+        # Assert
+        self.assertEqual(self.backend.get_by_id(3).title, "Renamed")
+
+    def test_flusher_survives_reads_that_flush(self):
+        """Test that a read flushing the batch the flusher is waiting on does not stop later flushes"""
+        # Arrange
+        repository = self._repository(DEFERRED, max_delay=0.2)
+        repository.add(Task(id=4, title="First"))
+        # Let the flusher start waiting out the delay for this batch
+        time.sleep(0.05)
+
+        # Act
+        repository.task_stats()
+        time.sleep(0.05)
+        repository.add(Task(id=5, title="Second"))
+        with repository._lock:
+            repository._changed.wait_for(lambda: not repository._pending and not repository._flushing, 5)
+
+        # Assert
+        self.assertTrue(repository._thread.is_alive())
+        self.assertEqual(self.backend.get_by_id(5).title, "Second")
+
+    def test_immediate_and_grouped_writes_are_stored_on_return(self):
+        """Test that immediate and grouped modes return only after the backend write"""
+        for durability in (IMMEDIATE, GROUPED):
+            with self.subTest(durability=durability):
+                # Arrange
+                repository = self._repository(durability)
+
+                # Act
+                repository.update(1, title=durability)
+                repository.delete_many([3])
+
+                # Assert
+                self.assertEqual(self.backend.get_by_id(1).title, durability)
+                self.assertIsNone(self.backend.get_by_id(3))
+                self.assertEqual(repository.pending_writes, 0)
+                self.backend.add(Task(id=3, title="Task 3"))
+
+    def test_conditional_writes_check_buffered_versions(self):
+        """Test that version checks see changes that are still buffered"""
+        # Arrange
+        repository = self._repository(DEFERRED, max_delay=60)
+        version = repository.update(1, title="Renamed").version
+
+        # Act
+        stale = repository.update_if(1, version - 1, title="Stale")
+        completed = repository.complete_if(1, version)
+        missing = repository.delete_if(2, 99)
+
+        # Assert
+        self.assertEqual(stale.status, MutationStatus.CONFLICT)
+        self.assertTrue(completed.ok)
+        self.assertEqual(missing.status, MutationStatus.CONFLICT)
+        self.assertEqual(repository.task_stats().completed, 1)
+        self.assertTrue(self.backend.get_by_id(1).completed)
+
+    def test_conditional_writes_read_the_backend_without_the_buffer_lock(self):
+        """Test that reading an unbuffered task for a version check leaves the buffer lock free"""
+        # Arrange
+        repository = self._repository(DEFERRED, max_delay=60)
+        held = []
+
+        def get_many(task_ids):
+            held.append(repository._lock.locked())
+            return IndexedTaskRepository.get_many(self.backend, task_ids)
+
+        # Act
+        with patch.object(self.backend, "get_many", side_effect=get_many):
+            updated = repository.update_if(1, 1, title="Renamed")
+            deleted = repository.delete_many([2, 99])
+
+        # Assert
+        self.assertEqual(held, [False, False])
+        self.assertEqual(updated.task.version, 2)
+        self.assertEqual(deleted, 1)
+
+    def test_conditional_writes_reread_when_a_batch_lands(self):
+        """Test that a backend read racing a batch write is repeated rather than used stale"""
+        # Arrange
+        repository = self._repository(DEFERRED, max_delay=60)
+        reads = []
+
+        def get_many(task_ids):
+            found = IndexedTaskRepository.get_many(self.backend, task_ids)
+            if not reads:
+                # Another writer's batch lands between our read and our check
+                self.backend.update(1, title="Landed")
+                with repository._lock:
+                    repository._landed += 1
+            reads.append(task_ids)
+            return found
+
+        # Act
+        with patch.object(self.backend, "get_many", side_effect=get_many):
+            result = repository.update_if(1, 1, title="Stale")
+
+        # Assert
+        self.assertEqual(len(reads), 2)
+        self.assertEqual(result.status, MutationStatus.CONFLICT)
+
+    def test_failed_flush_keeps_changes_buffered(self):
+        """Test that a batch the backend rejects is kept and written by the next flush"""
+        # Arrange
+        repository = self._repository(DEFERRED, max_delay=60)
+        repository.update(1, title="Renamed")
+
+        # Act
+        with patch.object(self.backend, "add_many", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                repository.flush()
+        buffered = repository.get_by_id(1).title
+        repository.flush()
+
+        # Assert
+        self.assertEqual(buffered, "Renamed")
+        self.assertEqual(self.backend.get_by_id(1).title, "Renamed")
+
+    def test_writers_wait_out_a_rejected_batch(self):
+        """Test that immediate and grouped writers return normally once the retried batch is stored"""
+        for durability in (IMMEDIATE, GROUPED):
+            with self.subTest(durability=durability):
+                # Arrange
+                repository = self._repository(durability)
+                failures = iter([OSError("disk full")])
+
+                def add_many(tasks):
+                    error = next(failures, None)
+                    if error is not None:
+                        raise error
+                    return IndexedTaskRepository.add_many(self.backend, tasks)
+
+                # Act
+                with patch("src.write_behind_repository._RETRY_DELAY", 0.01), \
+                        patch.object(self.backend, "add_many", side_effect=add_many):
+                    updated = repository.update(1, title=durability)
+
+                # Assert
+                self.assertEqual(updated.title, durability)
+                self.assertEqual(self.backend.get_by_id(1).title, durability)
+
+    def test_writers_raise_when_the_backend_keeps_failing(self):
+        """Test that immediate and grouped writers get the backend error instead of blocking"""
+        for durability in (IMMEDIATE, GROUPED):
+            with self.subTest(durability=durability):
+                # Arrange
+                repository = self._repository(durability)
+
+                # Act
+                with patch("src.write_behind_repository._RETRY_DELAY", 0.01), \
+                        patch.object(self.backend, "add_many", side_effect=OSError("disk full")) as add_many:
+                    with self.assertRaises(OSError):
+                        repository.update(1, title="Lost")
+
+                # Assert
+                self.assertEqual(add_many.call_count, 3)
+                self.assertEqual(repository.pending_writes, 0)
+                self.assertEqual(repository.get_by_id(1).title, "Task 1")
+
+    def test_grouped_writer_raises_when_close_loses_its_change(self):
+        """Test that a grouped writer raises only once closing gives up on its batch"""
+        # Arrange
+        repository = WriteBehindTaskRepository(self.backend, GROUPED)
+        outcome = []
+
+        def write():
+            try:
+                repository.update(1, title="Lost")
+                outcome.append(None)
+            except OSError as error:
+                outcome.append(error)
+
+        # Act
+        with patch("src.write_behind_repository._RETRY_DELAY", 0.01), \
+                patch("src.write_behind_repository._MAX_ATTEMPTS", 1000), \
+                patch.object(self.backend, "add_many", side_effect=OSError("disk full")):
+            writer = threading.Thread(target=write)
+            writer.start()
+            writer.join(0.1)
+            waiting = writer.is_alive()
+            with self.assertRaises(OSError):
+                repository.close()
+            writer.join(5)
+
+        # Assert
+        self.assertTrue(waiting)
+        self.assertEqual(len(outcome), 1)
+        self.assertIsInstance(outcome[0], OSError)
+        self.assertEqual(self.backend.get_by_id(1).title, "Task 1")
+
+    def test_close_flushes_to_disk(self):
+        """Test that closing a deferred store writes what is still buffered"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "todo.db")
+            service = TodoService(WriteBehindTaskRepository(SqliteTaskRepository(path), DEFERRED, max_delay=60))
+
+            # Act
+            service.add_tasks([("First", None), ("Second", None)])
+            service.complete_task(1)
+            service.close()
+            reopened = SqliteTaskRepository(path)
+            tasks = reopened.get_all()
+            reopened.close()
+
+        # Assert
+        self.assertEqual([(task.title, task.completed) for task in tasks], [("First", True), ("Second", False)])
+
+
+class TestTodoCLIFlushing(unittest.TestCase):
+    def setUp(self):
+        self.backend = IndexedTaskRepository()
+        self.service = TodoService(WriteBehindTaskRepository(self.backend, DEFERRED, max_delay=60))
+        self.cli = TodoCLI(self.service)
+        self.addCleanup(self.service.close)
+
+    def test_interactive_exit_flushes(self):
+        """Test that leaving the interactive menu writes buffered changes"""
+        # Act
+        with patch("builtins.input", side_effect=["1", "Task", "", "7"]), redirect_stdout(io.StringIO()):
+            self.cli.run_interactive()
+
+        # Assert
+        self.assertEqual(self.backend.get_by_id(1).title, "Task")
+
+    def test_sigterm_flushes_and_exits(self):
+        """Test that SIGTERM during the interactive menu still writes buffered changes"""
+        # Arrange
+        answers = iter(["1", "Task", ""])
+
+        def prompt(text=""):
+            answer = next(answers, None)
+            if answer is None:
+                os.kill(os.getpid(), signal.SIGTERM)
+                raise AssertionError("SIGTERM was not delivered")
+            return answer
+
+        # Act
+        with patch("builtins.input", side_effect=prompt), redirect_stdout(io.StringIO()):
+            with self.assertRaises(SystemExit) as raised:
+                self.cli.run([])
+
+        # Assert
+        self.assertEqual(raised.exception.code, 128 + signal.SIGTERM)
+        self.assertEqual(self.backend.get_by_id(1).title, "Task")
+        self.assertIs(signal.getsignal(signal.SIGTERM), signal.SIG_DFL)
+
+
+if __name__ == "__main__":
+    unittest.main()